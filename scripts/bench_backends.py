@@ -0,0 +1,101 @@
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from inference import BACKENDS, InferenceEngine, MODEL_PATH, model_artifact
+import dataset_cache
+
+IMAGES_DIR = "dataset/test/images"
+
+
+def load_images(folder, limit=None):
+    paths = sorted(p for p in Path(folder).iterdir()
+                   if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    if limit:
+        paths = paths[:limit]
+    return [cv2.imread(str(p)) for p in paths]
+
+
+def top1_labels(preds):
+    out = []
+    for pred in preds:
+        best = pred.best()
+        out.append(best.label if best is not None else None)
+    return out
+
+
+def bench_backend(backend, images, model_path=MODEL_PATH, batch=8, warmup=3):
+    engine = InferenceEngine(model_path, backend=backend, warmup=False)
+    engine.warmup(warmup)
+
+    # gecikme: tek tek (canlı uygulamadaki gibi batch=1)
+    lat = np.empty(len(images), dtype=np.float64)
+    preds = []
+    for i, img in enumerate(images):
+        t0 = time.perf_counter()
+        preds.append(engine.predict(img))
+        lat[i] = time.perf_counter() - t0
+
+    # throughput: batch halinde
+    t0 = time.perf_counter()
+    for i in range(0, len(images), batch):
+        engine.predict_many(images[i:i + batch])
+    total = time.perf_counter() - t0
+
+    return {
+        "backend": backend,
+        "p50_ms": float(np.percentile(lat, 50) * 1000),
+        "p95_ms": float(np.percentile(lat, 95) * 1000),
+        "mean_ms": float(lat.mean() * 1000),
+        "throughput_ips": len(images) / total if total > 0 else 0.0,
+        "labels": top1_labels(preds),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Backend'leri CPU'da karşılaştırır (gecikme, throughput, .pt ile top-1 uyumu).")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--images", default=IMAGES_DIR)
+    ap.add_argument("--backends", nargs="+", default=list(BACKENDS),
+                    choices=BACKENDS)
+    ap.add_argument("--batch", type=int, default=8)
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--cache", metavar="SPLIT", default=None,
+                    help="--images yerine dataset_cache memmap'i (örn. test)")
+    args = ap.parse_args()
+
+    if args.cache:
+        images = [img for img, _ in dataset_cache.load(args.cache).items(args.limit)]
+        args.images = f"{args.cache} (memmap)"
+    else:
+        images = load_images(args.images, args.limit)
+    print(f" {len(images)} resim: {args.images}")
+
+    backends = list(args.backends)
+    if "pt" not in backends:
+        backends.insert(0, "pt")  # uyum için referans
+
+    rows = []
+    for backend in backends:
+        if not Path(model_artifact(args.model, backend)).exists():
+            print(f" {backend}: dosya yok, atlandı (export_model.py)")
+            continue
+        rows.append(bench_backend(backend, images, args.model, args.batch))
+
+    ref = next((r["labels"] for r in rows if r["backend"] == "pt"), None)
+
+    print(f"\n{'backend':<14}{'p50 ms':>9}{'p95 ms':>9}{'ort ms':>9}{'img/s':>9}{'top1 uyum':>11}")
+    for r in rows:
+        agree = "-"
+        if ref is not None:
+            same = sum(a == b for a, b in zip(ref, r["labels"]))
+            agree = f"{100.0 * same / max(1, len(ref)):.1f}%"
+        print(f"{r['backend']:<14}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['mean_ms']:>9.1f}{r['throughput_ips']:>9.1f}{agree:>11}")
+
+
+if __name__ == "__main__":
+    main()
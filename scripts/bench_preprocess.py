@@ -0,0 +1,84 @@
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from preprocess import MirrorDisplay, Preprocessor, mirrored_box
+
+# gui_auto_word.py ayarları
+ROI = (40, 60, 400, 420)   # ekrandaki (aynalı) kutu
+SIZE = 640
+
+
+def old_path(frame):
+    """Eski hali: her karede flip + kopya + resize + CLAHE nesnesi + kopya."""
+    frame = cv2.flip(frame, 1)
+    x1, y1, x2, y2 = ROI
+    roi = frame[y1:y2, x1:x2].copy()
+    roi_big = cv2.resize(roi, (SIZE, SIZE), interpolation=cv2.INTER_LINEAR)
+    gray = cv2.cvtColor(roi_big, cv2.COLOR_BGR2GRAY)
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    g2 = clahe.apply(gray)
+    model_in = cv2.cvtColor(g2, cv2.COLOR_GRAY2BGR)
+    display = frame.copy()
+    return model_in, display
+
+
+def make_new_path():
+    pre = Preprocessor(size=SIZE, enhance=True)
+    mirror = MirrorDisplay(mirror=True)
+
+    def new_path(frame):
+        """Yeni hali: ham karede kopyasız ROI, sabit tamponlar, ayna sadece ekranda."""
+        x1, y1, x2, y2 = mirrored_box(ROI, frame.shape[1])
+        model_in = pre(frame[y1:y2, x1:x2])
+        display = mirror(frame)
+        return model_in, display
+
+    return new_path
+
+
+def measure(fn, frames, warmup=5):
+    for f in frames[:warmup]:
+        fn(f)
+
+    tracemalloc.start()
+    peaks = []
+    for f in frames:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        out = fn(f)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        del out
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for f in frames:
+        fn(f)
+    dt = (time.perf_counter() - t0) / len(frames)
+    return float(np.mean(peaks)), dt
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="ROI ön işleme: kare başına ayrılan bellek ve süre (eski / yeni).")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    # cap.read() her seferinde yeni dizi döndürür; aynısını taklit et
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+              for _ in range(min(args.frames, 32))]
+    frames = (frames * (args.frames // len(frames) + 1))[:args.frames]
+
+    print(f"{'yol':<8}{'KB/kare':>12}{'ms/kare':>10}")
+    for name, fn in (("eski", old_path), ("yeni", make_new_path())):
+        kb, dt = measure(fn, frames)
+        print(f"{name:<8}{kb / 1024:>12.1f}{dt * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
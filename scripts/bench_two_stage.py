@@ -0,0 +1,189 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import dataset_cache
+from crop_classifier import CLS_MODEL_PATH, CropClassifier, TwoStageEngine, crop_box
+from inference import BACKEND, InferenceEngine, MODEL_PATH
+
+SPLITS = ("valid", "test")
+REFRESH = (1, 3, 5, 10)
+
+
+def pct(ms):
+    ms = np.asarray(ms, dtype=np.float64)
+    if len(ms) == 0:
+        return {"p50_ms": None, "p95_ms": None, "mean_ms": None}
+    return {"p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "mean_ms": float(ms.mean())}
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def load_split(split, limit=None, cache=False):
+    """(resim, (k, 5) etiket) çiftleri; cache=True ise memmap'ten."""
+    if cache:
+        data = dataset_cache.load(split)
+        n = len(data) if limit is None else min(limit, len(data))
+        return [(data.image(i), data.labels[i]) for i in range(n)]
+    root = dataset_cache.DATASET_DIR
+    img_dir = Path(root) / split / "images"
+    out = []
+    for name in dataset_cache.list_files(split)[:limit]:
+        img = cv2.imread(str(img_dir / name))
+        if img is not None:
+            out.append((img, dataset_cache.read_labels(
+                dataset_cache.label_path(root, split, name))))
+    return out
+
+
+def bench_images(detector, classifier, split, limit=None, cache=False):
+    """Veri seti: dedektör tek başına vs dedektör kutusu + sınıflandırıcı.
+
+    Sınıflandırıcı ayrıca etiket kutusundan kırpılan crop'ta ölçülür
+    (kutu kusursuz olsaydı ulaşılacak doğruluk).
+    """
+    det_ms, cls_ms = [], []
+    n = det_ok = two_ok = gt_ok = 0
+    cls_index = {v: k for k, v in classifier.names.items()}
+    for img, labels in load_split(split, limit, cache):
+        if len(labels) == 0:
+            continue
+        n += 1
+        gt = int(labels[0, 0])
+        gt_label = detector.names[gt]
+        h, w = img.shape[:2]
+
+        pred, ms = timed(detector.predict, img)
+        det_ms.append(ms)
+        best = pred.best()
+        det_ok += best is not None and best.label == gt_label
+
+        if best is not None:
+            x1, y1, x2, y2 = crop_box(best.box, w, h)
+            probs, ms = timed(classifier.classify, img[y1:y2, x1:x2])
+            cls_ms.append(ms)
+            two_ok += classifier.names[int(probs.argmax())] == gt_label
+
+        cx, cy, bw, bh = labels[0, 1:5]
+        box = (int((cx - bw / 2) * w), int((cy - bh / 2) * h),
+               int((cx + bw / 2) * w), int((cy + bh / 2) * h))
+        x1, y1, x2, y2 = crop_box(box, w, h)
+        probs = classifier.classify(img[y1:y2, x1:x2])
+        gt_ok += int(probs.argmax()) == cls_index.get(gt_label, -1)
+
+    det, cls = pct(det_ms), pct(cls_ms)
+    amortized = {}
+    if det["mean_ms"] is not None and cls["mean_ms"] is not None:
+        for r in REFRESH:
+            amortized[r] = det["mean_ms"] / r + cls["mean_ms"]
+    return {
+        "images": n,
+        "detector": {**det, "top1": det_ok / n if n else None},
+        "classifier": {**cls, "top1_on_detector_box": two_ok / n if n else None,
+                       "top1_on_label_box": gt_ok / n if n else None},
+        "two_stage_mean_ms_by_refresh": amortized,
+    }
+
+
+def bench_video(detector, classifier, path, refresh, roi_size=320, limit=None):
+    """Kayıtlı video: iki mod aynı karelerde; kare başı süre ve harf uyumu."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {"error": f"açılamadı: {path}"}
+    two = TwoStageEngine(detector, classifier, refresh_every=refresh)
+    det_ms, two_ms = [], []
+    same = both = 0
+    while limit is None or len(det_ms) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        h, w = frame.shape[:2]
+        s = min(roi_size, h, w)
+        y1, x1 = (h - s) // 2, (w - s) // 2
+        roi = frame[y1:y1 + s, x1:x1 + s]
+
+        a, ms = timed(detector.predict, roi)
+        det_ms.append(ms)
+        b, ms = timed(two.predict, roi)
+        two_ms.append(ms)
+        a, b = a.best(), b.best()
+        if a is not None and b is not None:
+            both += 1
+            same += a.label == b.label
+    cap.release()
+    return {
+        "frames": len(det_ms),
+        "refresh_every": refresh,
+        "detector": pct(det_ms),
+        "two_stage": pct(two_ms),
+        "detector_calls": two.detections,
+        "label_agreement": same / both if both else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Sadece dedektör vs iki aşama (dedektör kutusu + crop sınıflandırıcı): "
+                    "gecikme ve doğruluk.")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--cls-model", default=CLS_MODEL_PATH)
+    ap.add_argument("--splits", nargs="*", default=list(SPLITS))
+    ap.add_argument("--limit", type=int, default=None)
+    ap.add_argument("--cache", action="store_true",
+                    help="resimleri JPEG yerine dataset_cache memmap'inden oku")
+    ap.add_argument("--video", default=None)
+    ap.add_argument("--refresh", type=int, default=5, help="video için refresh_every")
+    ap.add_argument("-o", "--out", default=None)
+    args = ap.parse_args()
+
+    detector = InferenceEngine(args.model, backend=args.backend)
+    classifier = CropClassifier(args.cls_model)
+    report = {"model": detector.model_path, "cls_model": args.cls_model,
+              "cls_imgsz": classifier.imgsz, "runs": {}}
+
+    for split in args.splits:
+        r = bench_images(detector, classifier, split, args.limit, args.cache)
+        report["runs"][split] = r
+        d, c = r["detector"], r["classifier"]
+        if not r["images"]:
+            print(f" {split}: resim yok")
+            continue
+        print(f"\n {split}: {r['images']} resim")
+        print(f"   dedektör        p50 {d['p50_ms']:7.1f} ms  top1 {d['top1'] * 100:5.1f}%")
+        if c["p50_ms"] is not None:
+            print(f"   sınıflandırıcı  p50 {c['p50_ms']:7.1f} ms  top1 {c['top1_on_detector_box'] * 100:5.1f}% "
+                  f"(etiket kutusunda {c['top1_on_label_box'] * 100:5.1f}%)")
+        for refresh, ms in r["two_stage_mean_ms_by_refresh"].items():
+            print(f"   iki aşama, {refresh:>2} karede bir dedektör: ort {ms:7.1f} ms/kare")
+
+    if args.video:
+        r = bench_video(detector, classifier, args.video, args.refresh, limit=args.limit)
+        report["runs"]["video"] = r
+        if "error" in r:
+            print(f" video: {r['error']}")
+        else:
+            agree = r["label_agreement"]
+            print(f"\n video: {r['frames']} kare, dedektör p50 {r['detector']['p50_ms']:.1f} ms, "
+                  f"iki aşama p50 {r['two_stage']['p50_ms']:.1f} ms "
+                  f"({r['detector_calls']} dedektör çağrısı), harf uyumu "
+                  f"{'-' if agree is None else f'{agree * 100:.1f}%'}")
+
+    out = Path(args.out) if args.out else \
+        Path("runs/benchmark") / time.strftime("two_stage_%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f" -> {out}")
+
+
+if __name__ == "__main__":
+    main()
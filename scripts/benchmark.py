@@ -0,0 +1,386 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from inference import BACKEND, InferenceEngine, MODEL_PATH, draw_detection
+from preprocess import MirrorDisplay
+import dataset_cache
+
+DATA_YAML = "dataset/data.yaml"
+SPLITS = ("test", "valid")
+STAGES = ("decode", "preprocess", "inference", "postprocess", "render")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+# GUI'lerdeki ayarların aynısı
+PROFILES = {
+    # gui_app.py: merkez 320 ROI, doğrudan model
+    "app": {"conf": 0.50, "upscale": None, "enhance": False,
+            "roi": "center", "roi_size": 320},
+    # gui_auto_word.py: soldaki 360 ROI, 640'a büyüt + CLAHE
+    "word": {"conf": 0.75, "upscale": 640, "enhance": True,
+             "roi": "left", "roi_size": 360, "roi_margin": 40},
+}
+DISPLAY_SIZE = (720, 405)
+
+
+def peak_rss_mb():
+    """Process'in şimdiye kadarki en yüksek RSS'i (MB)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux KB, macOS byte döndürür
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        except ImportError:
+            return None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def roi_box(frame_shape, profile):
+    """Uygulamadaki ekran ROI'sinin ham karedeki karşılığı (ayna hesaba katılmış)."""
+    h, w = frame_shape[:2]
+    size = min(profile["roi_size"], h, w)
+    if profile["roi"] == "center":
+        x1 = (w - size) // 2
+    else:
+        # ekranda solda olan kutu, aynasız karede sağdadır
+        x1 = w - profile.get("roi_margin", 0) - size
+    y1 = (h - size) // 2
+    return x1, y1, x1 + size, y1 + size
+
+
+def read_gt_class(label_path):
+    """YOLO etiket dosyasındaki ilk kutunun sınıfı (yoksa None)."""
+    try:
+        with open(label_path) as f:
+            for line in f:
+                parts = line.split()
+                if parts:
+                    return int(parts[0])
+    except OSError:
+        pass
+    return None
+
+
+def list_split(split, root="dataset"):
+    img_dir = Path(root) / split / "images"
+    lbl_dir = Path(root) / split / "labels"
+    items = []
+    for p in sorted(img_dir.iterdir()):
+        if p.suffix.lower() in IMAGE_EXTS:
+            items.append((str(p), read_gt_class(lbl_dir / (p.stem + ".txt"))))
+    return items
+
+
+class Renderer:
+    """Ekrana basma maliyeti: ayna + kutu + Tk için boyutlandırma/RGBA."""
+
+    def __init__(self, size=DISPLAY_SIZE):
+        self.mirror = MirrorDisplay(mirror=True)
+        self.size = size
+        w, h = size
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._rgba = np.empty((h, w, 4), dtype=np.uint8)
+
+    def __call__(self, frame, det, box):
+        show = self.mirror(frame)
+        x1, y1, x2, y2 = box
+        w = frame.shape[1]
+        cv2.rectangle(show, (w - x2, y1), (w - x1, y2), (0, 255, 0), 2)
+        if det is not None:
+            draw_detection(show, det.mirrored(x2 - x1), offset=(w - x2, y1))
+        cv2.resize(show, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2RGBA, dst=self._rgba)
+
+
+class StageTimer:
+    def __init__(self):
+        self.times = {s: [] for s in STAGES}
+        self._t = None
+
+    def start(self):
+        self._t = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.times[stage].append(now - self._t)
+        self._t = now
+
+    def summary(self):
+        out = {}
+        for stage, vals in self.times.items():
+            if not vals:
+                continue
+            ms = np.asarray(vals) * 1000
+            out[stage] = {
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "mean_ms": float(ms.mean()),
+            }
+        return out
+
+
+def run_frame(engine, frame, box, timer, renderer):
+    x1, y1, x2, y2 = box
+    x, sx, sy = engine.preprocess(frame[y1:y2, x1:x2])
+    timer.lap("preprocess")
+    results = engine.infer([x])
+    timer.lap("inference")
+    det = engine.postprocess(results, [(sx, sy)])[0].best()
+    timer.lap("postprocess")
+    renderer(frame, det, box)
+    timer.lap("render")
+    return det
+
+
+def bench_images(engine, items, names):
+    """Veri seti resimleri: resmin tamamı ROI kabul edilir (zaten el kırpılmış).
+
+    items: (yol, sınıf) ya da dataset_cache'ten (hazır resim, sınıf) çiftleri.
+    """
+    timer = StageTimer()
+    renderer = Renderer()
+    correct = detected = labelled = 0
+
+    t_all = time.perf_counter()
+    for path, gt in items:
+        timer.start()
+        frame = cv2.imread(path) if isinstance(path, str) else path
+        timer.lap("decode")
+        if frame is None:
+            continue
+        h, w = frame.shape[:2]
+        det = run_frame(engine, frame, (0, 0, w, h), timer, renderer)
+
+        if gt is not None:
+            labelled += 1
+            if det is not None:
+                detected += 1
+                correct += det.label == names[gt]
+    elapsed = time.perf_counter() - t_all
+
+    return {
+        "frames": len(items),
+        "fps": len(items) / elapsed if elapsed > 0 else 0.0,
+        "stages": timer.summary(),
+        "accuracy": {
+            "labelled": labelled,
+            "top1": correct / labelled if labelled else None,
+            "detection_rate": detected / labelled if labelled else None,
+        },
+    }
+
+
+def bench_video(engine, path, profile, max_frames=None):
+    """Kayıtlı video: kareler canlı uygulamadaki gibi ROI'den geçer."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {"error": f"açılamadı: {path}"}
+
+    timer = StageTimer()
+    renderer = Renderer()
+    n = 0
+    t_all = time.perf_counter()
+    while max_frames is None or n < max_frames:
+        timer.start()
+        ok, frame = cap.read()
+        if not ok:
+            break
+        timer.lap("decode")
+        run_frame(engine, frame, roi_box(frame.shape, profile), timer, renderer)
+        n += 1
+    elapsed = time.perf_counter() - t_all
+    cap.release()
+
+    return {
+        "frames": n,
+        "fps": n / elapsed if elapsed > 0 else 0.0,
+        "stages": timer.summary(),
+    }
+
+
+# Soğuk açılış process'i: benchmark.py'nin kendi import'ları ölçüme
+# karışmasın diye ayrı bir -c betiği. import_s = inference + seçilen
+# backend'in gerçekten yüklediği modüller; gerisi _cold_child'da.
+_COLD_CHILD = """\
+import sys, time
+sys.path.insert(0, sys.argv[1])
+t0 = time.perf_counter()
+import inference
+inference.import_backend(sys.argv[3], sys.argv[2])
+t_import = time.perf_counter()
+import benchmark
+benchmark._cold_child(t0, t_import, *sys.argv[2:])
+"""
+
+
+def _cold_child(t0, t_import, model, backend, conf, image=""):
+    """Yeni process'te çalışır: (import) -> yükleme -> ısınma -> ilk tahmin."""
+    t_start = time.perf_counter()  # benchmark.py import'u ölçüme girmez
+    engine = InferenceEngine(model, conf=float(conf), backend=backend, warmup=False)
+    t_load = time.perf_counter()
+    engine.warmup()
+    t_warm = time.perf_counter()
+    frame = cv2.imread(image) if image else None
+    if frame is None:
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    engine.predict(frame)
+    t_first = time.perf_counter()
+    engine.predict(frame)
+    t_second = time.perf_counter()
+    print(json.dumps({
+        "backend": engine.backend,
+        "import_s": t_import - t0,
+        "load_s": t_load - t_start,
+        "warmup_s": t_warm - t_load,
+        "first_predict_s": t_first - t_warm,
+        "second_predict_s": t_second - t_first,
+        "to_first_prediction_s": (t_import - t0) + (t_first - t_start),
+    }))
+
+
+def cold_start(model, backend, image, conf, runs=1):
+    """Soğuk açılıştan ilk tahmine kadar geçen süre (her ölçüm ayrı process).
+
+    process_s: Python'un açılışı ve script import'ları dahil toplam süre.
+    """
+    cmd = [sys.executable, "-c", _COLD_CHILD, os.path.dirname(os.path.abspath(__file__)),
+           model, backend, str(conf), image or ""]
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - t0
+        lines = proc.stdout.strip().splitlines()
+        if proc.returncode != 0 or not lines:
+            return {"error": (proc.stderr.strip().splitlines() or ["?"])[-1]}
+        r = json.loads(lines[-1])
+        r["process_s"] = elapsed
+        out.append(r)
+    keys = [k for k in out[0] if k.endswith("_s")]
+    summary = {k: float(np.median([r[k] for r in out])) for k in keys}
+    summary["backend"] = out[0]["backend"]
+    summary["runs"] = runs
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Uçtan uca gecikme / throughput ölçümü (veri seti + video), JSON çıktı.")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="app")
+    ap.add_argument("--splits", nargs="*", default=list(SPLITS))
+    ap.add_argument("--video", default=None, help="kayıtlı video dosyası")
+    ap.add_argument("--limit", type=int, default=None, help="split/video başına en fazla kare")
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--cache", action="store_true",
+                    help="resimleri JPEG yerine dataset_cache memmap'inden oku")
+    ap.add_argument("--cold-runs", type=int, default=1,
+                    help="soğuk açılış ölçümü sayısı (0 = ölçme)")
+    ap.add_argument("-o", "--out", default=None,
+                    help="JSON dosyası (varsayılan runs/benchmark/<zaman>.json)")
+    args = ap.parse_args()
+
+    profile = PROFILES[args.profile]
+
+    cold = None
+    if args.cold_runs > 0:
+        # ayrı process'te, bu process modeli yüklemeden önce ölçülür
+        # (CPU'yu paylaşmasınlar)
+        first_items = next((list_split(s)[:1] for s in args.splits), [])
+        image = first_items[0][0] if first_items else None
+        print(f" soğuk açılış ({args.cold_runs}x)...")
+        cold = cold_start(args.model, args.backend, image, profile["conf"],
+                          args.cold_runs)
+
+    engine = InferenceEngine(args.model, conf=profile["conf"],
+                             upscale=profile["upscale"],
+                             enhance=profile["enhance"],
+                             backend=args.backend, warmup=False)
+    engine.warmup(args.warmup)
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "model": engine.model_path,
+            "backend": engine.backend,
+            "profile": args.profile,
+            "dataset_cache": args.cache,
+        },
+        "cold_start": cold,
+        "runs": {},
+    }
+
+    for split in args.splits:
+        if args.cache:
+            items = list(dataset_cache.load(split).items(args.limit))
+        else:
+            items = list_split(split)[:args.limit]
+        print(f" {split}: {len(items)} resim")
+        report["runs"][split] = bench_images(engine, items, engine.names)
+
+    if args.video:
+        print(f" video: {args.video}")
+        report["runs"]["video"] = bench_video(engine, args.video, profile,
+                                              args.limit)
+
+    report["meta"]["peak_rss_mb"] = peak_rss_mb()
+
+    out = Path(args.out) if args.out else \
+        Path("runs/benchmark") / time.strftime("bench_%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    for name, run in report["runs"].items():
+        if "error" in run:
+            print(f"{name}: {run['error']}")
+            continue
+        line = f"{name:<7} {run['fps']:6.1f} fps"
+        acc = run.get("accuracy", {}).get("top1")
+        if acc is not None:
+            line += f"  top1 {acc * 100:5.1f}%"
+        print(line)
+        for stage, st in run["stages"].items():
+            print(f"   {stage:<12} p50 {st['p50_ms']:7.2f}  p95 {st['p95_ms']:7.2f}  "
+                  f"p99 {st['p99_ms']:7.2f} ms")
+    if cold and "error" not in cold:
+        print(f" soğuk açılış -> ilk tahmin: {cold['to_first_prediction_s']:.2f} s "
+              f"(import {cold['import_s']:.2f}, yükleme {cold['load_s']:.2f}, "
+              f"ısınma {cold['warmup_s']:.2f}, ilk {cold['first_predict_s'] * 1000:.0f} ms; "
+              f"process {cold['process_s']:.2f} s)")
+    elif cold:
+        print(f" soğuk açılış: {cold['error']}")
+    print(f" peak RSS: {report['meta']['peak_rss_mb']:.0f} MB" if
+          report["meta"]["peak_rss_mb"] else " peak RSS: -")
+    print(f" -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Kamera açılırken mod seçimi (sources.open_capture). False: sürücü varsayılanları
+AUTO = True
+PROFILE_PATH = "runs/camera_profiles.json"   # seçilen mod, bir sonraki açılışta direkt kullanılır
+
+# Denenecek çözünürlükler (küçükten büyüğe denenir, ROI'yi kapsayan ilki alınır)
+SIZES = ((320, 240), (424, 240), (640, 360), (640, 480), (800, 600),
+         (960, 540), (1280, 720), (1920, 1080))
+FOURCCS = ("MJPG", "YUYV")   # tercih sırası; sonrakiler CPU'da %25 cezalı karşılaştırılır
+FOURCC_PENALTY = 0.25
+DEFAULT_MIN_SIZE = (640, 480)
+BUFFER_SIZE = 1              # sürücü tamponu: bayat kare birikmesin
+TARGET_FPS = 30
+MEASURE_FRAMES = 20          # FPS / CPU ölçümünde okunan kare
+FPS_TOL = 0.9                # en iyinin bu oranı kadar FPS verenler eşit sayılır
+
+
+@dataclass
+class CameraMode:
+    fourcc: str
+    width: int
+    height: int
+    fps: float = 0.0         # ölçülen (istenen değil)
+    cpu_ms: float = 0.0      # kare başına read() CPU süresi
+    buffer: int = 0          # 0 = sürücü BUFFERSIZE'ı kabul etmedi
+
+
+def fourcc_str(value):
+    """cap.get(CAP_PROP_FOURCC) -> "MJPG" ("" = bilinmiyor)."""
+    v = int(value)
+    s = "".join(chr((v >> 8 * i) & 0xFF) for i in range(4))
+    return s if v and s.isprintable() else ""
+
+
+def required_size(roi, margin_x=0, margin_y=0):
+    """Kare ROI'yi (kenar + kenar boşlukları) kapsayan en küçük (w, h)."""
+    return int(roi + margin_x), int(roi + margin_y)
+
+
+def apply_mode(cap, fourcc, width, height, fps=TARGET_FPS, buffer=BUFFER_SIZE):
+    """Modu sürücüden ister; gerçekte verilen (fourcc, w, h, buffer) ya da None.
+
+    Sürücüler desteklemedikleri boyutu en yakın moda yuvarlar, bu yüzden
+    sonuç bir kare okunarak doğrulanır. FOURCC boyuttan önce verilmeli.
+    """
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    buf_ok = cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer)
+    ok, frame = cap.read()
+    if not ok or frame is None:
+        return None
+    h, w = frame.shape[:2]
+    return fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)), w, h, buffer if buf_ok else 0
+
+
+def measure(cap, n=MEASURE_FRAMES, warmup=2):
+    """Gerçekten gelen FPS ve kare başına read() CPU süresi (ms)."""
+    for _ in range(warmup):
+        cap.read()
+    t0, c0 = time.perf_counter(), time.thread_time()
+    got = 0
+    for _ in range(n):
+        ok, _ = cap.read()
+        if not ok:
+            break
+        got += 1
+    wall = time.perf_counter() - t0
+    cpu = time.thread_time() - c0
+    if not got:
+        return 0.0, 0.0
+    return got / wall if wall > 0 else 0.0, cpu / got * 1000
+
+
+def negotiate(cap, min_size=DEFAULT_MIN_SIZE, fourccs=FOURCCS, sizes=SIZES,
+              measure_frames=MEASURE_FRAMES):
+    """Her FOURCC için ROI'yi kapsayan en küçük modu bulur, ölçer ve seçer.
+
+    Önce FPS (en iyinin FPS_TOL'u içindekiler), sonra kare başına CPU;
+    FOURCCS'ta sonra gelenler FOURCC_PENALTY kadar cezalı. Seçilen mod
+    kamerada açık bırakılır. Hiçbiri olmazsa None.
+    """
+    min_w, min_h = min_size
+    fits = sorted((s for s in sizes if s[0] >= min_w and s[1] >= min_h),
+                  key=lambda s: s[0] * s[1]) or [max(sizes, key=lambda s: s[0] * s[1])]
+    found = []
+    for fourcc in fourccs:
+        for w, h in fits:
+            got = apply_mode(cap, fourcc, w, h)
+            if got is None:
+                continue
+            got_fourcc, gw, gh, buffer = got
+            if got_fourcc and got_fourcc != fourcc:
+                break  # sürücü bu FOURCC'yi vermiyor
+            if gw < min_w or gh < min_h:
+                continue  # daha küçüğe yuvarlandı, bir büyüğünü dene
+            fps, cpu_ms = measure(cap, measure_frames)
+            found.append(CameraMode(fourcc, gw, gh, round(fps, 1), round(cpu_ms, 3), buffer))
+            break
+    if not found:
+        return None
+
+    top = max(m.fps for m in found)
+    ok = [m for m in found if m.fps >= top * FPS_TOL]
+    best = min(ok, key=lambda m: m.cpu_ms * (1 + FOURCC_PENALTY * fourccs.index(m.fourcc)))
+    if best is not found[-1]:
+        apply_mode(cap, best.fourcc, best.width, best.height)
+    return best
+
+
+def _backend(cap):
+    try:
+        return cap.getBackendName()
+    except (AttributeError, cv2.error):
+        return "?"
+
+
+def profile_key(index, cap, min_size):
+    return f"{_backend(cap)}:{index}@{min_size[0]}x{min_size[1]}"
+
+
+def load_profiles(path=PROFILE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_profile(key, mode, path=PROFILE_PATH):
+    profiles = load_profiles(path)
+    profiles[key] = {**asdict(mode), "measured": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(profiles, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def configure(cap, index=0, min_size=None, path=PROFILE_PATH, renegotiate=False):
+    """Kamerayı kayıtlı profile göre ayarlar; profil yoksa / tutmazsa pazarlık eder.
+
+    Kayıtlı mod uygulanıp aynı FOURCC ve boyut geliyorsa ölçüm yapılmaz
+    (hızlı açılış); sürücü sessizce başka FOURCC'ye düştüyse yeniden ölçülür. Seçilen CameraMode'u döndürür; hiçbir mod olmazsa sadece
+    BUFFERSIZE ayarlanır ve None döner.
+    """
+    min_size = tuple(min_size or DEFAULT_MIN_SIZE)
+    key = profile_key(index, cap, min_size)
+    saved = None if renegotiate else load_profiles(path).get(key)
+    if saved:
+        mode = CameraMode(**{k: saved[k] for k in CameraMode.__dataclass_fields__})
+        got = apply_mode(cap, mode.fourcc, mode.width, mode.height)
+        if got is not None and got[1:3] == (mode.width, mode.height) \
+                and got[0] in ("", mode.fourcc):  # "" = sürücü FOURCC bildirmiyor
+            return mode
+
+    mode = negotiate(cap, min_size)
+    if mode is None:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, BUFFER_SIZE)
+        return None
+    save_profile(key, mode, path)
+    return mode
+
+
+# Tipik bir USB kamera: MJPG her boyutta 30 FPS, YUYV büyük boyutta bant
+# genişliği yüzünden yavaş
+FAKE_MODES = (
+    ("MJPG", 320, 240, 30), ("MJPG", 640, 360, 30), ("MJPG", 640, 480, 30),
+    ("MJPG", 1280, 720, 30), ("MJPG", 1920, 1080, 30),
+    ("YUYV", 320, 240, 30), ("YUYV", 640, 360, 30), ("YUYV", 640, 480, 30),
+    ("YUYV", 1280, 720, 10), ("YUYV", 1920, 1080, 5),
+)
+FAKE_CPU_MS = {"MJPG": 0.8, "YUYV": 0.4}   # 640x480 başına yapay çözme süresi
+
+
+class FakeCamera:
+    """Kamerasız testler için VideoCapture yerine geçen sahte kamera.
+
+    Sürücü gibi davranır: desteklenmeyen FOURCC'yi yok sayar, boyutu
+    desteklenen en yakın moda yuvarlar, read() o moddaki FPS'te kare verir
+    ve piksel sayısıyla orantılı CPU harcar. Varsayılan açılış modu
+    büyük YUYV'dir (çoğu sürücünün varsayılanı gibi).
+    """
+
+    def __init__(self, modes=FAKE_MODES, cpu_ms=None, buffer_ok=True, realtime=True,
+                 start=("YUYV", 1280, 720)):
+        self.modes = [tuple(m) for m in modes]
+        self.cpu_ms = dict(FAKE_CPU_MS if cpu_ms is None else cpu_ms)
+        self.buffer_ok = buffer_ok
+        self.realtime = realtime
+        self.fourcc, self.req_w, self.req_h = start
+        self.buffer = 4
+        self.frames = 0
+        self._next_t = None
+        self._opened = True
+
+    def getBackendName(self):
+        return "FAKE"
+
+    def isOpened(self):
+        return self._opened
+
+    def mode(self):
+        """Şu anki (fourcc, w, h, fps)."""
+        same = [m for m in self.modes if m[0] == self.fourcc]
+        return min(same, key=lambda m: abs(m[1] - self.req_w) + abs(m[2] - self.req_h))
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FOURCC:
+            name = fourcc_str(value)
+            if any(m[0] == name for m in self.modes):
+                self.fourcc = name
+                return True
+            return False
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.req_w = int(value)
+            return True
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.req_h = int(value)
+            return True
+        if prop == cv2.CAP_PROP_BUFFERSIZE:
+            if self.buffer_ok:
+                self.buffer = int(value)
+            return self.buffer_ok
+        return prop == cv2.CAP_PROP_FPS
+
+    def get(self, prop):
+        fourcc, w, h, fps = self.mode()
+        if prop == cv2.CAP_PROP_FOURCC:
+            return float(cv2.VideoWriter_fourcc(*fourcc))
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(w)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(h)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(fps)
+        if prop == cv2.CAP_PROP_BUFFERSIZE:
+            return float(self.buffer)
+        return 0.0
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+        fourcc, w, h, fps = self.mode()
+        if self.realtime:
+            now = time.perf_counter()
+            self._next_t = max(now, (self._next_t or now) + 1.0 / fps)
+            time.sleep(max(0.0, self._next_t - now))
+        # yapay çözme işi (thread CPU süresine yansısın)
+        end = time.thread_time() + self.cpu_ms.get(fourcc, 0.0) * w * h / (640 * 480) / 1000
+        while time.thread_time() < end:
+            pass
+        if image is None or image.shape != (h, w, 3):
+            image = np.empty((h, w, 3), dtype=np.uint8)
+        image[...] = (self.frames * 7) % 256
+        self.frames += 1
+        return True, image
+
+    def release(self):
+        self._opened = False
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Kamera modu seçimi: ROI'yi kapsayan en küçük çözünürlük, "
+                    "MJPG/YUYV, küçük tampon; ölçülen FPS ile kaydeder.")
+    ap.add_argument("--camera", type=int, default=0)
+    ap.add_argument("--fake", action="store_true", help="gerçek kamera yerine FakeCamera")
+    ap.add_argument("--min-size", type=int, nargs=2, default=list(DEFAULT_MIN_SIZE),
+                    metavar=("W", "H"))
+    ap.add_argument("--renegotiate", action="store_true",
+                    help="kayıtlı profili yok say, yeniden ölç")
+    ap.add_argument("--profiles", default=PROFILE_PATH)
+    args = ap.parse_args()
+
+    cap = FakeCamera() if args.fake else cv2.VideoCapture(args.camera)
+    if not cap.isOpened():
+        raise SystemExit("Kamera açılamadı.")
+    before = (fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)),
+              int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    t0 = time.perf_counter()
+    mode = configure(cap, args.camera, args.min_size, args.profiles, args.renegotiate)
+    took = time.perf_counter() - t0
+    print(f" varsayılan: {before[0] or '?'} {before[1]}x{before[2]}")
+    if mode is None:
+        print(" uygun mod bulunamadı (sadece BUFFERSIZE ayarlandı)")
+    else:
+        print(f" seçilen:    {mode.fourcc} {mode.width}x{mode.height}  {mode.fps:.1f} FPS  "
+              f"{mode.cpu_ms:.2f} ms/kare CPU  buffer={mode.buffer or 'sürücü'}  "
+              f"({took:.2f} s)")
+    cap.release()
+
+
+if __name__ == "__main__":
+    main()
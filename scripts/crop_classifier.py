@@ -0,0 +1,226 @@
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+from hand_tracker import square_box
+from inference import Prediction
+from profiling import NULL_PROFILER
+
+DATA_YAML = "dataset/data.yaml"
+CLS_DATA = "dataset_cls"          # export_crops çıktısı (ultralytics classify düzeni)
+CLS_MODEL_PATH = "runs/asl_cls/weights/best.pt"
+CLS_IMGSZ = 128
+CROP_PAD = 0.15                   # kutunun her yanına eklenen pay (kenar oranı)
+REFRESH_EVERY = 5                 # dedektör en az bu kadar karede bir çalışır
+MIN_CONF = 0.5                    # sınıflandırıcı bunun altına düşerse kutu tazelenir
+DETECT_CONF = 0.25                # el kutusu için dedektör eşiği (harf eşiğinden bağımsız)
+TOPK = 5
+
+# dataset split'i -> ultralytics classify klasörü
+_SPLIT_DIRS = {"train": "train", "valid": "val", "test": "test"}
+
+
+def crop_box(box, width, height, pad=CROP_PAD):
+    """Eğitimde ve çalışırken aynı kırpma: pay bırakılmış kare kutu."""
+    x1, y1, x2, y2 = box
+    return square_box(x1, y1, x2, y2, width, height, pad=pad, min_side=0)
+
+
+def export_crops(root="dataset", out=CLS_DATA, data=DATA_YAML, pad=CROP_PAD):
+    """YOLO etiketlerindeki her kutuyu kırpıp out/<split>/<harf>/ altına yazar."""
+    with open(data, encoding="utf-8") as f:
+        names = yaml.safe_load(f)["names"]
+    counts = {}
+    for split, sub in _SPLIT_DIRS.items():
+        img_dir = Path(root) / split / "images"
+        lbl_dir = Path(root) / split / "labels"
+        if not img_dir.is_dir():
+            continue
+        n = 0
+        for img_path in sorted(img_dir.iterdir()):
+            lbl_path = lbl_dir / (img_path.stem + ".txt")
+            if not lbl_path.exists():
+                continue
+            img = cv2.imread(str(img_path))
+            if img is None:
+                continue
+            h, w = img.shape[:2]
+            for k, line in enumerate(lbl_path.read_text().splitlines()):
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                c = int(parts[0])
+                cx, cy, bw, bh = (float(v) for v in parts[1:5])
+                box = (int((cx - bw / 2) * w), int((cy - bh / 2) * h),
+                       int((cx + bw / 2) * w), int((cy + bh / 2) * h))
+                x1, y1, x2, y2 = crop_box(box, w, h, pad)
+                if x2 <= x1 or y2 <= y1:
+                    continue
+                dst = Path(out) / sub / names[c]
+                dst.mkdir(parents=True, exist_ok=True)
+                cv2.imwrite(str(dst / f"{img_path.stem}_{k}.jpg"), img[y1:y2, x1:x2])
+                n += 1
+        counts[sub] = n
+        print(f" {sub}: {n} crop -> {Path(out) / sub}")
+    return counts
+
+
+def train_classifier(data=CLS_DATA, model="yolov8n-cls.pt", imgsz=CLS_IMGSZ,
+                     epochs=30, batch=64, name="asl_cls"):
+    from ultralytics import YOLO
+
+    YOLO(model).train(data=data, imgsz=imgsz, epochs=epochs, batch=batch,
+                      project="runs", name=name, exist_ok=True)
+    return Path("runs") / name / "weights" / "best.pt"
+
+
+class CropClassifier:
+    """El crop'undan harf olasılıkları (ultralytics classify modeli)."""
+
+    def __init__(self, model_path=CLS_MODEL_PATH, imgsz=None, warmup=True):
+        from ultralytics import YOLO
+
+        self.model_path = model_path
+        self.model = YOLO(model_path, task="classify")
+        self.names = self.model.names
+        self.imgsz = int(imgsz or self.model.overrides.get("imgsz") or CLS_IMGSZ)
+        if warmup:
+            self.classify(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+
+    def classify_many(self, crops):
+        """(n, sınıf sayısı) float32 olasılıklar."""
+        results = self.model.predict(list(crops), imgsz=self.imgsz, verbose=False)
+        return np.stack([r.probs.data.cpu().numpy().astype(np.float32)
+                         for r in results])
+
+    def classify(self, crop):
+        return self.classify_many([crop])[0]
+
+
+class TwoStageEngine:
+    """Dedektör sadece el kutusunu bulur/tazeler, harfi crop sınıflandırıcısı verir.
+
+    Kutu refresh_every karede bir, görüntü boyutu değişince ya da
+    sınıflandırıcının güveni min_conf'un altına düşünce tazelenir; aradaki
+    karelerde sadece küçük crop sınıflandırılır. predict() InferenceEngine
+    ile aynı Prediction'ı döndürür (aynı kutuda top-k harf), böylece
+    uygulamalar değişmeden kullanır. predict() durumludur: her görüntü
+    akışına bir tane; ilgisiz resimler için predict_many kullanılır.
+    """
+
+    def __init__(self, detector, classifier, refresh_every=REFRESH_EVERY,
+                 min_conf=MIN_CONF, pad=CROP_PAD, topk=TOPK,
+                 detect_conf=DETECT_CONF, profiler=None):
+        self.detector = detector
+        self.detect_conf = detect_conf
+        self.classifier = classifier
+        self.refresh_every = refresh_every
+        self.min_conf = min_conf
+        self.pad = pad
+        self.topk = topk
+        self.prof = profiler or NULL_PROFILER
+        self.conf = detector.conf
+        self.names = classifier.names
+        self.detections = 0
+        self.frames = 0
+        self.reset()
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+    def reset(self):
+        self.box = None
+        self._shape = None
+        self._since = 0
+        self._last_conf = 1.0
+
+    def _refresh(self, bgr):
+        self.detections += 1
+        with self.prof.stage("detect"):
+            det = self.detector.predict(bgr, conf=self.detect_conf).best()
+        self._since = 0
+        self._shape = bgr.shape
+        self.box = det.box if det is not None else None
+
+    def predict(self, bgr, conf=None):
+        if isinstance(bgr, str):
+            bgr = cv2.imread(bgr)
+        if bgr is None:
+            return None
+        conf = self.conf if conf is None else conf
+        self.frames += 1
+
+        self._since += 1
+        if self.box is None or bgr.shape != self._shape \
+                or self._since >= self.refresh_every or self._last_conf < self.min_conf:
+            self._refresh(bgr)
+        if self.box is None:
+            return Prediction(np.zeros((0, 4), np.float32), np.zeros(0, np.float32),
+                              np.zeros(0, np.int32), self.names)
+
+        h, w = bgr.shape[:2]
+        x1, y1, x2, y2 = crop_box(self.box, w, h, self.pad)
+        with self.prof.stage("classify"):
+            probs = self.classifier.classify(bgr[y1:y2, x1:x2])
+        self._last_conf = float(probs.max())
+
+        k = min(self.topk, len(probs))
+        idx = np.argpartition(-probs, k - 1)[:k]
+        idx = idx[np.argsort(-probs[idx])]
+        idx = idx[probs[idx] >= conf]
+        boxes = np.tile(np.asarray(self.box, dtype=np.float32), (len(idx), 1))
+        return Prediction(boxes, probs[idx].astype(np.float32),
+                          idx.astype(np.int32), self.names)
+
+    def predict_many(self, images, conf=None):
+        """Birbirinden bağımsız resimler: her biri için kutu baştan bulunur.
+
+        Akıştaki kutu durumu (predict) bozulmasın diye önce saklanır,
+        sonra geri konur.
+        """
+        state = (self.box, self._shape, self._since, self._last_conf)
+        out = []
+        for img in images:
+            self.reset()
+            out.append(self.predict(img, conf=conf))
+        self.box, self._shape, self._since, self._last_conf = state
+        return out
+
+
+def make_two_stage(detector, model_path=CLS_MODEL_PATH, profiler=None, **kwargs):
+    """Sınıflandırıcı ağırlıkları varsa TwoStageEngine, yoksa dedektörün kendisi."""
+    if not Path(model_path).exists():
+        print(f" Sınıflandırıcı yok ({model_path}), sadece dedektör kullanılıyor. "
+              f"crop_classifier.py export + train ile üretilir.")
+        return detector
+    return TwoStageEngine(detector, CropClassifier(model_path), profiler=profiler,
+                          **kwargs)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="YOLO etiketlerinden el crop'ları çıkarır ve küçük bir harf "
+                    "sınıflandırıcısı eğitir (iki aşamalı mod için).")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("export", help="crop'ları dataset_cls/ altına yaz")
+    p.add_argument("--root", default="dataset")
+    p.add_argument("--out", default=CLS_DATA)
+    p.add_argument("--pad", type=float, default=CROP_PAD)
+    p = sub.add_parser("train", help="yolov8n-cls eğit")
+    p.add_argument("--data", default=CLS_DATA)
+    p.add_argument("--model", default="yolov8n-cls.pt")
+    p.add_argument("--imgsz", type=int, default=CLS_IMGSZ)
+    p.add_argument("--epochs", type=int, default=30)
+    p.add_argument("--batch", type=int, default=64)
+    args = ap.parse_args()
+
+    if args.cmd == "export":
+        export_crops(args.root, args.out, pad=args.pad)
+    else:
+        print(f" -> {train_classifier(args.data, args.model, args.imgsz, args.epochs, args.batch)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+DATASET_DIR = "dataset"
+SPLITS = ("train", "valid", "test")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+IMG_SIZE = 640            # train.py'deki imgsz ile aynı olmalı
+CACHE_DIR = ".cache"      # dataset/.cache/<split>_<size>.npy + .json
+VERSION = 1
+
+
+def cache_paths(split, root=DATASET_DIR, size=IMG_SIZE):
+    base = Path(root) / CACHE_DIR / f"{split}_{size}"
+    return base.with_suffix(".npy"), base.with_suffix(".json")
+
+
+def list_files(split, root=DATASET_DIR):
+    img_dir = Path(root) / split / "images"
+    if not img_dir.is_dir():
+        return []
+    return sorted(p.name for p in img_dir.iterdir()
+                  if p.suffix.lower() in IMAGE_EXTS)
+
+
+def label_path(root, split, name):
+    return Path(root) / split / "labels" / (Path(name).stem + ".txt")
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    return st.st_mtime_ns, st.st_size
+
+
+def _sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def read_labels(path):
+    """YOLO etiket dosyası -> (k, 5) float32 [sınıf, cx, cy, w, h] (normalize)."""
+    rows = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 5:
+                    rows.append([float(v) for v in parts[:5]])
+    except OSError:
+        pass
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 5)
+
+
+def resized_hw(h0, w0, size):
+    """ultralytics'in rect modundaki gibi: uzun kenar size olur."""
+    r = size / max(h0, w0)
+    return min(size, int(np.ceil(h0 * r))), min(size, int(np.ceil(w0 * r)))
+
+
+class CachedSplit:
+    """Bir split'in memmap'li hali; resimler kopyasız NumPy görünümü.
+
+    images: (N, size, size, 3) uint8 BGR, her resim sol üst köşede hw boyutunda
+    hw0:    (N, 2) orijinal (h, w)
+    labels: resim başına (k, 5) float32 YOLO etiketleri
+    classes: resim başına ilk kutunun sınıfı (-1 = etiketsiz)
+    """
+
+    def __init__(self, npy_path, index, root=DATASET_DIR, mode="r"):
+        self.npy_path = str(npy_path)
+        self.mode = mode
+        self.images = np.load(self.npy_path, mmap_mode=mode)
+        self.index = index
+        self.split = index["split"]
+        self.size = index["size"]
+        img_dir = Path(root) / self.split / "images"
+        items = index["items"]
+        self.files = [str(img_dir / it["file"]) for it in items]
+        self.hw0 = np.array([it["hw0"] for it in items], dtype=np.int32).reshape(-1, 2)
+        self.hw = np.array([it["hw"] for it in items], dtype=np.int32).reshape(-1, 2)
+        self.labels = [np.asarray(it["labels"], dtype=np.float32).reshape(-1, 5)
+                       for it in items]
+        self.classes = np.array([int(lb[0, 0]) if len(lb) else -1
+                                 for lb in self.labels], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __getstate__(self):
+        # worker process'lerine dizi değil dosya yolu gider, orada tekrar açılır
+        state = self.__dict__.copy()
+        state["images"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.images = np.load(self.npy_path, mmap_mode=self.mode)
+
+    def image(self, i):
+        """i. resim (kopyasız görünüm)."""
+        h, w = self.hw[i]
+        return self.images[i, :h, :w]
+
+    def __getitem__(self, i):
+        return self.image(i)
+
+    def items(self, limit=None):
+        """(resim, ilk sınıf ya da None) çiftleri, benchmark.list_split gibi."""
+        n = len(self) if limit is None else min(limit, len(self))
+        for i in range(n):
+            c = int(self.classes[i])
+            yield self.image(i), (c if c >= 0 else None)
+
+    def find(self, path):
+        """Resim yolundan satır numarası (yoksa None)."""
+        if not hasattr(self, "_by_name"):
+            self._by_name = {Path(f).name: i for i, f in enumerate(self.files)}
+        return self._by_name.get(Path(path).name)
+
+
+def _read_index(json_path):
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def check(split, root=DATASET_DIR, size=IMG_SIZE):
+    """Cache durumunu döndürür: (durum, değişen satırlar, index, dokunulan sayısı).
+
+    durum: "ok" | "update" (bazı dosyalar değişti) | "rebuild" | "missing"
+    Önce mtime + boyut karşılaştırılır; farklı olan dosyanın içeriği
+    hash'lenir, hash aynıysa (sadece dokunulmuşsa) değişmiş sayılmaz.
+    """
+    npy_path, json_path = cache_paths(split, root, size)
+    index = _read_index(json_path)
+    if index is None or not npy_path.exists():
+        return "missing", [], None, 0
+    if index.get("version") != VERSION or index.get("size") != size \
+            or [it["file"] for it in index["items"]] != list_files(split, root):
+        return "rebuild", [], index, 0
+
+    img_dir = Path(root) / split / "images"
+    changed = []
+    touched = 0
+    for i, it in enumerate(index["items"]):
+        img = img_dir / it["file"]
+        lbl = label_path(root, split, it["file"])
+        dirty = False
+        if _stat(img) != (it["mtime_ns"], it["bytes"]):
+            dirty = _sha1(img.read_bytes()) != it["sha1"]
+        if not dirty and _stat(lbl) != (it["label_mtime_ns"], it["label_bytes"]):
+            data = lbl.read_bytes() if lbl.exists() else b""
+            dirty = _sha1(data) != it["label_sha1"]
+        stats = (_stat(img), _stat(lbl))
+        if dirty:
+            changed.append(i)
+        elif stats != ((it["mtime_ns"], it["bytes"]),
+                       (it["label_mtime_ns"], it["label_bytes"])):
+            # sadece dokunulmuş: yeni mtime'ı kaydet, bir dahaki sefere hash'lenmesin
+            it["mtime_ns"], it["bytes"] = stats[0]
+            it["label_mtime_ns"], it["label_bytes"] = stats[1]
+            touched += 1
+    return ("update" if changed else "ok"), changed, index, touched
+
+
+def _fill(images, root, split, name, i, size):
+    """Tek resmi çözüp memmap satırına yazar; index kaydını döndürür."""
+    img_path = Path(root) / split / "images" / name
+    lbl_path = label_path(root, split, name)
+    data = img_path.read_bytes()
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"resim okunamadı: {img_path}")
+    h0, w0 = img.shape[:2]
+    h, w = resized_hw(h0, w0, size)
+    if (h, w) != (h0, w0):
+        interp = cv2.INTER_LINEAR if h > h0 else cv2.INTER_AREA
+        img = cv2.resize(img, (w, h), interpolation=interp)
+    row = images[i]
+    row[:h, :w] = img
+    if h < size or w < size:
+        row[h:] = 0
+        row[:h, w:] = 0
+
+    label_data = lbl_path.read_bytes() if lbl_path.exists() else b""
+    mtime, nbytes = _stat(img_path)
+    lbl_mtime, lbl_bytes = _stat(lbl_path)
+    return {
+        "file": name, "mtime_ns": mtime, "bytes": nbytes, "sha1": _sha1(data),
+        "label_mtime_ns": lbl_mtime, "label_bytes": lbl_bytes,
+        "label_sha1": _sha1(label_data),
+        "hw0": [h0, w0], "hw": [h, w],
+        "labels": read_labels(lbl_path).tolist(),
+    }
+
+
+def _write_index(json_path, index):
+    tmp = json_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(index), encoding="utf-8")
+    os.replace(tmp, json_path)
+
+
+@contextmanager
+def _writable(npy_path, shape=None):
+    """Yazmak için memmap: shape verilirse yeni dosya, yoksa var olan (r+).
+
+    Blok bitince flush edilir ve eşleme hemen kapanır; dizi blok dışında
+    kullanılmamalı.
+    """
+    if shape is None:
+        images = np.load(npy_path, mmap_mode="r+")
+    else:
+        images = np.lib.format.open_memmap(npy_path, mode="w+", dtype=np.uint8,
+                                           shape=shape)
+    try:
+        yield images
+    finally:
+        images.flush()
+        images._mmap.close()
+
+
+def prepare(split, root=DATASET_DIR, size=IMG_SIZE, force=False, workers=None,
+            verbose=True):
+    """Split'i bir kere çözüp (N, size, size, 3) uint8 .npy'ye yazar.
+
+    Cache güncelse dokunulmaz; sadece bazı dosyalar değiştiyse o satırlar
+    yeniden yazılır. JPEG çözme thread'lerde yapılır (cv2 GIL'i bırakır).
+    """
+    npy_path, json_path = cache_paths(split, root, size)
+    status, changed, index, touched = ("rebuild", [], None, 0) if force \
+        else check(split, root, size)
+
+    if status == "ok":
+        if touched:
+            _write_index(json_path, index)  # dokunulmuş dosyaların yeni mtime'ı
+        return status
+    workers = workers or min(8, os.cpu_count() or 1)
+    t0 = time.perf_counter()
+
+    if status == "update":
+        shape = None
+        names = [index["items"][i]["file"] for i in changed]
+        rows = changed
+    else:
+        names = list_files(split, root)
+        if not names:
+            if verbose:
+                print(f" {split}: resim yok, atlandı")
+            return "missing"
+        npy_path.parent.mkdir(parents=True, exist_ok=True)
+        # yarıda kalırsa eski index yeni .npy'yi geçerli göstermesin
+        json_path.unlink(missing_ok=True)
+        shape = (len(names), size, size, 3)
+        rows = list(range(len(names)))
+        index = {"version": VERSION, "split": split, "size": size,
+                 "items": [None] * len(names)}
+
+    with _writable(npy_path, shape) as images, ThreadPoolExecutor(workers) as pool:
+        fill = partial(_fill, images, root, split, size=size)
+        entries = list(pool.map(fill, names, rows))
+    for i, entry in zip(rows, entries):
+        index["items"][i] = entry
+    _write_index(json_path, index)
+
+    if verbose:
+        mb = npy_path.stat().st_size / (1024 * 1024)
+        print(f" {split}: {len(rows)} resim yazıldı ({status}), "
+              f"{time.perf_counter() - t0:.1f} s, {mb:.0f} MB -> {npy_path}")
+    return status
+
+
+def load(split, root=DATASET_DIR, size=IMG_SIZE, mode="r", auto_prepare=True):
+    """Split'in memmap'ini açar (gerekirse önce hazırlar).
+
+    mode: "r" salt okunur, "c" kopyala-yaz (yazılan sayfalar sadece bu
+    process'te değişir; augmentation'ın yerinde değiştirdiği eğitim için).
+    """
+    if auto_prepare:
+        prepare(split, root, size, verbose=True)
+    npy_path, json_path = cache_paths(split, root, size)
+    index = _read_index(json_path)
+    if index is None or not npy_path.exists():
+        raise FileNotFoundError(f"cache yok: {npy_path} (dataset_cache.py ile hazırla)")
+    return CachedSplit(npy_path, index, root, mode)
+
+
+class _MemmapLoadImage:
+    """dataset.load_image yerine geçer (DataLoader worker'larına pickle'lanabilir)."""
+
+    def __init__(self, dataset, split_cache):
+        self.dataset = dataset
+        self.cache = split_cache
+        self.rows = [split_cache.find(f) for f in dataset.im_files]
+
+    def __call__(self, i, rect_mode=True):
+        ds, cache, j = self.dataset, self.cache, self.rows[i]
+        # kare olmayan resmi kareye germe (rect_mode=False) cache'te yok
+        if ds.ims[i] is None and j is not None \
+                and (rect_mode or cache.hw0[j][0] == cache.hw0[j][1]):
+            ds.ims[i] = cache.image(j)
+            ds.im_hw0[i] = tuple(int(v) for v in cache.hw0[j])
+            ds.im_hw[i] = tuple(int(v) for v in cache.hw[j])
+            if ds.augment:
+                ds.buffer.append(i)
+                if 1 < len(ds.buffer) >= ds.max_buffer_length:
+                    k = ds.buffer.pop(0)
+                    if getattr(ds, "cache", None) != "ram":
+                        ds.ims[k] = ds.im_hw0[k] = ds.im_hw[k] = None
+            return ds.ims[i], ds.im_hw0[i], ds.im_hw[i]
+        return type(ds).load_image(ds, i, rect_mode)
+
+
+def attach(dataset, split_cache):
+    """ultralytics dataset'inin resim okumasını memmap'e yönlendirir.
+
+    JPEG çözme ve büyütme yerine hazır satırın görünümü verilir; buffer
+    (mozaik için) ultralytics'in load_image'ı gibi tutulur. Cache'te
+    olmayan dosyalar eski yoldan okunur.
+    """
+    if split_cache.size != dataset.imgsz:
+        print(f" memmap cache {split_cache.size} px, eğitim {dataset.imgsz} px: kullanılmadı")
+        return dataset
+    loader = _MemmapLoadImage(dataset, split_cache)
+    dataset.load_image = loader
+    hits = sum(r is not None for r in loader.rows)
+    print(f" memmap cache: {hits}/{len(loader.rows)} resim ({split_cache.split})")
+    return dataset
+
+
+def memmap_trainer(root=DATASET_DIR, size=IMG_SIZE):
+    """Resimleri memmap cache'ten okuyan DetectionTrainer sınıfı.
+
+    model.train(..., trainer=memmap_trainer()) ile kullanılır.
+    """
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    splits = {}
+
+    class MemmapTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            dataset = super().build_dataset(img_path, mode, batch)
+            if not isinstance(img_path, (str, Path)):
+                return dataset
+            split = Path(img_path).parent.name
+            if split not in splits:
+                splits[split] = load(split, root, size, mode="c")
+            return attach(dataset, splits[split])
+
+    return MemmapTrainer
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Veri setini bir kere çözüp hedef boyutta memmap .npy'ye yazar "
+                    "(dataset/.cache). Değişen dosyalar mtime + hash ile bulunur.")
+    ap.add_argument("--root", default=DATASET_DIR)
+    ap.add_argument("--splits", nargs="+", default=list(SPLITS))
+    ap.add_argument("--size", type=int, default=IMG_SIZE)
+    ap.add_argument("--force", action="store_true", help="baştan yaz")
+    ap.add_argument("--check", action="store_true", help="sadece durumu yazdır")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    for split in args.splits:
+        if args.check:
+            status, changed, _, _ = check(split, args.root, args.size)
+            print(f" {split}: {status}" + (f" ({len(changed)} dosya)" if changed else ""))
+        else:
+            status = prepare(split, args.root, args.size, force=args.force,
+                             workers=args.workers)
+            if status == "ok":
+                print(f" {split}: güncel")
+
+
+if __name__ == "__main__":
+    main()
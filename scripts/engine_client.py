@@ -0,0 +1,175 @@
+import json
+import socket
+import struct
+import threading
+
+import cv2
+import numpy as np
+from inference import Prediction
+from preprocess import Preprocessor
+from profiling import NULL_PROFILER
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+_HDR = struct.Struct("!II")  # json uzunluğu, veri uzunluğu
+
+
+# ---------------- PROTOKOL ----------------
+# Her mesaj: 8 bayt başlık + JSON + (varsa) ham görüntü baytları.
+
+def parse_address(address):
+    """"host:port" -> TCP, "unix:/yol" veya "/yol" -> Unix socket."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    if address.startswith("/"):
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if k == 0:
+            raise ConnectionError("bağlantı kapandı")
+        got += k
+    return buf
+
+
+def send_msg(sock, header, payload=b""):
+    # çok boyutlu memoryview'da len() ilk boyuttur; bayt sayısı için düzleştir
+    payload = memoryview(payload).cast("B")
+    data = json.dumps(header).encode()
+    sock.sendall(_HDR.pack(len(data), payload.nbytes) + data)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_msg(sock):
+    n_json, n_data = _HDR.unpack(_recv_exact(sock, _HDR.size))
+    header = json.loads(_recv_exact(sock, n_json))
+    payload = _recv_exact(sock, n_data) if n_data else b""
+    return header, payload
+
+
+def encode_image(img, fmt="raw"):
+    """Görüntüyü gönderilecek baytlara çevirir: "raw" (yerel) veya "jpg" (ağ)."""
+    if fmt == "jpg":
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        if not ok:
+            raise ValueError("jpg kodlanamadı")
+        return {"enc": "jpg"}, buf.tobytes()
+    img = np.ascontiguousarray(img)
+    return {"enc": "raw", "shape": list(img.shape)}, memoryview(img).cast("B")
+
+
+def decode_image(header, payload):
+    if header.get("enc") == "jpg":
+        return cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_COLOR)
+    return np.frombuffer(payload, np.uint8).reshape(header["shape"])
+
+
+# ---------------- İSTEMCİ ----------------
+
+class RemoteEngine:
+    """InferenceEngine ile aynı arayüz, ama model infer_server.py'de.
+
+    Ön işleme (büyütme/CLAHE) burada yapılır; sunucu sadece modeli çalıştırır
+    ve istekleri diğer istemcilerinkilerle aynı batch'e koyar.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, conf=0.25, upscale=None,
+                 enhance=False, profiler=None, timeout=10.0, encoding="raw"):
+        self.address = address
+        self.conf = conf
+        self.upscale = upscale
+        self.enhance = enhance
+        self.prof = profiler or NULL_PROFILER
+        self.timeout = timeout
+        self.encoding = encoding
+        self._pre = Preprocessor(size=upscale, enhance=enhance)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._next_id = 0
+
+        info = self._call({"op": "info"})
+        self.names = {int(k): v for k, v in info["names"].items()}
+        self.model_path = info.get("model")
+        self.backend = info.get("backend")
+
+    def _connect(self):
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(addr)
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _call(self, header, payload=b""):
+        with self._lock:
+            for attempt in range(2):
+                if self._sock is None:
+                    self._sock = self._connect()
+                try:
+                    send_msg(self._sock, header, payload)
+                    reply, _ = recv_msg(self._sock)
+                    break
+                except (ConnectionError, OSError):
+                    # sunucu yeniden başlatıldıysa bir kez tekrar bağlan
+                    self.close()
+                    if attempt:
+                        raise
+        if "error" in reply:
+            raise RuntimeError(f"sunucu hatası: {reply['error']}")
+        return reply
+
+    def preprocess(self, bgr, reuse=True):
+        sx = sy = 1.0
+        if self.upscale:
+            h, w = bgr.shape[:2]
+            sx, sy = w / self.upscale, h / self.upscale
+        return self._pre(bgr, reuse=reuse), sx, sy
+
+    def predict(self, bgr, conf=None):
+        if isinstance(bgr, str):
+            bgr = cv2.imread(bgr)
+        if bgr is None:
+            return None
+        return self.predict_many([bgr], conf=conf)[0]
+
+    def predict_many(self, images, conf=None):
+        conf = self.conf if conf is None else conf
+        out = []
+        for img in images:
+            with self.prof.stage("preprocess"):
+                x, sx, sy = self.preprocess(img)
+                meta, payload = encode_image(x, self.encoding)
+            self._next_id += 1
+            with self.prof.stage("predict"):
+                reply = self._call({"op": "predict", "id": self._next_id,
+                                    "conf": conf, **meta}, payload)
+            with self.prof.stage("postprocess"):
+                out.append(self._to_prediction(reply, sx, sy))
+        return out
+
+    def _to_prediction(self, reply, sx, sy):
+        boxes = np.asarray(reply["boxes"], dtype=np.float32).reshape(-1, 4)
+        if sx != 1.0 or sy != 1.0:
+            boxes *= np.array([sx, sy, sx, sy], dtype=np.float32)
+        confs = np.asarray(reply["confs"], dtype=np.float32)
+        cls_ids = np.asarray(reply["cls"], dtype=np.int32)
+        return Prediction(boxes, confs, cls_ids, self.names)
+
+    def warmup(self, n=1):
+        pass
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
@@ -0,0 +1,390 @@
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+import dataset_cache
+from inference import BACKEND, MODEL_PATH, InferenceEngine, model_artifact
+
+DATASET_DIR = "dataset"
+SPLITS = ("valid", "test")
+EVAL_CACHE_DIR = "runs/eval_cache"
+RAW_CONF = 0.001               # cache'e bu eşiğin üstündeki bütün kutular yazılır
+IOU_THS = np.linspace(0.5, 0.95, 10)
+HIST_BINS = 10
+
+
+def file_hash(path, chunk=1 << 20):
+    """Model dosyasının (ya da OpenVINO klasörünün) içerik hash'i."""
+    p = Path(path)
+    files = sorted(q for q in p.rglob("*") if q.is_file()) if p.is_dir() else [p]
+    h = hashlib.sha1()
+    for f in files:
+        h.update(f.name.encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(chunk), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+def load_split(split, root=DATASET_DIR):
+    """Resim yolları + YOLO etiketleri (normalize xyxy) düz diziler halinde."""
+    files = dataset_cache.list_files(split, root)
+    img_dir = Path(root) / split / "images"
+    gt_img, gt_cls, gt_box = [], [], []
+    for i, name in enumerate(files):
+        lb = dataset_cache.read_labels(dataset_cache.label_path(root, split, name))
+        if len(lb) == 0:
+            continue
+        cx, cy, w, h = lb[:, 1], lb[:, 2], lb[:, 3], lb[:, 4]
+        gt_img.append(np.full(len(lb), i, dtype=np.int32))
+        gt_cls.append(lb[:, 0].astype(np.int32))
+        gt_box.append(np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], 1))
+    cat = lambda parts, dt, shape: (np.concatenate(parts).astype(dt) if parts
+                                    else np.zeros(shape, dtype=dt))
+    return ([str(img_dir / f) for f in files],
+            {"gt_img": cat(gt_img, np.int32, (0,)),
+             "gt_cls": cat(gt_cls, np.int32, (0,)),
+             "gt_box": cat(gt_box, np.float32, (0, 4))})
+
+
+def cache_key(model_hash, pre_cfg, paths):
+    """Model hash'i + ön işleme ayarı + dosya listesi -> cache anahtarı."""
+    stats = [(Path(p).name, Path(p).stat().st_mtime_ns) for p in paths]
+    blob = json.dumps({"model": model_hash, "pre": pre_cfg, "files": stats},
+                      sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:20]
+
+
+def predict_split(engine, paths, batch=16, threads=4, images=None):
+    """Bütün resimleri batch halinde modelden geçirir (ham tahminler).
+
+    images verilirse (dataset_cache memmap) JPEG çözülmez. Resim başına
+    gecikme = batch süresi / batch boyu.
+    """
+    n = len(paths)
+    rows_img, rows_box, rows_conf, rows_cls = [], [], [], []
+    lat = np.zeros(n, dtype=np.float32)
+
+    def decode(i):
+        return cv2.imread(paths[i]) if images is None else images.image(i)
+
+    with ThreadPoolExecutor(threads) as pool:
+        for s in range(0, n, batch):
+            idx = list(range(s, min(n, s + batch)))
+            frames = list(pool.map(decode, idx))
+            ok = [(i, f) for i, f in zip(idx, frames) if f is not None]
+            t0 = time.perf_counter()
+            preds = engine.predict_many([f for _, f in ok], conf=RAW_CONF)
+            dt = (time.perf_counter() - t0) / max(1, len(ok))
+            for (i, f), pred in zip(ok, preds):
+                lat[i] = dt
+                if len(pred) == 0:
+                    continue
+                h, w = f.shape[:2]
+                rows_img.append(np.full(len(pred), i, dtype=np.int32))
+                rows_box.append(pred.boxes / np.array([w, h, w, h], dtype=np.float32))
+                rows_conf.append(pred.confs)
+                rows_cls.append(pred.cls_ids)
+
+    cat = lambda parts, dt, shape: (np.concatenate(parts).astype(dt) if parts
+                                    else np.zeros(shape, dtype=dt))
+    return {"img": cat(rows_img, np.int32, (0,)),
+            "box": cat(rows_box, np.float32, (0, 4)),
+            "conf": cat(rows_conf, np.float32, (0,)),
+            "cls": cat(rows_cls, np.int32, (0,)),
+            "latency": lat}
+
+
+def cached_predictions(split, model, backend, pre_cfg, batch, threads,
+                       memmap_size=None, refresh=False, root=DATASET_DIR):
+    """Ham tahminleri cache'ten okur; yoksa model çalıştırılıp yazılır.
+
+    (paths, gt, preds, names, cache'ten mi) döndürür.
+    """
+    paths, gt = load_split(split, root)
+    artifact = model_artifact(model, backend)
+    key = cache_key(file_hash(artifact), pre_cfg, paths)
+    cache_path = Path(EVAL_CACHE_DIR) / f"{split}_{key}.npz"
+
+    if cache_path.exists() and not refresh:
+        with np.load(cache_path, allow_pickle=False) as z:
+            preds = {k: z[k] for k in ("img", "box", "conf", "cls", "latency")}
+            names = json.loads(str(z["names"]))
+        return paths, gt, preds, {int(k): v for k, v in names.items()}, True
+
+    engine = InferenceEngine(model, conf=RAW_CONF, backend=backend,
+                             upscale=pre_cfg["upscale"], enhance=pre_cfg["enhance"],
+                             imgsz=pre_cfg["imgsz"])
+    images = dataset_cache.load(split, root, memmap_size) if memmap_size else None
+    preds = predict_split(engine, paths, batch, threads, images)
+    names = {int(k): v for k, v in engine.names.items()}
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(cache_path, names=json.dumps(names), **preds)
+    return paths, gt, preds, names, False
+
+
+# ---------------- METRİKLER ----------------
+def top1(preds, gt, n_images, conf_th):
+    """Resim başına en yüksek conf'lu tahmin ve ilk etiket sınıfı (-1 = yok)."""
+    keep = preds["conf"] >= conf_th
+    img, conf, cls = preds["img"][keep], preds["conf"][keep], preds["cls"][keep]
+    order = np.lexsort((-conf, img))
+    uniq, first = np.unique(img[order], return_index=True)
+    pred_cls = np.full(n_images, -1, dtype=np.int32)
+    pred_conf = np.zeros(n_images, dtype=np.float32)
+    pred_cls[uniq] = cls[order][first]
+    pred_conf[uniq] = conf[order][first]
+
+    gt_cls = np.full(n_images, -1, dtype=np.int32)
+    g_uniq, g_first = np.unique(gt["gt_img"], return_index=True)
+    gt_cls[g_uniq] = gt["gt_cls"][g_first]
+    return pred_cls, pred_conf, gt_cls
+
+
+def confusion_matrix(gt_cls, pred_cls, nc):
+    """(nc+1, nc+1): satır gerçek, sütun tahmin; son indeks = tespit yok."""
+    g = np.where(gt_cls < 0, nc, gt_cls)
+    p = np.where(pred_cls < 0, nc, pred_cls)
+    return np.bincount(g * (nc + 1) + p,
+                       minlength=(nc + 1) ** 2).reshape(nc + 1, nc + 1)
+
+
+def box_iou(a, b):
+    """(n, 4) x (m, 4) xyxy -> (n, m) IoU."""
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(br - tl, 0, None).prod(2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match_tp(preds, gt, n_images):
+    """Her tahmin için her IoU eşiğinde TP mi (M, 10); ultralytics eşleşmesi gibi."""
+    m = len(preds["conf"])
+    tp = np.zeros((m, len(IOU_THS)), dtype=bool)
+    p_order = np.argsort(preds["img"], kind="stable")
+    g_order = np.argsort(gt["gt_img"], kind="stable")
+    p_start = np.searchsorted(preds["img"][p_order], np.arange(n_images + 1))
+    g_start = np.searchsorted(gt["gt_img"][g_order], np.arange(n_images + 1))
+
+    for i in range(n_images):
+        pi = p_order[p_start[i]:p_start[i + 1]]
+        gi = g_order[g_start[i]:g_start[i + 1]]
+        if len(pi) == 0 or len(gi) == 0:
+            continue
+        iou = box_iou(preds["box"][pi], gt["gt_box"][gi])
+        iou *= preds["cls"][pi][:, None] == gt["gt_cls"][gi][None, :]
+        for t, th in enumerate(IOU_THS):
+            pp, gg = np.nonzero(iou >= th)
+            if len(pp) == 0:
+                continue
+            order = np.argsort(-iou[pp, gg], kind="stable")
+            pp, gg = pp[order], gg[order]
+            _, keep = np.unique(pp, return_index=True)
+            pp, gg = pp[keep], gg[keep]
+            order = np.argsort(-iou[pp, gg], kind="stable")
+            pp, gg = pp[order], gg[order]
+            _, keep = np.unique(gg, return_index=True)
+            tp[pi[pp[keep]], t] = True
+    return tp
+
+
+def average_precision(tp, conf, pred_cls, gt_cls, nc):
+    """Sınıf başına AP (nc, 10), 101 noktalı interpolasyon (ultralytics gibi)."""
+    ap = np.zeros((nc, tp.shape[1]))
+    n_gt = np.bincount(gt_cls, minlength=nc)
+    order = np.argsort(-conf, kind="stable")
+    tp, pred_cls = tp[order], pred_cls[order]
+    recall_pts = np.linspace(0, 1, 101)
+    for c in range(nc):
+        sel = pred_cls == c
+        if n_gt[c] == 0 or not sel.any():
+            continue
+        tpc = np.cumsum(tp[sel], 0)
+        fpc = np.cumsum(~tp[sel], 0)
+        recall = tpc / n_gt[c]
+        precision = tpc / (tpc + fpc)
+        for t in range(tp.shape[1]):
+            r = np.concatenate(([0.0], recall[:, t], [1.0]))
+            p = np.concatenate(([1.0], precision[:, t], [0.0]))
+            p = np.flip(np.maximum.accumulate(np.flip(p)))
+            y = np.interp(recall_pts, r, p)
+            ap[c, t] = ((y[1:] + y[:-1]) / 2).mean()  # trapez, ultralytics ile aynı
+    return ap, n_gt
+
+
+def conf_histograms(pred_conf, pred_cls, gt_cls, nc, bins=HIST_BINS):
+    """Sınıf başına top-1 conf histogramı: (doğru, yanlış) her biri (nc, bins)."""
+    valid = (gt_cls >= 0) & (pred_cls >= 0)
+    b = np.minimum((pred_conf[valid] * bins).astype(np.int64), bins - 1)
+    c = gt_cls[valid]
+    ok = pred_cls[valid] == c
+    hist = lambda mask: np.bincount(c[mask] * bins + b[mask],
+                                    minlength=nc * bins).reshape(nc, bins)
+    return hist(ok), hist(~ok)
+
+
+def per_class_mean(values, cls, nc):
+    valid = cls >= 0
+    n = np.bincount(cls[valid], minlength=nc)
+    s = np.bincount(cls[valid], weights=values[valid], minlength=nc)
+    return np.where(n > 0, s / np.maximum(n, 1), np.nan), n
+
+
+def evaluate(preds, gt, n_images, nc, conf_th=0.25):
+    pred_cls, pred_conf, gt_cls = top1(preds, gt, n_images, conf_th)
+    labelled = gt_cls >= 0
+    correct = (pred_cls == gt_cls) & labelled
+
+    tp = match_tp(preds, gt, n_images)
+    ap, n_gt = average_precision(tp, preds["conf"], preds["cls"], gt["gt_cls"], nc)
+    present = n_gt > 0
+
+    cls_acc, cls_n = per_class_mean(correct.astype(np.float64), gt_cls, nc)
+    cls_lat, _ = per_class_mean(preds["latency"].astype(np.float64) * 1000, gt_cls, nc)
+    hist_ok, hist_bad = conf_histograms(pred_conf, pred_cls, gt_cls, nc)
+    lat_ms = preds["latency"] * 1000
+
+    return {
+        "images": int(n_images),
+        "conf_th": conf_th,
+        "top1": float(correct.sum() / max(1, labelled.sum())),
+        "detection_rate": float(((pred_cls >= 0) & labelled).sum() / max(1, labelled.sum())),
+        "map50": float(ap[present, 0].mean()) if present.any() else 0.0,
+        "map50_95": float(ap[present].mean()) if present.any() else 0.0,
+        "latency_ms": {"mean": float(lat_ms.mean()) if n_images else 0.0,
+                       "p50": float(np.percentile(lat_ms, 50)) if n_images else 0.0},
+        "per_class": {
+            "images": cls_n.tolist(),
+            "top1": np.nan_to_num(cls_acc, nan=-1).round(4).tolist(),
+            "ap50": ap[:, 0].round(4).tolist(),
+            "ap50_95": ap.mean(1).round(4).tolist(),
+            "latency_ms": np.nan_to_num(cls_lat, nan=-1).round(2).tolist(),
+            "conf_hist_correct": hist_ok.tolist(),
+            "conf_hist_wrong": hist_bad.tolist(),
+        },
+        "confusion": confusion_matrix(gt_cls, pred_cls, nc).tolist(),
+    }
+
+
+def save_plots(result, names, out_prefix):
+    """Karmaşıklık matrisi ve conf histogramları PNG (matplotlib varsa)."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print(" matplotlib yok, grafik atlandı")
+        return
+    nc = len(names)
+    labels = [names[i] for i in range(nc)] + ["yok"]
+    cm = np.asarray(result["confusion"], dtype=np.float64)
+    norm = cm / np.maximum(cm.sum(1, keepdims=True), 1)
+
+    fig, ax = plt.subplots(figsize=(10, 9))
+    ax.imshow(norm, cmap="Blues", vmin=0, vmax=1)
+    ax.set_xticks(range(nc + 1), labels, fontsize=7)
+    ax.set_yticks(range(nc + 1), labels, fontsize=7)
+    ax.set_xlabel("tahmin")
+    ax.set_ylabel("gerçek")
+    fig.tight_layout()
+    fig.savefig(f"{out_prefix}_confusion.png", dpi=120)
+    plt.close(fig)
+
+    ok = np.asarray(result["per_class"]["conf_hist_correct"])
+    bad = np.asarray(result["per_class"]["conf_hist_wrong"])
+    edges = np.linspace(0, 1, HIST_BINS + 1)
+    cols = 6
+    rows = (nc + cols - 1) // cols
+    fig, axes = plt.subplots(rows, cols, figsize=(2.4 * cols, 1.8 * rows),
+                             sharex=True, squeeze=False)
+    for c, ax in enumerate(axes.flat):
+        if c >= nc:
+            ax.axis("off")
+            continue
+        ax.bar(edges[:-1], ok[c], width=1 / HIST_BINS, align="edge", color="tab:green")
+        ax.bar(edges[:-1], bad[c], width=1 / HIST_BINS, align="edge",
+               bottom=ok[c], color="tab:red")
+        ax.set_title(names[c], fontsize=8)
+    fig.tight_layout()
+    fig.savefig(f"{out_prefix}_conf_hist.png", dpi=120)
+    plt.close(fig)
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="dataset/{valid,test} üzerinde çevrimdışı değerlendirme. Ham tahminler "
+                    "model hash'i + ön işleme ayarıyla cache'lenir; eşik değiştirip "
+                    "tekrar çalıştırmak modeli çağırmaz.")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--splits", nargs="+", default=list(SPLITS))
+    ap.add_argument("--conf", type=float, nargs="+", default=[0.25],
+                    help="top-1 / karmaşıklık matrisi eşiği (birden çok verilebilir)")
+    ap.add_argument("--imgsz", type=int, default=None)
+    ap.add_argument("--upscale", type=int, default=None)
+    ap.add_argument("--enhance", action="store_true", help="CLAHE (Preprocessor, enhance=True)")
+    ap.add_argument("--memmap", type=int, default=None, metavar="SIZE",
+                    help="resimleri dataset_cache memmap'inden oku (o boyutta)")
+    ap.add_argument("--batch", type=int, default=16)
+    ap.add_argument("--threads", type=int, default=4, help="JPEG çözme thread'i")
+    ap.add_argument("--refresh", action="store_true", help="cache'i yok say")
+    ap.add_argument("--plots", action="store_true")
+    ap.add_argument("-o", "--out", default=None,
+                    help="JSON rapor (varsayılan runs/eval/eval_<zaman>.json)")
+    args = ap.parse_args()
+
+    pre_cfg = {"backend": args.backend, "imgsz": args.imgsz, "upscale": args.upscale,
+               "enhance": args.enhance, "memmap": args.memmap, "raw_conf": RAW_CONF}
+    out = Path(args.out) if args.out else \
+        Path("runs/eval") / time.strftime("eval_%Y%m%d-%H%M%S.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {"model": args.model, "preprocess": pre_cfg, "splits": {}}
+
+    for split in args.splits:
+        t0 = time.perf_counter()
+        paths, gt, preds, names, hit = cached_predictions(
+            split, args.model, args.backend, pre_cfg, args.batch, args.threads,
+            args.memmap, args.refresh)
+        t_pred = time.perf_counter() - t0
+        nc = len(names)
+        results = []
+        for conf_th in args.conf:
+            t1 = time.perf_counter()
+            res = evaluate(preds, gt, len(paths), nc, conf_th)
+            res["metric_s"] = time.perf_counter() - t1
+            results.append(res)
+        report["splits"][split] = results
+        report["names"] = names
+
+        src = "cache" if hit else "model"
+        print(f"\n {split}: {len(paths)} resim, tahminler {src}'ten {t_pred:.2f} s")
+        print(f"   {'conf':>5} {'top1':>7} {'tespit':>7} {'mAP50':>7} {'mAP50-95':>9} {'ms/resim':>9}")
+        for r in results:
+            print(f"   {r['conf_th']:>5.2f} {r['top1'] * 100:>6.1f}% "
+                  f"{r['detection_rate'] * 100:>6.1f}% {r['map50']:>7.3f} "
+                  f"{r['map50_95']:>9.3f} {r['latency_ms']['mean']:>9.1f}")
+
+        pc = results[0]["per_class"]
+        print(f"   {'sınıf':<6}{'n':>4}{'top1':>8}{'AP50':>7}{'ms':>7}")
+        for c in range(nc):
+            if pc["images"][c] == 0:
+                continue
+            print(f"   {names[c]:<6}{pc['images'][c]:>4}{pc['top1'][c] * 100:>7.1f}%"
+                  f"{pc['ap50'][c]:>7.3f}{pc['latency_ms'][c]:>7.1f}")
+        if args.plots:
+            save_plots(results[0], names, str(out.with_suffix("")) + f"_{split}")
+
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"\n -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+from pathlib import Path
+
+from ultralytics import YOLO
+from inference import MODEL_PATH, model_artifact
+
+DATA_YAML = "dataset/data.yaml"
+
+
+def export_onnx(model_path, imgsz=640, dynamic=True, int8=False):
+    """best.pt -> best.onnx (ve istenirse best_int8.onnx)."""
+    model = YOLO(model_path)
+    out = model.export(format="onnx", imgsz=imgsz, dynamic=dynamic,
+                       simplify=True)
+    print(f" ONNX: {out}")
+
+    if int8:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            print(" onnxruntime kurulu değil, INT8 atlandı (pip install onnxruntime)")
+            return out
+
+        q_path = model_artifact(model_path, "onnx_int8")
+        quantize_dynamic(out, q_path, weight_type=QuantType.QUInt8)
+        print(f" ONNX INT8: {q_path}")
+    return out
+
+
+def export_openvino(model_path, imgsz=640, int8=False, data=DATA_YAML):
+    """best.pt -> best_openvino_model/ (int8 ise best_int8_openvino_model/)."""
+    try:
+        import openvino  # noqa: F401
+    except ImportError:
+        print(" OpenVINO kurulu değil, atlandı (pip install openvino)")
+        return None
+
+    model = YOLO(model_path)
+    out = model.export(format="openvino", imgsz=imgsz, int8=int8,
+                       data=data if int8 else None)
+    print(f" OpenVINO{' INT8' if int8 else ''}: {out}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="best.pt'yi CPU için ONNX / OpenVINO'ya çevirir (dosyalar best.pt yanına yazılır).")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--imgsz", type=int, default=640)
+    ap.add_argument("--formats", nargs="+", default=["onnx", "openvino"],
+                    choices=["onnx", "openvino"])
+    ap.add_argument("--int8", action="store_true",
+                    help="ONNX için dinamik, OpenVINO için kalibrasyonlu INT8")
+    ap.add_argument("--static", action="store_true",
+                    help="ONNX'i sabit batch=1 ile export et")
+    args = ap.parse_args()
+
+    if not Path(args.model).exists():
+        print(f" Model yok: {args.model}")
+        return
+
+    if "onnx" in args.formats:
+        export_onnx(args.model, args.imgsz, dynamic=not args.static,
+                    int8=args.int8)
+    if "openvino" in args.formats:
+        export_openvino(args.model, args.imgsz)
+        if args.int8:
+            export_openvino(args.model, args.imgsz, int8=True)
+
+
+if __name__ == "__main__":
+    main()
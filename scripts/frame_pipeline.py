@@ -0,0 +1,318 @@
+import threading
+import time
+
+import cv2
+from profiling import NULL_PROFILER
+from sources import capture_fps, is_live, open_capture
+
+
+class LatestFrameGrabber:
+    """Kamerayı ayrı thread'de okur, sadece en son kareyi tutar (eskiler atılır).
+
+    source: kamera indeksi, video dosyası, resim klasörü veya yayın adresi.
+    Dosyalar kendi FPS'lerinde oynatılır (canlı kamera gibi davranır).
+    """
+
+    def __init__(self, source=0, profiler=None, min_size=None):
+        self.prof = profiler or NULL_PROFILER
+        self.cap = open_capture(source, min_size=min_size)
+        self._frame_dt = 0.0 if is_live(source) else 1.0 / capture_fps(self.cap)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self._thread = None
+        self.running = False
+        self.failed = False
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.failed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        next_t = time.perf_counter()
+        while self.running:
+            with self.prof.stage("cap.read"):
+                ok, frame = self.cap.read()
+            if not ok:
+                self.failed = True
+                break
+            if self._frame_dt:
+                next_t += self._frame_dt
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+            with self._cond:
+                self._frame = frame
+                self._seq += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+
+    def latest(self):
+        """(sıra no, kare) döndürür; henüz kare yoksa (0, None)."""
+        with self._cond:
+            return self._seq, self._frame
+
+    def wait_newer(self, seq, timeout=0.5):
+        """seq'ten yeni bir kare gelene kadar bekle."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._seq != seq or not self.running, timeout=timeout)
+            return self._seq, self._frame
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class RateController:
+    """Tahmin hızını ayarlar; görüntü yine kamera hızında akar.
+
+    target_fps: saniyede en fazla bu kadar tahmin (None = sınırsız)
+    cpu_budget: zamanın en fazla bu oranı tahminde geçsin (0-1, None = sınırsız),
+                ortalama tahmin süresinden hesaplanır
+    diff_th:    ROI küçük resmi son tahmindekinden ortalama bu kadardan az
+                değiştiyse (0-255) tahmin yapılmaz, son sonuç tekrar kullanılır
+    max_reuse_s: görüntü değişmese de en geç bu kadar saniyede bir tahmin yap
+    region_fn:  ham kareden karşılaştırılacak bölgeyi (ROI) döndüren fonksiyon
+    """
+
+    def __init__(self, target_fps=None, cpu_budget=None, diff_th=None,
+                 max_reuse_s=1.0, region_fn=None, ema=0.2, thumb=32):
+        self.target_fps = target_fps
+        self.cpu_budget = cpu_budget
+        self.diff_th = diff_th
+        self.max_reuse_s = max_reuse_s
+        self.region_fn = region_fn
+        self.ema = ema
+        self.thumb = thumb
+
+        self.avg_infer_s = None
+        self.last_start = 0.0
+        self.last_infer = 0.0
+        self._hold_until = 0.0
+        self._last_thumb = None
+        self.n_infer = 0
+        self.n_reused = 0
+
+    def min_interval(self):
+        """İki tahmin başlangıcı arasında olması gereken en kısa süre."""
+        interval = 0.0
+        if self.target_fps:
+            interval = 1.0 / self.target_fps
+        if self.cpu_budget and self.avg_infer_s is not None:
+            interval = max(interval, self.avg_infer_s / self.cpu_budget)
+        return interval
+
+    def wait_time(self, now=None):
+        now = time.monotonic() if now is None else now
+        return max(self.last_start + self.min_interval(), self._hold_until) - now
+
+    def _thumbnail(self, frame):
+        region = self.region_fn(frame) if self.region_fn else frame
+        small = cv2.resize(region, (self.thumb, self.thumb),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def should_reuse(self, frame, now=None):
+        """ROI neredeyse aynıysa True (tahmin yerine son sonuç kullanılır)."""
+        if self.diff_th is None or self._last_thumb is None:
+            return False
+        now = time.monotonic() if now is None else now
+        if now - self.last_infer >= self.max_reuse_s:
+            return False
+        diff = cv2.absdiff(self._thumbnail(frame), self._last_thumb)
+        if float(diff.mean()) < self.diff_th:
+            self.n_reused += 1
+            return True
+        return False
+
+    def reuse(self, now=None):
+        """Son sonuç tekrar kullanıldı: bu da bir tahmin hakkı sayılır.
+
+        Bir sonraki tahmin / tekrar kullanım gerçek tahmindeki kadar
+        (min_interval ve ortalama tahmin süresi) bekler; böylece sonuç
+        (oy) hızı sahnedeki hareketten bağımsız kalır.
+        """
+        now = time.monotonic() if now is None else now
+        self.last_start = now
+        self._hold_until = now + (self.avg_infer_s or 0.0)
+
+    def start(self, frame, now=None):
+        """Tahmin başlamadan hemen önce çağrılır."""
+        self.last_start = time.monotonic() if now is None else now
+        if self.diff_th is not None:
+            self._last_thumb = self._thumbnail(frame)
+
+    def record(self, seconds, now=None):
+        """Tahmin süresini hareketli ortalamaya ekler."""
+        self.last_infer = time.monotonic() if now is None else now
+        self.n_infer += 1
+        if self.avg_infer_s is None:
+            self.avg_infer_s = seconds
+        else:
+            self.avg_infer_s += self.ema * (seconds - self.avg_infer_s)
+
+
+class InferenceWorker:
+    """Grabber'daki en güncel kareyi alıp infer_fn ile işler; sadece son sonucu tutar.
+
+    rate verilirse (RateController) tahmin hızı sınırlanır ve değişmeyen
+    ROI için son sonuç yeni kareye ait sayılır; bu da tahmin hızında olur,
+    sonuç numarası (oylama) hareketli ve sabit elde aynı hızda ilerler.
+    """
+
+    def __init__(self, grabber, infer_fn, rate=None):
+        self.grabber = grabber
+        self.infer_fn = infer_fn
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._result = None
+        self._result_seq = 0
+        self._thread = None
+        self.running = False
+        self.error = None
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        last_seq = 0
+        try:
+            while self.running and self.grabber.running:
+                seq, frame = self.grabber.wait_newer(last_seq)
+                if frame is None or seq == last_seq:
+                    continue
+
+                rate = self.rate
+                if rate is not None:
+                    delay = rate.wait_time()
+                    if delay > 0:
+                        # bütçe dolmadan tahmin yok; uyanınca en yeni kareyi al
+                        time.sleep(delay)
+                        continue
+                    if rate.should_reuse(frame):
+                        rate.reuse()
+                        last_seq = seq
+                        with self._lock:
+                            if self._result_seq:
+                                self._result_seq = seq
+                        continue
+                    rate.start(frame)
+
+                last_seq = seq
+                t0 = time.perf_counter()
+                result = self.infer_fn(frame)
+                if rate is not None:
+                    rate.record(time.perf_counter() - t0)
+
+                with self._lock:
+                    self._result = result
+                    self._result_seq = seq
+        except Exception as e:  # thread içinde sessizce ölmesin (rate dahil)
+            self.error = e
+        finally:
+            self.running = False
+
+    def latest(self):
+        """(sonucun ait olduğu kare no, sonuç) döndürür."""
+        with self._lock:
+            return self._result_seq, self._result
+
+    def stop(self):
+        self.running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
+class FramePipeline:
+    """Yakalama -> tahmin -> gösterim.
+
+    Kamera ve model ayrı thread'lerde çalışır; arayüz (Tk / cv2.imshow) sadece
+    en son kareyi ve en son tahmini gösterir. Yavaş bir tahmin kamerayı
+    bekletmez, sürücü tamponunda kare birikmez.
+
+    capture="process" ile kamera ayrı bir process'te okunur ve kareler
+    paylaşımlı bellekten kopyasız gelir (shm_ring.ShmFrameGrabber).
+    min_size: kameradan istenen en küçük (w, h), ROI'yi kapsayacak kadar
+    (camera_config).
+    """
+
+    def __init__(self, infer_fn, source=0, rate=None, profiler=None,
+                 capture="thread", min_size=None):
+        if capture == "process":
+            from shm_ring import ShmFrameGrabber
+            self.grabber = ShmFrameGrabber(source, min_size=min_size)
+        else:
+            self.grabber = LatestFrameGrabber(source, profiler=profiler,
+                                              min_size=min_size)
+        self.worker = InferenceWorker(self.grabber, infer_fn, rate=rate)
+        self._shown_seq = 0
+
+    def isOpened(self):
+        return self.grabber.isOpened()
+
+    @property
+    def running(self):
+        return self.grabber.running and self.worker.error is None
+
+    @property
+    def failed(self):
+        """Kamera koptu ya da tahmin thread'i hatayla durdu (worker.error)."""
+        return self.grabber.failed or self.worker.error is not None
+
+    def start(self):
+        self.grabber.start()
+        self.worker.start()
+        return self
+
+    def stop(self):
+        self.worker.running = False
+        self.grabber.stop()
+        self.worker.stop()
+
+    def latest_frame(self):
+        return self.grabber.latest()
+
+    def latest_result(self):
+        return self.worker.latest()
+
+    def poll(self):
+        """Yeni kare varsa (kare, sonuç_no, sonuç), yoksa None döndürür.
+
+        Tahmin thread'i hatayla durduysa hep None (çağıran failed'a bakar).
+        """
+        if self.worker.error is not None:
+            return None
+        seq, frame = self.grabber.latest()
+        if frame is None or seq == self._shown_seq:
+            return None
+        self._shown_seq = seq
+        result_seq, result = self.worker.latest()
+        return frame, result_seq, result
+
+    def wait(self, timeout=0.05):
+        """OpenCV döngüleri için: yeni kare gelene kadar kısa süre bekle."""
+        self.grabber.wait_newer(self._shown_seq, timeout=timeout)
+        return self.poll()
@@ -0,0 +1,136 @@
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from inference import Detection, draw_detection
+from predict_batch import collect_paths, predict_paths
+
+PREFETCH = 2        # gösterilen resmin iki yanında önceden çözülen resim sayısı
+KEEP = 12           # bellekte tutulan çözülmüş resim sayısı (LRU)
+BATCH = 8
+THREADS = 4         # çözme thread'leri
+
+
+class Gallery:
+    """Çok sayıda resmi Tk ana thread'ini bloklamadan tahmin eder ve gösterir.
+
+    - Arka plandaki thread resimleri predict_batch.predict_paths ile
+      thread havuzunda çözer, modele batch halinde verir; sonuçlar
+      geldikçe results'a yazılır (çözülen resimler tutulmaz).
+    - show(i) gösterilecek resmi bir LRU'dan verir ve i'nin komşularını
+      ayrı bir havuzda önceden çözer, böylece sayfa değiştirmek anlıktır.
+    - poll() ana thread'den (root.after ile) çağrılır, bloklamaz; son
+      çağrıdan beri biten olayları döndürür.
+    """
+
+    def __init__(self, engine, inputs, conf=0.25, batch=BATCH, threads=THREADS,
+                 prefetch=PREFETCH, keep=KEEP):
+        self.paths = collect_paths(inputs)
+        self.results = [None] * len(self.paths)   # None = bekliyor
+        self.done = 0
+        self.current = 0
+        self.prefetch = prefetch
+        self.keep = max(keep, 2 * prefetch + 1)
+
+        self._index = {p: i for i, p in enumerate(self.paths)}
+        self._images = OrderedDict()   # indeks -> BGR (çizimsiz)
+        self._loading = set()
+        self._lock = threading.Lock()
+        self._events = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, prefetch))
+
+        self._thread = threading.Thread(
+            target=self._run, args=(engine, conf, batch, threads), daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self.paths)
+
+    @property
+    def finished(self):
+        return self.done == len(self.paths)
+
+    def _run(self, engine, conf, batch, threads):
+        try:
+            for row in predict_paths(engine, self.paths, batch, threads, conf=conf):
+                if self._stop.is_set():
+                    break
+                self._events.put(("result", self._index[row["path"]], row))
+        except Exception as e:
+            self._events.put(("error", None, f"{type(e).__name__}: {e}"))
+
+    def poll(self):
+        """Biten olaylar: ("result", i) / ("image", i) / ("error", mesaj)."""
+        events = []
+        while True:
+            try:
+                kind, i, data = self._events.get_nowait()
+            except queue.Empty:
+                return events
+            if kind == "result":
+                self.results[i] = data
+                self.done += 1
+                events.append((kind, i))
+            elif kind == "image":
+                events.append((kind, i))
+            else:
+                events.append((kind, data))
+
+    def _load(self, i):
+        img = cv2.imread(self.paths[i])
+        with self._lock:
+            self._loading.discard(i)
+            if img is None:
+                return
+            self._images[i] = img
+            while len(self._images) > self.keep:
+                self._images.popitem(last=False)
+        self._events.put(("image", i, None))
+
+    def _prefetch(self, i):
+        if self._stop.is_set():
+            return
+        lo, hi = max(0, i - self.prefetch), min(len(self.paths), i + self.prefetch + 1)
+        # önce gösterilen resim, sonra yakından uzağa komşular
+        for j in sorted(range(lo, hi), key=lambda j: (abs(j - i), j < i)):
+            with self._lock:
+                if j in self._images or j in self._loading:
+                    continue
+                self._loading.add(j)
+            self._pool.submit(self._load, j)
+
+    def show(self, i):
+        """i. resim, sonucu hazırsa kutusu çizilmiş kopya; çözülmediyse None."""
+        self.current = i
+        self._prefetch(i)
+        with self._lock:
+            img = self._images.get(i)
+            if img is None:
+                return None
+            self._images.move_to_end(i)
+        img = img.copy()
+        row = self.results[i]
+        if row and row.get("label") is not None:
+            draw_detection(img, Detection(row["label"], row["conf"], tuple(row["box"])))
+        return img
+
+    def status(self, i):
+        """Başlık metni: sıra, dosya adı ve sonuç."""
+        name = self.paths[i].replace("\\", "/").rsplit("/", 1)[-1]
+        row = self.results[i]
+        if row is None:
+            res = "tahmin bekleniyor..."
+        elif row.get("error"):
+            res = "okunamadı"
+        elif row["label"] is None:
+            res = "bulunamadı"
+        else:
+            res = f"{row['label']}  (confidence: {row['conf']:.2f})"
+        return f"[{i + 1}/{len(self.paths)}] {name}: {res}"
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
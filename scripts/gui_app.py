@@ -1,23 +1,70 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+from tkinter import filedialog, messagebox, ttk
 import cv2
-from collections import deque, Counter
-from ultralytics import YOLO
-
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
-
-model = YOLO(MODEL_PATH)
+from camera_config import required_size
+from frame_pipeline import FramePipeline, RateController
+from gallery import Gallery
+from inference import MODEL_PATH, draw_detection, load_engine
+from preprocess import MirrorDisplay, mirrored_box
+from tk_display import TkVideoDisplay
+from hand_tracker import HandTracker
+from smoothing import TemporalSmoother
+from profiling import from_settings
+from result_cache import make_cache
 
 # --- Ayarlar ---
 CONF_TH = 0.50          # webcam confidence eşiği
 SMOOTH_N = 10           # son N tahminden çoğunluk
+VOTE = "count"          # "count" / "conf" (confidence ağırlıklı) / "decay" (üstel azalan)
 ROI_SIZE = 320          # merkez kare ROI
 ADD_COOLDOWN_MS = 500
 
+# Tahmin hızı (görüntü yine kamera hızında akar)
+INFER_FPS = 10          # saniyede en fazla tahmin (None = sınırsız)
+CPU_BUDGET = 0.5        # zamanın en fazla bu oranı tahminde geçsin
+DIFF_TH = 2.0           # ROI bundan az değiştiyse son tahmini kullan (0-255)
+
+# El takibi: ROI sabit kutu yerine eli izler (T ile aç/kapat)
+TRACK_HAND = False
+
+# Görüntü kaynağı
+SOURCE = 0              # kamera indeksi, video dosyası, resim klasörü veya rtsp:// adresi
+CAPTURE = "thread"      # "process": kamera ayrı process'te, kareler paylaşımlı bellekten
+
+# Sonuç cache'i: ROI'nin algısal hash'i yakınsa model tekrar çalışmaz
+CACHE_TOL = 4           # Hamming toleransı (256 bit üzerinden), None = kapalı
+CACHE_TTL_S = 1.0       # kayıt en fazla bu kadar saniye kullanılır
+
+# Profil: aşama süreleri + FPS overlay, isteğe bağlı JSONL / Prometheus
+PROFILE = False
+PROFILE_LOG = None      # örn. "runs/profile_gui_app.jsonl"
+PROFILE_PORT = None     # örn. 9108 -> http://127.0.0.1:9108/metrics
+
 # Harfi ekleme tuşu: "Return" = Enter, "f" = F
 ADD_KEY = "Return"
 
+# __main__'de kurulur: CAPTURE="process" "spawn" ile çalışırken kamera
+# process'i bu dosyayı tekrar import eder, model orada yüklenmesin
+prof = engine = None
+_image_engine = None
+
+
+def image_engine():
+    """Resim modunun kendi engine'i (ilk kullanımda arka planda yüklenir).
+
+    Kameranınkiyle paylaşılmaz: ikisi aynı anda tahmin yapabilir, ayrıca
+    iki aşamalı modun kutu takibi bağımsız resimlerde kullanılmamalı.
+    Birebir aynı resimler için süresiz cache.
+    """
+    global _image_engine
+    if _image_engine is None:
+        _image_engine = load_engine(MODEL_PATH, cache=make_cache(0), lazy=True,
+                                    mode="detect")
+    return _image_engine
+
+
+GALLERY_POLL_MS = 50
+
 
 class App:
     def __init__(self, root):
@@ -27,8 +74,15 @@ class App:
 
         # --- Durum ---
         self.running = False
-        self.cap = None
-        self.pred_history = deque(maxlen=SMOOTH_N)
+        self.pipeline = None
+        self.last_result_seq = 0
+        self.display = MirrorDisplay(mirror=True)  # ayna sadece ekranda
+        self.track_hand = TRACK_HAND
+        self.tracker = HandTracker()
+        self.smoother = None  # sınıf isimleri model yüklenince belli olur
+
+        self.gallery = None  # resim modu (çoklu dosya / klasör)
+        self.gallery_index = 0
 
         self.current_letter = None
         self.current_conf = None
@@ -37,7 +91,7 @@ class App:
         self.last_add_time = 0
 
         # --- Üst başlık ---
-        self.title_text = tk.StringVar(value="Sonuç: -")
+        self.title_text = tk.StringVar(value="Model yükleniyor...")
         tk.Label(root, textvariable=self.title_text,
                  font=("Arial", 16, "bold")).pack(pady=10)
 
@@ -45,12 +99,30 @@ class App:
         btns = tk.Frame(root)
         btns.pack(pady=10)
 
-        tk.Button(btns, text="🖼️ Resim Seç ve Tahmin Et", font=("Arial", 12),
-                  command=self.choose_image).grid(row=0, column=0, padx=10)
+        self.img_btn = tk.Button(btns, text="🖼️ Resim(ler) Seç ve Tahmin Et",
+                                 font=("Arial", 12), command=self.choose_image,
+                                 state=tk.DISABLED)
+        self.img_btn.grid(row=0, column=0, padx=10)
+
+        self.folder_btn = tk.Button(btns, text="📁 Klasör", font=("Arial", 12),
+                                    command=self.choose_folder, state=tk.DISABLED)
+        self.folder_btn.grid(row=0, column=1, padx=10)
 
         self.cam_btn = tk.Button(btns, text="📷 Kamerayı Başlat", font=("Arial", 12),
-                                 command=self.toggle_camera)
-        self.cam_btn.grid(row=0, column=1, padx=10)
+                                 command=self.toggle_camera, state=tk.DISABLED)
+        self.cam_btn.grid(row=0, column=2, padx=10)
+
+        # --- Galeri gezinme + ilerleme ---
+        nav = tk.Frame(root)
+        nav.pack()
+        tk.Button(nav, text="◀", width=4,
+                  command=lambda: self.gallery_step(-1)).grid(row=0, column=0)
+        self.progress = ttk.Progressbar(nav, length=300, mode="determinate")
+        self.progress.grid(row=0, column=1, padx=8)
+        self.progress_text = tk.StringVar(value="")
+        tk.Label(nav, textvariable=self.progress_text, width=9).grid(row=0, column=2)
+        tk.Button(nav, text="▶", width=4,
+                  command=lambda: self.gallery_step(1)).grid(row=0, column=3)
 
         # --- Yazı alanı (kelime yazma) ---
         word_frame = tk.Frame(root)
@@ -70,7 +142,7 @@ class App:
                   command=self.clear_text).grid(row=1, column=3, padx=6, pady=5)
 
         help_text = (
-            "Kısayollar: Enter=Harf Ekle | Space=Boşluk | Backspace=Sil | C=Temizle | Q=Kamera durdur\n"
+            "Kısayollar: Enter=Harf Ekle | Space=Boşluk | Backspace=Sil | C=Temizle | Q=Kamera durdur | T=El takibi | ←/→=Resimler\n"
             "İpucu: Elini yeşil kutunun içine koy, harf netleşince Enter'a bas."
         )
         tk.Label(root, text=help_text, font=("Arial", 10)).pack(pady=5)
@@ -78,6 +150,8 @@ class App:
         # --- Kamera görüntüsü ---
         self.video_label = tk.Label(root)
         self.video_label.pack(pady=10)
+        self.video = TkVideoDisplay(self.video_label, size=(720, 405),
+                                    profiler=prof)
 
         # --- Kısayol tuşları ---
         self.root.bind("<Return>", lambda e: self.add_letter())
@@ -87,30 +161,98 @@ class App:
         self.root.bind("C", lambda e: self.clear_text())
         self.root.bind("q", lambda e: self.stop_camera())
         self.root.bind("Q", lambda e: self.stop_camera())
+        self.root.bind("t", lambda e: self.toggle_tracking())
+        self.root.bind("T", lambda e: self.toggle_tracking())
+        self.root.bind("<Left>", lambda e: self.gallery_step(-1))
+        self.root.bind("<Right>", lambda e: self.gallery_step(1))
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.check_model()
+        self.poll_gallery()
+
+    def on_close(self):
+        # kamera ve galeri thread'leri durmadan pencere kapanmasın
+        if self.running:
+            self.stop_camera()
+        self.close_gallery()
+        self.root.destroy()
+
+    # ---------------- MODEL YÜKLEME ----------------
+    def check_model(self):
+        """Model yüklenene kadar butonlar kapalı; bitince açılır."""
+        if engine.loading:
+            self.root.after(100, self.check_model)
+            return
+        if engine.error is not None:
+            self.title_text.set("Model yüklenemedi")
+            messagebox.showerror("Hata", f"Model yüklenemedi:\n{engine.error}")
+            return
+        self.smoother = TemporalSmoother(engine.names, window=SMOOTH_N, mode=VOTE)
+        self.title_text.set("Sonuç: -")
+        self.img_btn.config(state=tk.NORMAL)
+        self.folder_btn.config(state=tk.NORMAL)
+        self.cam_btn.config(state=tk.NORMAL)
 
     # ---------------- RESİM MODU ----------------
     def choose_image(self):
-        file_path = filedialog.askopenfilename(
-            title="Bir resim seç",
+        file_paths = filedialog.askopenfilenames(
+            title="Resim(ler) seç",
             filetypes=[("Image Files", "*.jpg *.jpeg *.png")]
         )
-        if not file_path:
-            return
+        if file_paths:
+            self.open_gallery(file_paths)
 
-        label, conf, annotated_bgr = self.predict_bgr_image(
-            cv2.imread(file_path), conf_th=0.25)
+    def choose_folder(self):
+        folder = filedialog.askdirectory(title="Resim klasörü seç")
+        if folder:
+            self.open_gallery([folder])
 
-        if annotated_bgr is None:
-            messagebox.showerror("Hata", "Resim okunamadı.")
+    def open_gallery(self, inputs):
+        """Çözme + tahmin arka planda; sonuçlar geldikçe gösterilir."""
+        if self.running:
+            self.stop_camera()
+        self.close_gallery()
+        self.gallery = Gallery(image_engine(), inputs, conf=0.25)
+        self.gallery_index = 0
+        if not len(self.gallery):
+            self.gallery = None
+            messagebox.showerror("Hata", "Resim bulunamadı.")
             return
-
-        if label is None:
-            self.title_text.set("Sonuç: Bulunamadı")
-            messagebox.showinfo("Sonuç", "❌ Hiç harf tespit edemedim.")
-        else:
-            self.title_text.set(f"Sonuç: {label}  (confidence: {conf:.2f})")
-
-        self.show_on_gui(annotated_bgr)
+        self.progress.config(maximum=len(self.gallery), value=0)
+        self.show_gallery()
+
+    def close_gallery(self):
+        """Arka plandaki tahmin/ön yükleme thread'lerini durdurur."""
+        if self.gallery is not None:
+            self.gallery.close()
+            self.gallery = None
+        self.gallery_index = 0
+
+    def show_gallery(self):
+        self.title_text.set(self.gallery.status(self.gallery_index))
+        img = self.gallery.show(self.gallery_index)
+        if img is not None:
+            self.show_on_gui(img)
+
+    def gallery_step(self, delta):
+        if self.gallery is None or self.running:
+            return
+        self.gallery_index = min(max(self.gallery_index + delta, 0),
+                                 len(self.gallery) - 1)
+        self.show_gallery()
+
+    def poll_gallery(self):
+        """Ana thread hiç beklemez; biten sonuç/resimler burada alınır."""
+        g = self.gallery
+        if g is not None:
+            for kind, data in g.poll():
+                if kind == "error":
+                    messagebox.showerror("Hata", data)
+                elif data == self.gallery_index and not self.running:
+                    self.show_gallery()
+            self.progress.config(value=g.done)
+            self.progress_text.set(f"{g.done}/{len(g)}")
+        self.root.after(GALLERY_POLL_MS, self.poll_gallery)
 
     # ---------------- KAMERA ----------------
     def toggle_camera(self):
@@ -120,81 +262,143 @@ class App:
             self.stop_camera()
 
     def start_camera(self):
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
+        if not engine.ready:
+            return
+        rate = RateController(target_fps=INFER_FPS, cpu_budget=CPU_BUDGET,
+                              diff_th=DIFF_TH, region_fn=self.roi_region)
+        self.pipeline = FramePipeline(self.infer_frame, source=SOURCE, rate=rate,
+                                      profiler=prof, capture=CAPTURE,
+                                      min_size=required_size(ROI_SIZE))
+        if not self.pipeline.isOpened():
+            self.pipeline.stop()
+            self.pipeline = None
             messagebox.showerror("Hata", "Kamera açılamadı.")
             return
 
         self.running = True
         self.cam_btn.config(text="⏹️ Kamerayı Durdur")
-        self.pred_history.clear()
+        self.smoother.reset()
+        self.close_gallery()
+
         self.current_letter = None
         self.current_conf = None
+        self.last_result_seq = 0
+        self.tracker.reset()
+        self.pipeline.start()
         self.update_camera()
 
     def stop_camera(self):
         self.running = False
         self.cam_btn.config(text="📷 Kamerayı Başlat")
-        if self.cap:
-            self.cap.release()
-            self.cap = None
-
-    def update_camera(self):
-        if not self.running or not self.cap:
-            return
-
-        ret, frame = self.cap.read()
-        if not ret:
-            self.stop_camera()
-            return
-
-        frame = cv2.flip(frame, 1)  # ayna
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
 
+    def roi_box(self, frame):
         h, w = frame.shape[:2]
         cx, cy = w // 2, h // 2
         half = ROI_SIZE // 2
         x1, y1 = max(0, cx - half), max(0, cy - half)
         x2, y2 = min(w, cx + half), min(h, cy + half)
+        return x1, y1, x2, y2
+
+    def toggle_tracking(self):
+        self.track_hand = not self.track_hand
+        self.tracker.reset()
+
+    def raw_roi_box(self, frame):
+        """Modelin baktığı kutu, ham (aynasız) kare koordinatında."""
+        if self.track_hand and self.tracker.box is not None:
+            return self.tracker.box
+        return mirrored_box(self.roi_box(frame), frame.shape[1])
+
+    def roi_region(self, frame):
+        """Ekrandaki (aynalı) ROI'nin ham karedeki görünümü, kopyasız."""
+        x1, y1, x2, y2 = self.raw_roi_box(frame)
+        return frame[y1:y2, x1:x2]
+
+    def infer_frame(self, frame):
+        """Tahmin thread'inde çalışır: ROI (kopyasız görünüm) + tahmin.
+
+        (label, conf, det, ham ROI kutusu) döndürür.
+        """
+        if self.track_hand:
+            det, box = self.tracker.predict(
+                frame, lambda roi: engine.predict(roi, conf=CONF_TH).best())
+            if det is None:
+                return None, None, None, box
+            return det.label, det.conf, det, box
+
+        box = self.raw_roi_box(frame)
+        label, conf, det = self.predict_bgr_image(self.roi_region(frame),
+                                                  conf_th=CONF_TH)
+        return label, conf, det, box
 
-        roi = frame[y1:y2, x1:x2].copy()
-
-        label, conf, annotated_roi = self.predict_bgr_image(
-            roi, conf_th=CONF_TH)
-
-        frame_show = frame.copy()
-
-        # yeşil ROI kutusu
-        cv2.rectangle(frame_show, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    def update_camera(self):
+        if not self.running or not self.pipeline:
+            return
 
-        # talimat yazısı
-        cv2.putText(frame_show, "Elini yesil kutunun icine koy",
-                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        item = self.pipeline.poll()
+        if item is None:
+            if self.pipeline.failed:
+                err = self.pipeline.worker.error
+                self.stop_camera()
+                if err is not None:
+                    messagebox.showerror("Hata", f"Tahmin durdu:\n{err}")
+                return
+            # yeni kare yok, kısa süre sonra tekrar bak
+            self.root.after(5, self.update_camera)
+            return
 
-        # smoothing + ekranda gösterilecek harf
-        if label is not None:
-            self.pred_history.append(label)
-            majority = Counter(self.pred_history).most_common(1)[0][0]
-            self.current_letter = majority
-            self.current_conf = conf
+        frame, result_seq, result = item
+        frame_show = self.display(frame)  # ayna, sabit tampona
 
-            self.title_text.set(
-                f"Sonuç: {majority}  (anlik: {label}, conf: {conf:.2f})")
+        h, w = frame_show.shape[:2]
+        label, conf, det, raw_box = result if result else (None, None, None, None)
 
-            # ROI içindeki çizimli görüntüyü ana frame'e bas
-            if annotated_roi is not None:
-                frame_show[y1:y2, x1:x2] = annotated_roi
+        # takipte kutu eli izler; el kayıpken sabit kutu gösterilir
+        if self.track_hand and raw_box is not None:
+            x1, y1, x2, y2 = mirrored_box(raw_box, w)
         else:
-            self.current_letter = None
-            self.current_conf = None
-            self.title_text.set("Sonuç: -")
-
-        # Yazı overlay (ekranda da görünsün)
-        cv2.putText(frame_show, f"Yazi: {self.text}",
-                    (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-
-        self.show_on_gui(frame_show)
-
-        self.root.after(30, self.update_camera)
+            x1, y1, x2, y2 = self.roi_box(frame_show)
+
+        # smoothing sadece yeni tahmin geldiğinde güncellenir
+        if result_seq != self.last_result_seq:
+            self.last_result_seq = result_seq
+            if label is not None:
+                majority, _ = self.smoother.update(label, conf)
+                self.current_letter = majority
+                self.current_conf = conf
+
+                self.title_text.set(
+                    f"Sonuç: {majority}  (anlik: {label}, conf: {conf:.2f})")
+            else:
+                self.current_letter = None
+                self.current_conf = None
+                self.title_text.set("Sonuç: -")
+
+        with prof.stage("draw"):
+            # yeşil ROI kutusu
+            cv2.rectangle(frame_show, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+            # talimat yazısı
+            cv2.putText(frame_show, "Elini yesil kutunun icine koy",
+                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+            # en iyi kutuyu sadece gösterilecek karede, ROI içine çiz
+            if det is not None:
+                draw_detection(frame_show, det.mirrored(x2 - x1), offset=(x1, y1))
+
+            # Yazı overlay (ekranda da görünsün)
+            cv2.putText(frame_show, f"Yazi: {self.text}",
+                        (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+            prof.draw_overlay(frame_show, origin=(10, 60))
+
+        with prof.stage("show"):
+            self.show_on_gui(frame_show)
+        prof.frame()
+
+        self.root.after(5, self.update_camera)
 
     # ---------------- YAZI FONKSİYONLARI ----------------
     def add_letter(self):
@@ -234,37 +438,28 @@ class App:
         self.text_var.set("Yazı: ")
 
     # ---------------- TAHMİN ----------------
-    def predict_bgr_image(self, bgr_img, conf_th=0.25):
+    def predict_bgr_image(self, bgr_img, conf_th=0.25, eng=None):
         if bgr_img is None:
             return None, None, None
 
-        results = model.predict(source=bgr_img, conf=conf_th, verbose=False)
-        r = results[0]
-        annotated = r.plot()
-
-        if r.boxes is None or len(r.boxes) == 0:
-            return None, None, annotated
-
-        confs = r.boxes.conf.tolist()
-        best_i = confs.index(max(confs))
-        cls_id = int(r.boxes.cls[best_i].item())
-        label = r.names[cls_id]
-        confidence = float(r.boxes.conf[best_i].item())
+        best = (eng or engine).predict(bgr_img, conf=conf_th).best()
+        if best is None:
+            return None, None, None
 
-        return label, confidence, annotated
+        return best.label, best.conf, best
 
     # ---------------- GUI'DE GÖSTER ----------------
     def show_on_gui(self, bgr_img):
-        rgb = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2RGB)
-        im = Image.fromarray(rgb)
-        im = im.resize((720, 405))  # biraz daha büyük
-
-        imgtk = ImageTk.PhotoImage(image=im)
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
+        # boyutlandırma/dönüştürme arka planda, Tk sadece paste yapar
+        self.video.submit(bgr_img)
 
 
 if __name__ == "__main__":
+    prof = from_settings(PROFILE, PROFILE_LOG, PROFILE_PORT)
+    # model arka planda yüklenip ısınır; pencere beklemeden açılır
+    engine = load_engine(MODEL_PATH, profiler=prof,
+                         cache=make_cache(CACHE_TOL, CACHE_TTL_S), lazy=True)
     root = tk.Tk()
     app = App(root)
     root.mainloop()
+    prof.close()
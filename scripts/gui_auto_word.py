@@ -1,15 +1,27 @@
 import tkinter as tk
 from tkinter import messagebox
 import cv2
-from ultralytics import YOLO
-from collections import deque, Counter
-
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
+from camera_config import required_size
+from frame_pipeline import FramePipeline, RateController
+from inference import MODEL_PATH, load_engine
+from preprocess import MirrorDisplay, mirrored_box
+from hand_tracker import HandTracker
+from smoothing import LetterCommitter
+from word_decoder import load_decoder
+from profiling import from_settings
+from result_cache import make_cache
+from session_record import SessionRecorder
 
 # --- Ayarlar ---
 CONF_TH = 0.75          # çok yüksek olursa hiç yazmaz, çok düşük olursa yanlış yazar
 REQ_CONSEC = 8          # aynı harfi art arda bu kadar kare görürse ekle
 HISTORY = 10            # smoothing için
+VOTE = "count"          # "count" / "conf" (confidence ağırlıklı) / "decay" (üstel azalan)
+
+# Kelime modu: harfler tek tek değil, top-3 olasılıklardan sözlükle kelime
+# olarak çözülür (word_decoder.py). Boşluk tuşu / el uzun süre yoksa kelime biter.
+WORD_MODE = False
+WORD_END_BLANK = 12     # bu kadar tahmin boyunca el yoksa kelimeyi bitir
 
 MIRROR = True
 ROI_SIDE = "left"       # "left" / "right"
@@ -18,14 +30,31 @@ ROI_MARGIN = 40
 
 SHOW_ROI_WINDOW = True  # ROI penceresi aç/kapat
 
+# Tahmin hızı (görüntü yine kamera hızında akar)
+INFER_FPS = 15          # saniyede en fazla tahmin (None = sınırsız)
+CPU_BUDGET = 0.5        # zamanın en fazla bu oranı tahminde geçsin
+DIFF_TH = 2.0           # ROI bundan az değiştiyse son tahmini kullan (0-255)
+
+# El takibi: ROI sabit kutu yerine eli izler (t ile aç/kapat)
+TRACK_HAND = False
+
+# Görüntü kaynağı
+SOURCE = 0              # kamera indeksi, video dosyası, resim klasörü veya rtsp:// adresi
+CAPTURE = "thread"      # "process": kamera ayrı process'te, kareler paylaşımlı bellekten
+
+# Sonuç cache'i: ROI'nin algısal hash'i yakınsa model tekrar çalışmaz
+CACHE_TOL = 4           # Hamming toleransı (256 bit üzerinden), None = kapalı
+CACHE_TTL_S = 1.0       # kayıt en fazla bu kadar saniye kullanılır
 
-def enhance_for_model(bgr):
-    """Daha net tahmin için kontrast artır."""
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    g2 = clahe.apply(gray)
-    out = cv2.cvtColor(g2, cv2.COLOR_GRAY2BGR)
-    return out
+# Oturum kaydı: modele giden ROI'ler + sonuçlar + tuşlar (session_record.py
+# replay ile kamerasız tekrar oynatılır)
+RECORD = False
+RECORD_CODEC = "jpg"    # "jpg" / "png" / "raw"
+
+# Profil: aşama süreleri + FPS overlay, isteğe bağlı JSONL / Prometheus
+PROFILE = False
+PROFILE_LOG = None      # örn. "runs/profile_auto_word.jsonl"
+PROFILE_PORT = None     # örn. 9108 -> http://127.0.0.1:9108/metrics
 
 
 class App:
@@ -34,17 +63,24 @@ class App:
         self.root.title("ASL Live → Anında Kelime Yazma")
         self.root.geometry("680x260")
 
-        self.model = YOLO(MODEL_PATH)
+        self.prof = from_settings(PROFILE, PROFILE_LOG, PROFILE_PORT)
+
+        # ROI’yi büyüt (el küçük kalmasın) + kontrast artır;
+        # model arka planda yüklenip ısınır, pencere beklemeden açılır
+        self.engine = load_engine(MODEL_PATH, conf=CONF_TH,
+                                  upscale=640, enhance=True,
+                                  profiler=self.prof,
+                                  cache=make_cache(CACHE_TOL, CACHE_TTL_S),
+                                  lazy=True)
 
-        self.pred_hist = deque(maxlen=HISTORY)
-        self.current_candidate = None
-        self.consec = 0
-        self.last_committed = None
+        self.committer = None  # sınıf isimleri model yüklenince belli olur
+        self.decoder = load_decoder(end_after_blank=WORD_END_BLANK) \
+            if WORD_MODE else None
 
         self.text = ""
 
         # UI
-        self.pred_var = tk.StringVar(value="Tahmin: -")
+        self.pred_var = tk.StringVar(value="Model yükleniyor...")
         self.text_var = tk.StringVar(value="Yazı: ")
 
         tk.Label(root, textvariable=self.pred_var,
@@ -63,50 +99,112 @@ class App:
 
         ctrl = tk.Frame(root)
         ctrl.pack(pady=6)
-        tk.Button(ctrl, text="Kamerayı Başlat", width=16,
-                  command=self.start).grid(row=0, column=0, padx=8)
+        self.start_btn = tk.Button(ctrl, text="Kamerayı Başlat", width=16,
+                                   command=self.start, state=tk.DISABLED)
+        self.start_btn.grid(row=0, column=0, padx=8)
         tk.Button(ctrl, text="Kamerayı Durdur", width=16,
                   command=self.stop).grid(row=0, column=1, padx=8)
 
-        self.cap = None
+        self.pipeline = None
+        self.recorder = None
+        self.last_result_seq = 0
+        self.display = MirrorDisplay(mirror=MIRROR)
+        self.track_hand = TRACK_HAND
+        self.tracker = HandTracker()
         self.running = False
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.check_model()
+
+    def check_model(self):
+        """Model yüklenene kadar kamera butonu kapalı."""
+        if self.engine.loading:
+            self.root.after(100, self.check_model)
+            return
+        if self.engine.error is not None:
+            self.pred_var.set("Model yüklenemedi")
+            messagebox.showerror("Hata", f"Model yüklenemedi:\n{self.engine.error}")
+            return
+        self.committer = LetterCommitter(self.engine.names, conf_th=CONF_TH,
+                                         req_consec=REQ_CONSEC, window=HISTORY,
+                                         mode=VOTE)
+        self.pred_var.set("Tahmin: -")
+        self.start_btn.config(state=tk.NORMAL)
 
     def add_space(self):
+        if self.decoder is not None:
+            word = self.decoder.end_word()
+            if word:
+                self.text += word
         self.text += " "
         self.text_var.set(f"Yazı: {self.text}")
-        self.last_committed = None
+        if self.committer is not None:
+            self.committer.reset_last()
+        self.record_event("space")
 
     def backspace(self):
         if self.text:
             self.text = self.text[:-1]
             self.text_var.set(f"Yazı: {self.text}")
-        self.last_committed = None
+        if self.committer is not None:
+            self.committer.reset_last()
+        self.record_event("backspace")
 
     def clear_text(self):
+        if self.decoder is not None:
+            self.decoder.reset()
         self.text = ""
         self.text_var.set("Yazı: ")
-        self.last_committed = None
+        if self.committer is not None:
+            self.committer.reset_last()
+        self.record_event("clear")
+
+    def record_event(self, kind, **data):
+        if self.recorder is not None:
+            self.recorder.event(kind, **data)
 
     def start(self):
-        if self.running:
+        if self.running or self.committer is None:
             return
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
+        rate = RateController(target_fps=INFER_FPS, cpu_budget=CPU_BUDGET,
+                              diff_th=DIFF_TH, region_fn=self.raw_roi)
+        self.pipeline = FramePipeline(self.infer_frame, source=SOURCE, rate=rate,
+                                      profiler=self.prof, capture=CAPTURE,
+                                      min_size=required_size(ROI_SIZE, ROI_MARGIN, 10))
+        if not self.pipeline.isOpened():
+            self.pipeline.stop()
+            self.pipeline = None
             messagebox.showerror("Hata", "Kamera açılamadı.")
             return
+        if RECORD:
+            names = self.engine.names
+            self.recorder = SessionRecorder(codec=RECORD_CODEC, meta={
+                "app": "gui_auto_word", "source": str(SOURCE),
+                "names": [names[i] for i in sorted(names)],
+                "conf": CONF_TH, "upscale": 640, "enhance": True,
+                "conf_th": CONF_TH, "req_consec": REQ_CONSEC, "window": HISTORY,
+                "vote": VOTE, "word_mode": WORD_MODE, "word_end_blank": WORD_END_BLANK,
+                "text": self.text})
         self.running = True
+        self.last_result_seq = 0
+        self.tracker.reset()
+        self.pipeline.start()
         self.loop()
 
     def stop(self):
         self.running = False
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
+        if self.recorder is not None:
+            path = self.recorder.close(text=self.text)
+            print(f" kayıt: {path} ({self.recorder.frames} kare, "
+                  f"{self.recorder.dropped} atlandı)")
+            self.recorder = None
         cv2.destroyAllWindows()
 
     def on_close(self):
         self.stop()
+        self.prof.close()
         self.root.destroy()
 
     def get_roi(self, frame):
@@ -124,87 +222,143 @@ class App:
 
         return x1, y1, x2, y2
 
-    def predict_roi(self, roi_bgr):
-        # ROI’yi büyüt (el küçük kalmasın)
-        roi_big = cv2.resize(roi_bgr, (640, 640),
-                             interpolation=cv2.INTER_LINEAR)
-        roi_big = enhance_for_model(roi_big)
+    def raw_roi_box(self, frame):
+        """Modelin baktığı kutu, ham (aynasız) kare koordinatında."""
+        if self.track_hand and self.tracker.box is not None:
+            return self.tracker.box
+        box = self.get_roi(frame)
+        if MIRROR:
+            box = mirrored_box(box, frame.shape[1])
+        return box
 
-        results = self.model.predict(roi_big, conf=CONF_TH, verbose=False)
-        r = results[0]
+    def raw_roi(self, frame):
+        """Ekrandaki ROI'nin ham (aynasız) karedeki görünümü, kopyasız."""
+        x1, y1, x2, y2 = self.raw_roi_box(frame)
+        return frame[y1:y2, x1:x2]
 
-        if r.boxes is None or len(r.boxes) == 0:
-            return None, None, r.plot()
+    def predict_roi(self, roi_bgr):
+        """(label, conf, top-3 [(label, conf), ...]); tespit yoksa label None."""
+        top = [(d.label, d.conf) for d in self.engine.predict(roi_bgr).topk(3)]
+        if not top:
+            return None, None, top
+        return top[0][0], top[0][1], top
+
+    def infer_frame(self, frame):
+        """Tahmin thread'inde çalışır: ROI (kopyasız görünüm) + tahmin.
+
+        Büyütme ve CLAHE engine içinde sabit tamponlarla yapılır.
+        (label, conf, roi, ham ROI kutusu, top-3) döndürür.
+        """
+        if self.track_hand:
+            top = []
+
+            def predict_best(r):
+                pred = self.engine.predict(r)
+                top[:] = [(d.label, d.conf) for d in pred.topk(3)]
+                return pred.best()
+
+            det, box = self.tracker.predict(frame, predict_best)
+            if box is None:
+                return None, None, None, None, []
+            x1, y1, x2, y2 = box
+            roi = frame[y1:y2, x1:x2]
+            if det is None:
+                return None, None, roi, box, []
+            return det.label, det.conf, roi, box, top
+
+        box = self.raw_roi_box(frame)
+        roi = self.raw_roi(frame)
+
+        label, conf, top = self.predict_roi(roi)
+        return label, conf, roi, box, top
+
+    def update_prediction(self, label, conf):
+        # oylama + ardışık kare teyidi smoothing.LetterCommitter'da
+        letter = self.committer.update(label, conf)
+        stable = self.committer.stable
+
+        if stable is None:
+            self.pred_var.set("Tahmin: -")
+        elif conf is None:
+            self.pred_var.set(f"Tahmin: {stable}")
+        else:
+            self.pred_var.set(f"Tahmin: {stable} (conf: {conf:.2f})")
 
-        confs = r.boxes.conf.tolist()
-        best_i = confs.index(max(confs))
+        # Yeterli teyit → hemen ekle
+        if letter is not None:
+            self.record_event("letter", letter=letter)
+            self.text += letter
+            self.text_var.set(f"Yazı: {self.text}")
 
-        cls_id = int(r.boxes.cls[best_i].item())
-        label = r.names[cls_id]
-        conf = float(r.boxes.conf[best_i].item())
+    def update_word(self, top):
+        # kelime modu: her tahminde beam search bir adım ilerler
+        word = self.decoder.step(top)
+        if word:
+            self.record_event("word", word=word)
+            self.text += word + " "
+            self.text_var.set(f"Yazı: {self.text}")
 
-        return label, conf, r.plot()
+        hyp = self.decoder.best or "-"
+        sugg = " | ".join(self.decoder.suggestions(3))
+        self.pred_var.set(f"Kelime: {hyp}   Öneri: {sugg}" if sugg else f"Kelime: {hyp}")
 
     def loop(self):
         if not self.running:
             return
 
-        ok, frame = self.cap.read()
-        if not ok:
-            self.root.after(20, self.loop)
+        item = self.pipeline.poll()
+        if item is None:
+            if self.pipeline.failed:
+                err = self.pipeline.worker.error
+                self.stop()
+                if err is not None:
+                    messagebox.showerror("Hata", f"Tahmin durdu:\n{err}")
+                return
+            cv2.waitKey(1)
+            self.root.after(5, self.loop)
             return
 
-        if MIRROR:
-            frame = cv2.flip(frame, 1)
-
-        x1, y1, x2, y2 = self.get_roi(frame)
-        roi = frame[y1:y2, x1:x2].copy()
-
-        label, conf, ann_roi_big = self.predict_roi(roi)
-
-        # ROI penceresi (el gerçekten kutuda mı gör)
-        if SHOW_ROI_WINDOW:
-            cv2.imshow("ROI (Hand Box)", roi)
+        frame, result_seq, result = item
+        frame = self.display(frame)  # ayna sadece ekranda, sabit tampona
 
-        # Tahmin history’ye sadece gerçek tespit varsa ekle
-        if label is not None and conf is not None and conf >= CONF_TH:
-            self.pred_hist.append(label)
-
-        stable = Counter(self.pred_hist).most_common(1)[
-            0][0] if self.pred_hist else None
-
-        if stable is None:
-            self.pred_var.set("Tahmin: -")
+        # takipte kutu eli izler; el kayıpken sabit kutu gösterilir
+        raw_box = result[3] if result is not None else None
+        if self.track_hand and raw_box is not None:
+            x1, y1, x2, y2 = mirrored_box(raw_box, frame.shape[1]) \
+                if MIRROR else raw_box
         else:
-            self.pred_var.set(f"Tahmin: {stable} (conf: {conf:.2f})")
+            x1, y1, x2, y2 = self.get_roi(frame)
 
-        # Ardışık kare teyidi
-        if stable != self.current_candidate:
-            self.current_candidate = stable
-            self.consec = 0
+        # Harf teyidi sadece yeni tahmin geldiğinde ilerler
+        if result is not None and result_seq != self.last_result_seq:
+            self.last_result_seq = result_seq
+            label, conf, roi, box, top = result
+            if self.recorder is not None:
+                self.recorder.frame(roi, label, conf, top, box)
 
-        if stable is not None and conf is not None and conf >= CONF_TH:
-            self.consec += 1
-        else:
-            self.consec = max(0, self.consec - 1)
+            # ROI penceresi (el gerçekten kutuda mı gör)
+            if SHOW_ROI_WINDOW and roi is not None:
+                cv2.imshow("ROI (Hand Box)", cv2.flip(roi, 1) if MIRROR else roi)
 
-        # Yeterli teyit → hemen ekle
-        if stable is not None and self.consec >= REQ_CONSEC and stable != self.last_committed:
-            self.text += stable
-            self.text_var.set(f"Yazı: {self.text}")
-            self.last_committed = stable
-            self.consec = 0  # aynı harfi tekrar yazmasın diye
+            if self.decoder is not None:
+                self.update_word(top)
+            else:
+                self.update_prediction(label, conf)
 
         # Ana görüntü
-        display = frame.copy()
-        cv2.rectangle(display, (x1, y1), (x2, y2), (80, 255, 80), 2)
-        cv2.putText(display, "Elini yesil kutuya koy (q ile kapat)",
-                    (12, 32), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (80, 255, 80), 2)
+        display = frame
+        with self.prof.stage("draw"):
+            cv2.rectangle(display, (x1, y1), (x2, y2), (80, 255, 80), 2)
+            cv2.putText(display, "Elini yesil kutuya koy (q ile kapat)",
+                        (12, 32), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (80, 255, 80), 2)
 
-        cv2.putText(display, self.text[-20:], (12, display.shape[0] - 18),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (50, 255, 50), 2)
+            cv2.putText(display, self.text[-20:], (12, display.shape[0] - 18),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (50, 255, 50), 2)
+            self.prof.draw_overlay(display, origin=(12, 60))
 
-        cv2.imshow("ASL Live", display)
+        with self.prof.stage("show"):
+            cv2.imshow("ASL Live", display)
+        self.prof.frame()
 
         key = cv2.waitKey(1) & 0xFF
         if key == ord("q"):
@@ -216,8 +370,11 @@ class App:
             self.backspace()
         elif key == ord("c"):
             self.clear_text()
+        elif key == ord("t"):
+            self.track_hand = not self.track_hand
+            self.tracker.reset()
 
-        self.root.after(10, self.loop)
+        self.root.after(5, self.loop)
 
 
 if __name__ == "__main__":
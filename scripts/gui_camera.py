@@ -1,81 +1,157 @@
 import cv2
-from collections import deque, Counter
-from ultralytics import YOLO
+from frame_pipeline import FramePipeline, RateController
+from inference import MODEL_PATH, load_engine
+from preprocess import MirrorDisplay
+from hand_tracker import HandTracker
+from smoothing import TemporalSmoother
+from profiling import from_settings
+from result_cache import make_cache
 
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
 CONF_TH = 0.70               # düşükse "Unknown"
 HISTORY = 12                 # son 12 tahminle oylama
-
-model = YOLO(MODEL_PATH)
-history = deque(maxlen=HISTORY)
-
-
-def majority_vote(hist):
-    if not hist:
+VOTE = "count"               # "count" / "conf" (confidence ağırlıklı) / "decay" (üstel azalan)
+INFER_FPS = 10               # saniyede en fazla tahmin (None = sınırsız)
+CPU_BUDGET = 0.5             # zamanın en fazla bu oranı tahminde geçsin
+DIFF_TH = 2.0                # ROI bundan az değiştiyse son tahmini kullan
+TRACK_HAND = False           # ROI sabit kutu yerine eli izlesin
+SOURCE = 0                   # kamera indeksi, video dosyası, resim klasörü veya rtsp:// adresi
+CAPTURE = "thread"           # "process": kamera ayrı process'te, kareler paylaşımlı bellekten
+CACHE_TOL = 4                # sonuç cache'i: pHash Hamming toleransı (None = kapalı)
+CACHE_TTL_S = 1.0            # cache kaydı en fazla bu kadar saniye kullanılır
+PROFILE = False              # aşama süreleri + FPS overlay
+PROFILE_LOG = None           # örn. "runs/profile_camera.jsonl"
+PROFILE_PORT = None          # örn. 9108 -> http://127.0.0.1:9108/metrics
+
+# main() içinde kurulur: CAPTURE="process" "spawn" ile çalışırken kamera
+# process'i bu dosyayı tekrar import eder, model orada yüklenmesin
+prof = engine = None
+smoother = None  # sınıf isimleri model yüklenince belli olur
+tracker = HandTracker() if TRACK_HAND else None
+
+
+# ROI kutusu (elini buraya koy)
+ROI_X1, ROI_Y1 = 120, 80
+ROI_X2, ROI_Y2 = 520, 480
+
+
+def roi_region(frame):
+    if tracker is not None and tracker.box is not None:
+        x1, y1, x2, y2 = tracker.box
+        return frame[y1:y2, x1:x2]
+    return frame[ROI_Y1:ROI_Y2, ROI_X1:ROI_X2]
+
+
+def predict_roi(frame):
+    """Tahmin thread'inde çalışır; ROI'deki en iyi (label, conf) veya None.
+
+    El takibi açıksa (label, conf, takip kutusu) döner, el kayıpken None.
+    """
+    if tracker is not None:
+        best, box = tracker.predict(frame, lambda roi: engine.predict(roi).best())
+        if best is None:
+            return None
+        return best.label, best.conf, box
+
+    # ROI kırp
+    roi = frame[ROI_Y1:ROI_Y2, ROI_X1:ROI_X2]
+
+    # Tahmin
+    best = engine.predict(roi).best()
+    if best is None:
         return None
-    return Counter(hist).most_common(1)[0][0]
+    return best.label, best.conf, (ROI_X1, ROI_Y1, ROI_X2, ROI_Y2)
 
 
 def main():
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    global prof, engine, smoother
+    prof = from_settings(PROFILE, PROFILE_LOG, PROFILE_PORT)
+    # model arka planda yüklenip ısınır; kamera bu arada açılır
+    engine = load_engine(MODEL_PATH, conf=0.25, profiler=prof,
+                         cache=make_cache(CACHE_TOL, CACHE_TTL_S), lazy=True)
+    rate = RateController(target_fps=INFER_FPS, cpu_budget=CPU_BUDGET,
+                          diff_th=DIFF_TH, region_fn=roi_region)
+    pipeline = FramePipeline(predict_roi, source=SOURCE, rate=rate,
+                             profiler=prof, capture=CAPTURE,
+                             min_size=(ROI_X2, ROI_Y2))
+    if not pipeline.isOpened():
         print("Kamera açılamadı!")
+        pipeline.stop()
         return
 
-    # ROI kutusu (elini buraya koy)
-    roi_x1, roi_y1 = 120, 80
-    roi_x2, roi_y2 = 520, 480
+    pipeline.start()
+
+    label_to_show = "Unknown"
+    conf_to_show = 0.0
+    last_result_seq = 0
+    box = (ROI_X1, ROI_Y1, ROI_X2, ROI_Y2)
+    display = MirrorDisplay(mirror=False)  # çizim için sabit tampon
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        item = pipeline.wait()
+        if item is None:
+            if not pipeline.running:
+                break
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+            continue
+
+        frame, result_seq, result = item
+        frame = display(frame)
+        if engine.error is not None:
+            print(f"Model yüklenemedi: {engine.error}")
             break
-
-        # ROI kırp
-        roi = frame[roi_y1:roi_y2, roi_x1:roi_x2]
-
-        # Tahmin
-        results = model.predict(source=roi, conf=0.25, verbose=False)
-        r = results[0]
-
-        label_to_show = "Unknown"
-        conf_to_show = 0.0
-
-        if r.boxes is not None and len(r.boxes) > 0:
-            confs = r.boxes.conf.tolist()
-            best_i = confs.index(max(confs))
-
-            cls_id = int(r.boxes.cls[best_i].item())
-            label = r.names[cls_id]
-            conf = float(r.boxes.conf[best_i].item())
-
-            # confidence yeterliyse geçmişe ekle
-            if conf >= CONF_TH:
-                history.append(label)
-
-            voted = majority_vote(history)
-            if voted is not None:
-                label_to_show = voted
-                conf_to_show = conf
-
-        # Ekrana ROI kutusu çiz
-        cv2.rectangle(frame, (roi_x1, roi_y1),
-                      (roi_x2, roi_y2), (0, 255, 0), 2)
-
-        # Üstte yazı
-        cv2.putText(frame, f"ASL: {label_to_show}  (conf: {conf_to_show:.2f})",
-                    (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-        cv2.putText(frame, "Elini yesil kutunun icine koy. Q ile cik.",
-                    (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
-
-        cv2.imshow("ASL Live", frame)
+        if smoother is None and engine.ready:
+            smoother = TemporalSmoother(engine.names, window=HISTORY, mode=VOTE,
+                                        conf_th=CONF_TH)
+
+        # Sadece yeni tahmin geldiyse oylamayı güncelle
+        if result_seq != last_result_seq:
+            last_result_seq = result_seq
+            if result is None:
+                label_to_show = "Unknown"
+                conf_to_show = 0.0
+                if tracker is not None and tracker.box is None:
+                    box = (ROI_X1, ROI_Y1, ROI_X2, ROI_Y2)
+            else:
+                label, conf, box = result
+
+                # confidence yeterliyse oylamaya girer
+                voted, _ = smoother.update(label, conf)
+                if voted is not None:
+                    label_to_show = voted
+                    conf_to_show = conf
+                else:
+                    label_to_show = "Unknown"
+                    conf_to_show = 0.0
+
+        with prof.stage("draw"):
+            # Ekrana ROI kutusu çiz
+            cv2.rectangle(frame, (box[0], box[1]),
+                          (box[2], box[3]), (0, 255, 0), 2)
+
+            # Üstte yazı
+            cv2.putText(frame, f"ASL: {label_to_show}  (conf: {conf_to_show:.2f})",
+                        (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+            cv2.putText(frame, "Elini yesil kutunun icine koy. Q ile cik.",
+                        (20, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
+            if engine.loading:
+                cv2.putText(frame, "Model yukleniyor...", (20, 140),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 200, 255), 2)
+            prof.draw_overlay(frame, origin=(20, 105))
+
+        with prof.stage("show"):
+            cv2.imshow("ASL Live", frame)
+        prof.frame()
 
         key = cv2.waitKey(1) & 0xFF
         if key == ord("q"):
             break
 
-    cap.release()
+    pipeline.stop()
+    if pipeline.worker.error is not None:
+        print(f"Tahmin durdu: {pipeline.worker.error}")
+    prof.close()
     cv2.destroyAllWindows()
 
 
@@ -1,80 +1,133 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox
-from ultralytics import YOLO
-
-import cv2
-from PIL import Image, ImageTk
-
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
-
-# Modeli 1 kere yükle
-model = YOLO(MODEL_PATH)
-
-
-def predict_image(img_path: str):
-    results = model.predict(source=img_path, conf=0.25, save=False)
-    r = results[0]
-
-    # hiç tespit yoksa
-    if r.boxes is None or len(r.boxes) == 0:
-        return None, None, r.plot()
-
-    confs = r.boxes.conf.tolist()
-    best_i = confs.index(max(confs))
+from tkinter import filedialog, messagebox, ttk
+
+from gallery import Gallery
+from inference import MODEL_PATH, load_engine
+from result_cache import make_cache
+from tk_display import TkVideoDisplay
+
+# Modeli 1 kere yükle (aynı resim tekrar seçilirse cache'ten gelir);
+# yükleme arka planda, pencere beklemeden açılır. Resimler birbirinden
+# bağımsız: iki aşamalı modun kareler arası kutu takibi burada anlamsız
+engine = load_engine(MODEL_PATH, conf=0.25, cache=make_cache(0), lazy=True,
+                     mode="detect")
+
+
+GALLERY_POLL_MS = 50
+gallery = None
+index = 0
+
+
+def open_gallery(inputs):
+    """Seçilen dosyalar/klasör için arka planda tahmini başlatır."""
+    global gallery, index
+    if gallery is not None:
+        gallery.close()
+    gallery = Gallery(engine, inputs, conf=0.25)
+    index = 0
+    if not len(gallery):
+        gallery = None
+        messagebox.showerror("Hata", "Resim bulunamadı.")
+        return
+    progress.config(maximum=len(gallery), value=0)
+    show_current()
 
-    cls_id = int(r.boxes.cls[best_i].item())
-    label = r.names[cls_id]
-    confidence = float(r.boxes.conf[best_i].item())
 
-    return label, confidence, r.plot()
+def choose_and_predict():
+    file_paths = filedialog.askopenfilenames(
+        title="Resim(ler) seç",
+        filetypes=[("Image Files", "*.jpg *.jpeg *.png")]
+    )
+    if file_paths:
+        open_gallery(file_paths)
 
 
-def show_image_on_tk(annotated_bgr):
-    # BGR -> RGB
-    rgb = cv2.cvtColor(annotated_bgr, cv2.COLOR_BGR2RGB)
-    img = Image.fromarray(rgb)
+def choose_folder():
+    folder = filedialog.askdirectory(title="Resim klasörü seç")
+    if folder:
+        open_gallery([folder])
 
-    # pencereye sığdır
-    img = img.resize((420, 320))
 
-    imgtk = ImageTk.PhotoImage(image=img)
-    image_label.config(image=imgtk)
-    image_label.image = imgtk
+def show_current():
+    title_text.set(gallery.status(index))
+    img = gallery.show(index)
+    if img is not None:
+        display.submit(img)
 
 
-def choose_and_predict():
-    file_path = filedialog.askopenfilename(
-        title="Bir resim seç",
-        filetypes=[("Image Files", "*.jpg *.jpeg *.png")]
-    )
-    if not file_path:
+def step(delta):
+    global index
+    if gallery is None:
         return
-
-    label, conf, annotated = predict_image(file_path)
-
-    if label is None:
-        messagebox.showinfo("Sonuç", "❌ Hiç harf tespit edemedim.")
-        title_text.set("Sonuç: Bulunamadı")
+    index = min(max(index + delta, 0), len(gallery) - 1)
+    show_current()
+
+
+def poll_gallery():
+    """Arka planda biten sonuçları/resimleri alır; ana thread hiç beklemez."""
+    if gallery is not None:
+        for kind, data in gallery.poll():
+            if kind == "error":
+                messagebox.showerror("Hata", data)
+            elif data == index:
+                show_current()
+        progress.config(value=gallery.done)
+        progress_text.set(f"{gallery.done}/{len(gallery)}")
+    root.after(GALLERY_POLL_MS, poll_gallery)
+
+
+def check_model():
+    """Model yüklenene kadar buton kapalı."""
+    if engine.loading:
+        root.after(100, check_model)
+    elif engine.error is not None:
+        title_text.set("Model yüklenemedi")
+        messagebox.showerror("Hata", f"Model yüklenemedi:\n{engine.error}")
     else:
-        title_text.set(f"Sonuç: {label}  (confidence: {conf:.2f})")
-
-    show_image_on_tk(annotated)
+        title_text.set("Sonuç: -")
+        btn.config(state=tk.NORMAL)
+        folder_btn.config(state=tk.NORMAL)
 
 
 # ---------------- GUI ----------------
 root = tk.Tk()
 root.title("ASL Harf Tanıma - YOLO")
-root.geometry("480x520")
+root.geometry("480x580")
 
-title_text = tk.StringVar(value="Sonuç: -")
+title_text = tk.StringVar(value="Model yükleniyor...")
 lbl = tk.Label(root, textvariable=title_text, font=("Arial", 16))
 lbl.pack(pady=15)
 
-btn = tk.Button(root, text="Resim Seç ve Tahmin Et",
-                font=("Arial", 12), command=choose_and_predict)
-btn.pack(pady=10)
+btns = tk.Frame(root)
+btns.pack(pady=5)
+btn = tk.Button(btns, text="Resim(ler) Seç ve Tahmin Et",
+                font=("Arial", 12), command=choose_and_predict,
+                state=tk.DISABLED)
+btn.grid(row=0, column=0, padx=5)
+folder_btn = tk.Button(btns, text="Klasör Seç", font=("Arial", 12),
+                       command=choose_folder, state=tk.DISABLED)
+folder_btn.grid(row=0, column=1, padx=5)
+
+nav = tk.Frame(root)
+nav.pack(pady=5)
+tk.Button(nav, text="◀", width=4, command=lambda: step(-1)).grid(row=0, column=0)
+progress = ttk.Progressbar(nav, length=260, mode="determinate")
+progress.grid(row=0, column=1, padx=8)
+progress_text = tk.StringVar(value="")
+tk.Label(nav, textvariable=progress_text, width=9).grid(row=0, column=2)
+tk.Button(nav, text="▶", width=4, command=lambda: step(1)).grid(row=0, column=3)
 
 image_label = tk.Label(root)
 image_label.pack(pady=10)
+display = TkVideoDisplay(image_label, size=(420, 320))
+
+root.bind("<Left>", lambda e: step(-1))
+root.bind("<Right>", lambda e: step(1))
+
+check_model()
+poll_gallery()
 
 root.mainloop()
+# pencere kapandı: galerinin arka plan thread'lerini durdur
+if gallery is not None:
+    gallery.close()
@@ -0,0 +1,157 @@
+import cv2
+
+
+def square_box(x1, y1, x2, y2, frame_w, frame_h, pad=0.4, min_side=160):
+    """Kutuyu pay bırakarak kare yapar ve kare içinde kalacak şekilde kaydırır."""
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    side = max(x2 - x1, y2 - y1) * (1 + 2 * pad)
+    side = int(min(max(side, min_side), frame_w, frame_h))
+
+    nx1 = int(round(cx - side / 2))
+    ny1 = int(round(cy - side / 2))
+    nx1 = min(max(0, nx1), frame_w - side)
+    ny1 = min(max(0, ny1), frame_h - side)
+    return nx1, ny1, nx1 + side, ny1 + side
+
+
+class TemplateTracker:
+    """Çok hafif takipçi: son kutuyu şablon alıp küçük bir arama alanında
+    matchTemplate ile arar. OpenCV tracker'larıyla aynı arayüz (x, y, w, h)."""
+
+    def __init__(self, scale=0.5, search=0.6, min_score=0.45):
+        self.scale = scale
+        self.search = search
+        self.min_score = min_score
+        self.template = None
+        self.box = None
+
+    def _gray(self, frame):
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale,
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def init(self, frame, box):
+        x, y, w, h = [int(v * self.scale) for v in box]
+        gray = self._gray(frame)
+        self.template = gray[y:y + h, x:x + w].copy()
+        self.box = (x, y, w, h)
+        return self.template.size > 0
+
+    def update(self, frame):
+        if self.template is None or self.template.size == 0:
+            return False, None
+        gray = self._gray(frame)
+        H, W = gray.shape
+        x, y, w, h = self.box
+        mx, my = int(w * self.search), int(h * self.search)
+        sx1, sy1 = max(0, x - mx), max(0, y - my)
+        sx2, sy2 = min(W, x + w + mx), min(H, y + h + my)
+        area = gray[sy1:sy2, sx1:sx2]
+        if area.shape[0] < h or area.shape[1] < w:
+            return False, None
+
+        res = cv2.matchTemplate(area, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, loc = cv2.minMaxLoc(res)
+        if score < self.min_score:
+            return False, None
+
+        self.box = (sx1 + loc[0], sy1 + loc[1], w, h)
+        s = 1.0 / self.scale
+        return True, tuple(int(v * s) for v in self.box)
+
+
+def create_tracker(name="template"):
+    """"template" veya OpenCV tracker adı ("mil", "kcf", "csrt")."""
+    if name == "template":
+        return TemplateTracker()
+    factory = getattr(cv2, f"Tracker{name.upper()}_create", None)
+    if factory is None and hasattr(cv2, "legacy"):
+        factory = getattr(cv2.legacy, f"Tracker{name.upper()}_create", None)
+    if factory is None:
+        raise ValueError(f"OpenCV'de {name} tracker yok (opencv-contrib gerekebilir)")
+    return factory()
+
+
+class HandTracker:
+    """ROI'yi sabit kutu yerine eli takip ederek seçer.
+
+    - Son tespitin kutusu tracker'ı başlatır; aradaki karelerde tracker
+      kutuyu taşır ve model bu sıkı, kare ROI'yi görür.
+    - max_miss kare üst üste el bulunamazsa el "kayıp" sayılır; bu durumda
+      tahmin yapılmaz, sadece her scan_every karede bir tüm kare taranır.
+
+    next_roi() -> (kutu, mod): mod "track" / "scan" / "skip".
+    observe() tahmin sonrasında çağrılır (det: ROI koordinatında Detection).
+    Tüm kutular ham (aynasız) kare koordinatındadır.
+    """
+
+    def __init__(self, tracker="template", pad=0.4, min_side=160,
+                 max_miss=6, scan_every=8):
+        self.tracker_name = tracker
+        self.pad = pad
+        self.min_side = min_side
+        self.max_miss = max_miss
+        self.scan_every = scan_every
+        self.reset()
+
+    def reset(self):
+        self._tracker = None
+        self.box = None
+        self.misses = 0
+        self._lost_frames = 0
+
+    @property
+    def tracking(self):
+        return self._tracker is not None
+
+    def next_roi(self, frame):
+        h, w = frame.shape[:2]
+
+        if self._tracker is not None:
+            ok, xywh = self._tracker.update(frame)
+            if ok:
+                x, y, bw, bh = xywh
+                self.box = square_box(x, y, x + bw, y + bh, w, h,
+                                      self.pad, self.min_side)
+                return self.box, "track"
+            self._tracker = None
+
+        # el kayıp: düşük hızda tüm kareyi tara, arada tahmin yapma
+        self._lost_frames += 1
+        if self._lost_frames % self.scan_every == 1 or self.scan_every <= 1:
+            return (0, 0, w, h), "scan"
+        return self.box, "skip"
+
+    def observe(self, frame, roi_box, det):
+        """Tahmin sonucuyla tracker'ı tazele veya kayıp say."""
+        if det is None:
+            self.misses += 1
+            if self.misses >= self.max_miss:
+                self._tracker = None
+                self.box = None
+            return
+
+        ox, oy = roi_box[0], roi_box[1]
+        x1, y1, x2, y2 = det.box
+        x1, y1, x2, y2 = x1 + ox, y1 + oy, x2 + ox, y2 + oy
+        h, w = frame.shape[:2]
+
+        self.misses = 0
+        self._lost_frames = 0
+        self._tracker = create_tracker(self.tracker_name)
+        if self._tracker.init(frame, (x1, y1, x2 - x1, y2 - y1)) is False:
+            self._tracker = None
+        self.box = square_box(x1, y1, x2, y2, w, h, self.pad, self.min_side)
+
+    def predict(self, frame, predict_fn):
+        """Takip edilen ROI'de predict_fn(roi) -> Detection/None çalıştırır.
+
+        (det, roi_kutusu) döndürür; "skip" karelerinde model hiç çağrılmaz.
+        """
+        box, mode = self.next_roi(frame)
+        if mode == "skip":
+            return None, box
+        x1, y1, x2, y2 = box
+        det = predict_fn(frame[y1:y2, x1:x2])
+        self.observe(frame, box, det)
+        return det, box
@@ -0,0 +1,206 @@
+import argparse
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+from engine_client import (DEFAULT_ADDRESS, decode_image, parse_address,
+                           recv_msg, send_msg)
+from inference import BACKEND, InferenceEngine, MODEL_PATH
+
+# --- Ayarlar ---
+MAX_BATCH = 8           # bir predict çağrısında en fazla kaç görüntü
+MAX_WAIT_MS = 4         # ilk istekten sonra batch dolsun diye en fazla bekleme
+STATS_EVERY_S = 10.0    # bu aralıkla istek/s ve ortalama batch boyutu yazılır
+
+
+class _Job:
+    __slots__ = ("img", "conf", "done", "reply")
+
+    def __init__(self, img, conf):
+        self.img = img
+        self.conf = conf
+        self.done = threading.Event()
+        self.reply = None
+
+
+class DynamicBatcher:
+    """İstemcilerden gelen görüntüleri toplayıp tek predict çağrısında işler.
+
+    İlk istek geldiğinde en fazla max_wait_ms kadar (veya batch dolana kadar)
+    beklenir; aynı conf'a sahip istekler birlikte modele verilir.
+    """
+
+    def __init__(self, engine, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._q = queue.Queue()
+        self._running = True
+        self.n_requests = 0
+        self.n_batches = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, img, conf):
+        """İstemci thread'inden çağrılır, sonuç gelene kadar bekler."""
+        job = _Job(img, conf)
+        self._q.put(job)
+        job.done.wait()
+        return job.reply
+
+    def _collect(self):
+        try:
+            first = self._q.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        jobs = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(jobs) < self.max_batch:
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            try:
+                jobs.append(self._q.get(timeout=left))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        while self._running:
+            jobs = self._collect()
+            if not jobs:
+                continue
+
+            groups = {}
+            for job in jobs:
+                groups.setdefault(job.conf, []).append(job)
+
+            for conf, group in groups.items():
+                try:
+                    results = self.engine.infer([j.img for j in group], conf=conf)
+                    preds = self.engine.postprocess(results, [(1.0, 1.0)] * len(group))
+                    for job, p in zip(group, preds):
+                        job.reply = {"boxes": p.boxes.tolist(),
+                                     "confs": p.confs.tolist(),
+                                     "cls": p.cls_ids.tolist()}
+                except Exception as e:
+                    for job in group:
+                        job.reply = {"error": repr(e)}
+                for job in group:
+                    job.done.set()
+                self.n_batches += 1
+                self.n_requests += len(group)
+
+    def close(self):
+        self._running = False
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        if self.request.family == socket.AF_INET:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        srv = self.server
+        while True:
+            try:
+                header, payload = recv_msg(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            op = header.get("op")
+            if op == "info":
+                reply = {"names": srv.engine.names, "model": srv.engine.model_path,
+                         "backend": srv.engine.backend}
+            elif op == "predict":
+                try:
+                    img = decode_image(header, payload)
+                except (ValueError, KeyError, TypeError) as e:
+                    img, err = None, f"görüntü çözülemedi: {e}"
+                else:
+                    err = "görüntü çözülemedi"
+                if img is None:
+                    reply = {"error": err}
+                else:
+                    conf = header.get("conf", srv.engine.conf)
+                    reply = srv.batcher.submit(img, conf)
+                reply["id"] = header.get("id")
+            else:
+                reply = {"error": f"bilinmeyen op: {op}"}
+
+            try:
+                send_msg(self.request, reply)
+            except OSError:
+                return
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(engine, address=DEFAULT_ADDRESS, max_batch=MAX_BATCH,
+                max_wait_ms=MAX_WAIT_MS):
+    family, addr = parse_address(address)
+    if family == socket.AF_UNIX:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        server = _UnixServer(addr, _Handler)
+    else:
+        server = _TCPServer(addr, _Handler)
+    server.engine = engine
+    server.batcher = DynamicBatcher(engine, max_batch, max_wait_ms)
+    return server
+
+
+def _log_stats(batcher, every_s):
+    last_req, last_batch = 0, 0
+    while True:
+        time.sleep(every_s)
+        req, bat = batcher.n_requests, batcher.n_batches
+        if req != last_req:
+            print(f" {(req - last_req) / every_s:6.1f} istek/s, "
+                  f"ort. batch {(req - last_req) / max(1, bat - last_batch):.2f}")
+        last_req, last_batch = req, bat
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Tek modeli birden çok istemciye (GUI'ler) dinamik batch ile sunar.")
+    ap.add_argument("--address", default=DEFAULT_ADDRESS,
+                    help='"host:port" veya "unix:/tmp/asl.sock"')
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--imgsz", type=int, default=None,
+                    help="varsayılan: modelin eğitildiği boyut")
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = ap.parse_args()
+
+    # ön işleme istemcide yapılır; sunucu sadece modeli çalıştırır
+    engine = InferenceEngine(args.model, imgsz=args.imgsz, backend=args.backend)
+    server = make_server(engine, args.address, args.max_batch, args.max_wait_ms)
+    threading.Thread(target=_log_stats, args=(server.batcher, STATS_EVERY_S),
+                     daemon=True).start()
+
+    print(f"Sunucu hazır: {args.address}  (model: {engine.model_path}, "
+          f"batch<={args.max_batch}, bekleme<={args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.batcher.close()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
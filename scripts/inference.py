@@ -0,0 +1,364 @@
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+from model_registry import best_model_path
+from preprocess import Preprocessor
+from profiling import NULL_PROFILER
+
+DEFAULT_MODEL = "runs/asl_sign_model3/weights/best.pt"
+
+# Model seçimi: train.py'nin kayıtlarından (runs/registry.json) ölçüte göre
+# en iyisi: "accuracy" / "speed" / "balanced"; None ya da kayıt yoksa DEFAULT_MODEL
+MODEL_SELECT = "accuracy"
+MODEL_PATH = best_model_path(MODEL_SELECT, DEFAULT_MODEL) if MODEL_SELECT \
+    else DEFAULT_MODEL
+
+# Hangi model dosyası kullanılsın (export_model.py ile üretilir):
+# "pt" / "onnx" / "onnx_int8" / "openvino" / "openvino_int8"
+# "auto": best.pt'den yeni olan export varsa onu (openvino > onnx), yoksa pt.
+BACKEND = "pt"
+BACKENDS = ("pt", "onnx", "onnx_int8", "openvino", "openvino_int8")
+AUTO_ORDER = ("openvino", "onnx")
+# Backend'in yüklenirken import ettiği modüller (export'ları da ultralytics açar)
+BACKEND_MODULES = {
+    "pt": ("ultralytics",),
+    "onnx": ("ultralytics", "onnxruntime"),
+    "onnx_int8": ("ultralytics", "onnxruntime"),
+    "openvino": ("ultralytics", "openvino"),
+    "openvino_int8": ("ultralytics", "openvino"),
+}
+
+# True ise "auto" export bulamadığında model yüklendikten sonra arka planda
+# best.onnx üretilir; sonraki açılışlar onu yükler.
+AUTO_EXPORT = False
+
+# "detect": her karede dedektör. "two_stage": dedektör sadece el kutusunu
+# birkaç karede bir tazeler, harfi küçük crop sınıflandırıcısı verir
+# (crop_classifier.py; ağırlıklar yoksa "detect" gibi çalışır).
+MODE = "detect"
+
+# Ortak model sunucusu (infer_server.py), örn. "127.0.0.1:8765" veya
+# "unix:/tmp/asl.sock". None ise her script modeli kendisi yükler.
+SERVER = None
+
+_EMPTY_BOXES = np.zeros((0, 4), dtype=np.float32)
+_EMPTY_F32 = np.zeros((0,), dtype=np.float32)
+_EMPTY_I32 = np.zeros((0,), dtype=np.int32)
+
+
+@dataclass(frozen=True)
+class Detection:
+    label: str
+    conf: float
+    box: tuple  # (x1, y1, x2, y2) - predict'e verilen görüntünün koordinatında
+
+    def mirrored(self, width):
+        """Yatay aynalanmış görüntüdeki karşılığı (width: görüntü genişliği)."""
+        x1, y1, x2, y2 = self.box
+        return Detection(self.label, self.conf, (width - x2, y1, width - x1, y2))
+
+
+@dataclass
+class Prediction:
+    """Bir karenin tahmini; kutular NumPy dizisi olarak tutulur."""
+    boxes: np.ndarray      # (N, 4) float32, xyxy
+    confs: np.ndarray      # (N,) float32
+    cls_ids: np.ndarray    # (N,) int32
+    names: dict
+
+    def __len__(self):
+        return len(self.confs)
+
+    def best(self):
+        """En yüksek confidence'lı tespit ya da None."""
+        if len(self.confs) == 0:
+            return None
+        i = int(self.confs.argmax())
+        return self._detection(i)
+
+    def topk(self, k=3):
+        """Confidence'a göre ilk k tespit (büyükten küçüğe)."""
+        n = len(self.confs)
+        if n == 0:
+            return []
+        k = min(k, n)
+        if k < n:
+            idx = np.argpartition(-self.confs, k - 1)[:k]
+        else:
+            idx = np.arange(n)
+        idx = idx[np.argsort(-self.confs[idx])]
+        return [self._detection(int(i)) for i in idx]
+
+    def _detection(self, i):
+        x1, y1, x2, y2 = self.boxes[i]
+        return Detection(self.names[int(self.cls_ids[i])], float(self.confs[i]),
+                         (int(x1), int(y1), int(x2), int(y2)))
+
+
+def model_artifact(model_path=MODEL_PATH, backend="pt"):
+    """best.pt'nin yanındaki, verilen backend'e ait dosya/klasör yolu."""
+    p = Path(model_path)
+    if backend == "pt":
+        return str(p)
+    if backend == "onnx":
+        return str(p.with_suffix(".onnx"))
+    if backend == "onnx_int8":
+        return str(p.with_name(p.stem + "_int8.onnx"))
+    if backend == "openvino":
+        return str(p.with_name(p.stem + "_openvino_model"))
+    if backend == "openvino_int8":
+        return str(p.with_name(p.stem + "_int8_openvino_model"))
+    raise ValueError(f"Bilinmeyen backend: {backend} ({', '.join(BACKENDS)})")
+
+
+def resolve_backend(model_path=MODEL_PATH, backend=BACKEND):
+    """"auto" ise kullanılacak backend'i seçer (export best.pt'den eski değilse)."""
+    if backend != "auto":
+        return backend
+    src = Path(model_path)
+    if not src.exists():
+        return "pt"
+    for name in AUTO_ORDER:
+        art = Path(model_artifact(model_path, name))
+        if art.exists() and art.stat().st_mtime >= src.stat().st_mtime:
+            return name
+    return "pt"
+
+
+def import_backend(backend=BACKEND, model_path=MODEL_PATH):
+    """Seçilen backend'in modüllerini önceden import eder (soğuk açılış ölçümü)."""
+    for name in BACKEND_MODULES[resolve_backend(model_path, backend)]:
+        importlib.import_module(name)
+
+
+def draw_detection(img, det, offset=(0, 0), color=(0, 255, 0)):
+    """Sadece en iyi kutuyu doğrudan img üzerine çizer (Results.plot() yerine).
+
+    offset: det kutusu ROI koordinatındaysa ROI'nin img içindeki sol üst köşesi.
+    """
+    if det is None:
+        return img
+    ox, oy = offset
+    x1, y1, x2, y2 = det.box
+    p1 = (x1 + ox, y1 + oy)
+    cv2.rectangle(img, p1, (x2 + ox, y2 + oy), color, 2)
+    cv2.putText(img, f"{det.label} {det.conf:.2f}", (p1[0], max(15, p1[1] - 6)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return img
+
+
+class InferenceEngine:
+    """Modeli yükler, ısıtır, ön işlemeyi yapar ve sade sonuç döndürür.
+
+    Bütün script'ler tahmini bunun üzerinden yapar; böylece buradaki her
+    iyileştirme hepsine birden yansır.
+
+    upscale: verilirse görüntü modele (upscale, upscale) boyutunda verilir,
+             kutular tekrar orijinal boyuta çevrilir.
+    enhance: True ise CLAHE ile kontrast artırılır.
+    Ön işleme sabit tamponlarla yapılır (preprocess.Preprocessor).
+    backend: "pt" dışındakiler için best.pt yanındaki export dosyası yüklenir
+             ("auto" için resolve_backend'e bakın).
+    profiler: verilirse preprocess / predict / postprocess süreleri ölçülür.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, conf=0.25, imgsz=None,
+                 upscale=None, enhance=False, warmup=True, backend=BACKEND,
+                 profiler=None):
+        # ultralytics (ve torch) import'u ağır: sadece model gerçekten
+        # yüklenirken yapılır, inference'ı import etmek ucuz kalsın
+        from ultralytics import YOLO
+
+        self.backend = resolve_backend(model_path, backend)
+        self.prof = profiler or NULL_PROFILER
+        self.model_path = model_artifact(model_path, self.backend)
+        self.conf = conf
+        self.upscale = upscale
+        self.enhance = enhance
+        self._pre = Preprocessor(size=upscale, enhance=enhance)
+
+        self.model = YOLO(self.model_path, task="detect")
+        self.names = self.model.names
+        if imgsz is None:
+            # modelin eğitildiği boyut (416 ile eğitilen 416'da çalışsın)
+            imgsz = self.model.overrides.get("imgsz") or 640
+            if isinstance(imgsz, (list, tuple)):
+                imgsz = max(imgsz)
+        self.imgsz = int(imgsz)
+
+        if warmup:
+            self.warmup()
+
+    def warmup(self, n=1):
+        """İlk predict'in tek seferlik maliyetini kamera açılmadan öde."""
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(n):
+            self.model.predict(dummy, imgsz=self.imgsz, verbose=False)
+
+    def preprocess(self, bgr, reuse=True):
+        """(modele verilecek görüntü, x ölçeği, y ölçeği) döndürür.
+
+        reuse=True iken çıktı engine'in tamponudur, sonraki çağrıda ezilir.
+        """
+        sx = sy = 1.0
+        if self.upscale:
+            h, w = bgr.shape[:2]
+            sx, sy = w / self.upscale, h / self.upscale
+        return self._pre(bgr, reuse=reuse), sx, sy
+
+    def predict(self, bgr, conf=None):
+        """Tek BGR görüntü (veya dosya yolu) için Prediction döndürür."""
+        if isinstance(bgr, str):
+            bgr = cv2.imread(bgr)
+        if bgr is None:
+            return None
+        return self.predict_many([bgr], conf=conf)[0]
+
+    def predict_many(self, images, conf=None):
+        """Birden çok BGR görüntüyü tek predict çağrısıyla işler."""
+        if not images:
+            return []
+        conf = self.conf if conf is None else conf
+
+        # tek görüntüde tampon tekrar kullanılır, batch'te her biri ayrı olmalı
+        reuse = len(images) == 1
+        prepped, scales = [], []
+        with self.prof.stage("preprocess"):
+            for img in images:
+                x, sx, sy = self.preprocess(img, reuse=reuse)
+                prepped.append(x)
+                scales.append((sx, sy))
+
+        with self.prof.stage("predict"):
+            results = self.infer(prepped, conf=conf)
+        with self.prof.stage("postprocess"):
+            return self.postprocess(results, scales)
+
+    def infer(self, prepped, conf=None):
+        """Ön işlenmiş görüntü(ler)i modelden geçirir; ham ultralytics sonuçları."""
+        conf = self.conf if conf is None else conf
+        return self.model.predict(prepped, conf=conf, imgsz=self.imgsz,
+                                  verbose=False)
+
+    def postprocess(self, results, scales):
+        """Ham sonuçları Prediction listesine çevirir (kutular orijinal boyuta)."""
+        return [self._to_prediction(r, sx, sy)
+                for r, (sx, sy) in zip(results, scales)]
+
+    def _to_prediction(self, r, sx=1.0, sy=1.0):
+        if r.boxes is None or len(r.boxes) == 0:
+            return Prediction(_EMPTY_BOXES, _EMPTY_F32, _EMPTY_I32,
+                              self.names)
+
+        # xyxy, conf, cls tek seferde NumPy'a
+        data = r.boxes.data.cpu().numpy()
+        boxes = data[:, :4].astype(np.float32)
+        if sx != 1.0 or sy != 1.0:
+            boxes *= np.array([sx, sy, sx, sy], dtype=np.float32)
+        confs = data[:, -2].astype(np.float32)
+        cls_ids = data[:, -1].astype(np.int32)
+        return Prediction(boxes, confs, cls_ids, self.names)
+
+
+class LazyEngine:
+    """Engine'i arka planda kuran vekil; pencere model yüklenmeden açılır.
+
+    factory arka plan thread'inde çağrılır (yükleme + ısınma). ready / wait()
+    / error beklemeden sorulabilir; diğer her erişim (predict, names, ...)
+    yükleme bitene kadar bekler, sonra asıl engine'e gider.
+    """
+
+    def __init__(self, factory, on_ready=None):
+        self.engine = None
+        self.error = None
+        self.load_s = None
+        self._on_ready = on_ready
+        self._done = threading.Event()
+        self._t0 = time.perf_counter()
+        threading.Thread(target=self._load, args=(factory,), daemon=True).start()
+
+    def _load(self, factory):
+        try:
+            self.engine = factory()
+        except Exception as e:
+            self.error = e
+        self.load_s = time.perf_counter() - self._t0
+        self._done.set()
+        if self._on_ready is not None and self.error is None:
+            self._on_ready(self.engine)
+
+    @property
+    def ready(self):
+        return self._done.is_set() and self.error is None
+
+    @property
+    def loading(self):
+        return not self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Yükleme bitene kadar bekler; hata olduysa onu fırlatır."""
+        if not self._done.wait(timeout):
+            return None
+        if self.error is not None:
+            raise RuntimeError(f"Model yüklenemedi: {self.error}") from self.error
+        return self.engine
+
+    def __getattr__(self, name):
+        return getattr(self.wait(), name)
+
+
+def _auto_export(engine, model_path):
+    """"auto" export bulamadıysa best.onnx'i arka planda üretir."""
+    engine = getattr(engine, "engine", engine)  # CachedEngine ise içindeki
+    if getattr(engine, "backend", None) != "pt" or not Path(model_path).exists():
+        return
+
+    def run():
+        try:
+            from export_model import export_onnx
+            export_onnx(model_path)
+        except Exception as e:
+            print(f" ONNX export başarısız: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def load_engine(model_path=MODEL_PATH, conf=0.25, upscale=None, enhance=False,
+                profiler=None, server=SERVER, cache=None, lazy=False, mode=MODE,
+                **kwargs):
+    """server verilmişse RemoteEngine, yoksa yerel InferenceEngine döndürür.
+
+    mode="two_stage" ise bu engine el dedektörü olarak TwoStageEngine'e verilir.
+    cache (result_cache.HashCache) verilirse engine CachedEngine ile sarılır.
+    lazy=True ise hemen LazyEngine döner, model arka planda yüklenip ısınır.
+    """
+    if lazy:
+        on_ready = None
+        if AUTO_EXPORT and not server and kwargs.get("backend", BACKEND) == "auto":
+            on_ready = lambda eng: _auto_export(eng, model_path)
+        return LazyEngine(lambda: load_engine(
+            model_path, conf=conf, upscale=upscale, enhance=enhance,
+            profiler=profiler, server=server, cache=cache, mode=mode, **kwargs),
+            on_ready=on_ready)
+
+    if server:
+        from engine_client import RemoteEngine
+        engine = RemoteEngine(server, conf=conf, upscale=upscale,
+                              enhance=enhance, profiler=profiler)
+    else:
+        engine = InferenceEngine(model_path, conf=conf, upscale=upscale,
+                                 enhance=enhance, profiler=profiler, **kwargs)
+    if mode == "two_stage":
+        from crop_classifier import make_two_stage
+        engine = make_two_stage(engine, profiler=profiler)
+    elif mode != "detect":
+        raise ValueError(f"mode 'detect' ya da 'two_stage' olmalı: {mode}")
+    if cache is not None:
+        from result_cache import CachedEngine
+        engine = CachedEngine(engine, cache)
+    return engine
@@ -1,19 +1,42 @@
 import cv2
-from ultralytics import YOLO
 import time
-
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
-model = YOLO(MODEL_PATH)
+from camera_config import required_size
+from frame_pipeline import FramePipeline, RateController
+from inference import MODEL_PATH, draw_detection, load_engine
+from preprocess import MirrorDisplay, mirrored_box
+from hand_tracker import HandTracker
+from profiling import from_settings
+from result_cache import make_cache
+from word_decoder import load_decoder
 
 CONF_TH = 0.35
 ADD_COOLDOWN = 0.35
 
+# Tahmin hızı (görüntü yine kamera hızında akar)
+INFER_FPS = 10          # saniyede en fazla tahmin (None = sınırsız)
+CPU_BUDGET = 0.5        # zamanın en fazla bu oranı tahminde geçsin
+DIFF_TH = 2.0           # ROI bundan az değiştiyse son tahmini kullan
+
 # ROI ayarları (ekrandaki yeşil kutu)
 ROI_SIZE = 320
 ROI_MARGIN = 20
+TRACK_HAND = False      # ROI sabit kutu yerine eli izlesin
+SOURCE = 0              # kamera indeksi, video dosyası, resim klasörü veya rtsp:// adresi
+WORD_DECODE = True      # top-3'ten sözlükle kelime tahmini ([W] ile ekle)
+CAPTURE = "thread"      # "process": kamera ayrı process'te, kareler paylaşımlı bellekten
+
+# Sonuç cache'i: ROI'nin algısal hash'i yakınsa model tekrar çalışmaz
+CACHE_TOL = 4           # Hamming toleransı (256 bit üzerinden), None = kapalı
+CACHE_TTL_S = 1.0       # kayıt en fazla bu kadar saniye kullanılır
+
+# Profil: aşama süreleri (cap.read, preprocess, predict, draw, show) + FPS
+PROFILE = False
+PROFILE_LOG = None      # örn. "runs/profile_live_type.jsonl"
+PROFILE_PORT = None     # örn. 9108 -> http://127.0.0.1:9108/metrics
 
-text = ""
-last_add_time = 0
+# main() içinde kurulur: CAPTURE="process" "spawn" ile çalışırken kamera
+# process'i bu dosyayı tekrar import eder, model orada yüklenmesin
+prof = engine = tracker = None
 
 
 def get_roi_box(w, h):
@@ -25,95 +48,177 @@ def get_roi_box(w, h):
     return x1, y1, x2, y2
 
 
-def topk_from_result(r, k=3):
-    if r.boxes is None or len(r.boxes) == 0:
-        return []
-
-    confs = r.boxes.conf.cpu().numpy()
-    clss = r.boxes.cls.cpu().numpy().astype(int)
-
-    idxs = confs.argsort()[::-1][:k]
-    out = []
-    for i in idxs:
-        out.append((r.names[clss[i]], float(confs[i])))
-    return out
+def raw_roi_box(frame):
+    # Ekrandaki (aynalı) kutunun ham karedeki karşılığı
+    if tracker is not None and tracker.box is not None:
+        return tracker.box
+    h, w = frame.shape[:2]
+    return mirrored_box(get_roi_box(w, h), w)
 
 
-cap = cv2.VideoCapture(0)
+def raw_roi(frame):
+    # kopyasız görünüm
+    x1, y1, x2, y2 = raw_roi_box(frame)
+    return frame[y1:y2, x1:x2]
 
-print(
-    "Kısayollar: [F]=harf ekle | [Space]=boşluk | [Backspace]=sil | [C]=temizle | [Q]=çık")
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
+def infer_frame(frame):
+    """Tahmin thread'inde çalışır: ROI + tahmin + top-3 (+ ham ROI kutusu)."""
+    if tracker is not None:
+        top = []
 
-    # Ayna gibi göster (sağ/sol rahat olsun)
-    frame = cv2.flip(frame, 1)
+        def predict_top(roi):
+            top[:] = engine.predict(roi, conf=CONF_TH).topk(3)
+            return top[0] if top else None
 
-    h, w = frame.shape[:2]
-    x1, y1, x2, y2 = get_roi_box(w, h)
+        best, box = tracker.predict(frame, predict_top)
+        return best, [(d.label, d.conf) for d in top], box
 
-    # ROI kes (sadece elin olduğu alanı modele ver)
-    roi = frame[y1:y2, x1:x2].copy()
+    # ROI (sadece elin olduğu alanı modele ver); ayna sadece ekranda
+    box = raw_roi_box(frame)
+    roi = raw_roi(frame)
 
     # Tahmin
-    results = model.predict(roi, conf=CONF_TH, verbose=False)
-    r = results[0]
-
-    # ROI üzerinde çizimli görüntü
-    roi_annot = r.plot()
-
-    # ROI'yi ana frame'e geri yapıştır (kutunun içine çizimli görünür)
-    frame[y1:y2, x1:x2] = roi_annot
-
-    # Top-3 tahmin al
-    top3 = topk_from_result(r, k=3)
-
-    if len(top3) == 0:
-        main_pred = "-"
-        main_conf = 0.0
-        top_text = "Top3: -"
-    else:
-        main_pred, main_conf = top3[0]
-        top_text = "Top3: " + " | ".join([f"{a}:{b:.2f}" for a, b in top3])
-
-    # Yazılar
-    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-    cv2.putText(frame, f"Tahmin: {main_pred}  conf:{main_conf:.2f}", (15, 35),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-    cv2.putText(frame, top_text, (15, 70),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 255, 0), 2)
-    cv2.putText(frame, f"Yazi: {text}", (15, h-20),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-
-    cv2.imshow("ASL Live Type", frame)
-
-    key = cv2.waitKey(1) & 0xFF
-    now = time.time()
-
-    if key == ord('q'):
-        break
-
-    # F ile harf ekle
-    if key == ord('f'):
-        if now - last_add_time >= ADD_COOLDOWN:
-            if main_pred != "-" and main_conf >= 0.25:
-                text += main_pred
-                last_add_time = now
-
-    # boşluk
-    if key == 32:
-        text += " "
-
-    # backspace
-    if key == 8:
-        text = text[:-1]
-
-    # temizle
-    if key == ord('c'):
-        text = ""
-
-cap.release()
-cv2.destroyAllWindows()
+    pred = engine.predict(roi, conf=CONF_TH)
+
+    # Top-3 tahmin al (ilki çizilecek en iyi kutu)
+    top = pred.topk(3)
+    return (top[0] if top else None), [(d.label, d.conf) for d in top], box
+
+
+def main():
+    global prof, engine, tracker
+    prof = from_settings(PROFILE, PROFILE_LOG, PROFILE_PORT)
+    # model arka planda yüklenip ısınır; kamera bu arada açılır
+    engine = load_engine(MODEL_PATH, profiler=prof,
+                         cache=make_cache(CACHE_TOL, CACHE_TTL_S), lazy=True)
+    tracker = HandTracker() if TRACK_HAND else None
+
+    rate = RateController(target_fps=INFER_FPS, cpu_budget=CPU_BUDGET,
+                          diff_th=DIFF_TH, region_fn=raw_roi)
+    pipeline = FramePipeline(infer_frame, source=SOURCE, rate=rate,
+                             profiler=prof, capture=CAPTURE,
+                             min_size=required_size(ROI_SIZE, ROI_MARGIN)).start()
+    display = MirrorDisplay(mirror=True)
+    decoder = load_decoder() if WORD_DECODE else None
+
+    text = ""
+    last_add_time = 0
+
+    print(
+        "Kısayollar: [F]=harf ekle | [W]=kelime ekle | [Space]=boşluk | [Backspace]=sil | [C]=temizle | [Q]=çık")
+
+    best, top3, raw_box = None, [], None
+    last_result_seq = 0
+
+    while True:
+        item = pipeline.wait()
+        if item is None:
+            if not pipeline.running:
+                break
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
+
+        frame, result_seq, result = item
+
+        # Ayna gibi göster (sağ/sol rahat olsun)
+        frame = display(frame)
+        if engine.error is not None:
+            print(f"Model yüklenemedi: {engine.error}")
+            break
+
+        h, w = frame.shape[:2]
+
+        if result is not None:
+            best, top3, raw_box = result
+
+        # kelime çözücü her yeni tahminde bir adım ilerler (top-3'ün hepsiyle)
+        if decoder is not None and result_seq != last_result_seq:
+            last_result_seq = result_seq
+            decoder.step(top3)
+
+        # takipte kutu eli izler; el kayıpken sabit kutu gösterilir
+        if tracker is not None and raw_box is not None:
+            x1, y1, x2, y2 = mirrored_box(raw_box, w)
+        else:
+            x1, y1, x2, y2 = get_roi_box(w, h)
+
+        if len(top3) == 0:
+            main_pred = "-"
+            main_conf = 0.0
+            top_text = "Top3: -"
+        else:
+            main_pred, main_conf = top3[0]
+            top_text = "Top3: " + " | ".join([f"{a}:{b:.2f}" for a, b in top3])
+
+        with prof.stage("draw"):
+            # En iyi kutuyu ROI içine çiz
+            if best is not None:
+                draw_detection(frame, best.mirrored(x2 - x1), offset=(x1, y1))
+
+            # Yazılar
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(frame, f"Tahmin: {main_pred}  conf:{main_conf:.2f}", (15, 35),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+            cv2.putText(frame, top_text, (15, 70),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 255, 0), 2)
+            if engine.loading:
+                cv2.putText(frame, "Model yukleniyor...", (15, 135),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 200, 255), 2)
+            cv2.putText(frame, f"Yazi: {text}", (15, h-20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+            if decoder is not None:
+                sugg = " | ".join(decoder.suggestions(3))
+                cv2.putText(frame, f"Kelime: {decoder.best or '-'}  [{sugg}]", (15, h-55),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.65, (0, 255, 255), 2)
+            prof.draw_overlay(frame, origin=(15, 100))
+
+        with prof.stage("show"):
+            cv2.imshow("ASL Live Type", frame)
+        prof.frame()
+
+        key = cv2.waitKey(1) & 0xFF
+        now = time.time()
+
+        if key == ord('q'):
+            break
+
+        # F ile harf ekle
+        if key == ord('f'):
+            if now - last_add_time >= ADD_COOLDOWN:
+                if main_pred != "-" and main_conf >= 0.25:
+                    text += main_pred
+                    last_add_time = now
+
+        # W ile çözülen kelimeyi ekle
+        if key == ord('w') and decoder is not None:
+            word = decoder.end_word()
+            if word:
+                text += word + " "
+
+        # boşluk
+        if key == 32:
+            text += " "
+            if decoder is not None:
+                decoder.reset()
+
+        # backspace
+        if key == 8:
+            text = text[:-1]
+
+        # temizle
+        if key == ord('c'):
+            text = ""
+            if decoder is not None:
+                decoder.reset()
+
+    pipeline.stop()
+    if pipeline.worker.error is not None:
+        print(f"Tahmin durdu: {pipeline.worker.error}")
+    prof.close()
+    cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
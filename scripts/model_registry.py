@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import platform
+import time
+from pathlib import Path
+
+# train.py her eğitimden sonra buraya metrik + gecikme + dosya yolu yazar;
+# inference.MODEL_PATH buradan ölçüte göre seçilir.
+REGISTRY_PATH = "runs/registry.json"
+CRITERIA = ("accuracy", "speed", "balanced")
+
+SPEED_MAP_TOL = 0.02      # "speed": en iyi mAP'ten en fazla bu kadar düşük olanlar
+BALANCE_MS_WEIGHT = 0.001  # "balanced": 10 ms gecikme = 0.01 mAP50-95
+LATENCY_IMAGES = "dataset/valid/images"
+
+
+def load(path=REGISTRY_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("models", [])
+    except (OSError, ValueError):
+        return []
+
+
+def save(entries, path=REGISTRY_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"models": entries}, indent=2, ensure_ascii=False),
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def register(entry, path=REGISTRY_PATH):
+    """Kaydı ekler; aynı weights yolu varsa üzerine yazar."""
+    entries = [e for e in load(path) if e.get("weights") != entry["weights"]]
+    entries.append(entry)
+    save(entries, path)
+    return entry
+
+
+def _score(entry, criterion):
+    m = entry.get("map50_95") or 0.0
+    lat = entry.get("latency_ms") or float("inf")
+    if criterion == "accuracy":
+        return (m, -lat)
+    if criterion == "speed":
+        return (-lat, m)
+    return (m - BALANCE_MS_WEIGHT * lat, m)
+
+
+def best(criterion="accuracy", max_latency_ms=None, path=REGISTRY_PATH):
+    """Ölçüte göre en iyi kayıt (dosyası hâlâ duranlar arasından) ya da None.
+
+    accuracy: en yüksek mAP50-95
+    speed:    mAP'i en iyiye SPEED_MAP_TOL kadar yakın olanlardan en hızlısı
+    balanced: mAP50-95 - BALANCE_MS_WEIGHT * gecikme(ms)
+    max_latency_ms verilirse daha yavaş modeller elenir.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion {CRITERIA} içinden olmalı: {criterion}")
+    entries = [e for e in load(path) if Path(e.get("weights", "")).exists()]
+    if max_latency_ms is not None:
+        entries = [e for e in entries
+                   if (e.get("latency_ms") or float("inf")) <= max_latency_ms]
+    if not entries:
+        return None
+    if criterion == "speed":
+        top = max(e.get("map50_95") or 0.0 for e in entries)
+        entries = [e for e in entries
+                   if (e.get("map50_95") or 0.0) >= top - SPEED_MAP_TOL]
+    return max(entries, key=lambda e: _score(e, criterion))
+
+
+def best_model_path(criterion="accuracy", default=None, path=REGISTRY_PATH,
+                    **kwargs):
+    """best() kaydının weights yolu; kayıt yoksa default."""
+    entry = best(criterion, path=path, **kwargs)
+    return entry["weights"] if entry else default
+
+
+def measure_latency(weights, imgsz=None, images=LATENCY_IMAGES, n=50, warmup=3):
+    """Tek resim (batch=1) CPU gecikmesi: p50 / p95 ms."""
+    import cv2
+    import numpy as np
+    from inference import InferenceEngine
+
+    paths = sorted(p for p in Path(images).glob("*")
+                   if p.suffix.lower() in (".jpg", ".jpeg", ".png"))[:n]
+    frames = [img for img in (cv2.imread(str(p)) for p in paths) if img is not None]
+    if not frames:
+        return {}
+    engine = InferenceEngine(weights, imgsz=imgsz, warmup=False)
+    engine.warmup(warmup)
+    lat = []
+    for img in frames:
+        t0 = time.perf_counter()
+        engine.predict(img)
+        lat.append(time.perf_counter() - t0)
+    lat = np.asarray(lat) * 1000
+    return {"latency_ms": round(float(np.percentile(lat, 50)), 2),
+            "latency_p95_ms": round(float(np.percentile(lat, 95)), 2)}
+
+
+def evaluate(weights, data="dataset/data.yaml", imgsz=None, split="val",
+             latency_n=50):
+    """Doğrulama metrikleri (ultralytics val) + CPU gecikmesi -> kayıt."""
+    from ultralytics import YOLO
+
+    model = YOLO(weights)
+    imgsz = imgsz or model.overrides.get("imgsz") or 640
+    metrics = model.val(data=data, imgsz=imgsz, split=split, plots=False,
+                        verbose=False)
+    entry = {
+        "weights": str(weights),
+        "imgsz": imgsz,
+        "map50": round(float(metrics.box.map50), 4),
+        "map50_95": round(float(metrics.box.map), 4),
+        "precision": round(float(metrics.box.mp), 4),
+        "recall": round(float(metrics.box.mr), 4),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+    }
+    if latency_n:
+        entry.update(measure_latency(weights, imgsz, n=latency_n))
+    return entry
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Eğitilmiş modellerin kaydı (metrik, gecikme, dosya yolu).")
+    ap.add_argument("--registry", default=REGISTRY_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="kayıtları listele")
+
+    p = sub.add_parser("add", help="var olan bir modeli ölçüp kaydet")
+    p.add_argument("weights")
+    p.add_argument("--data", default="dataset/data.yaml")
+    p.add_argument("--imgsz", type=int, default=None)
+    p.add_argument("--name", default=None)
+
+    p = sub.add_parser("best", help="ölçüte göre en iyi modelin yolu")
+    p.add_argument("--by", choices=CRITERIA, default="accuracy")
+    p.add_argument("--max-latency-ms", type=float, default=None)
+    args = ap.parse_args()
+
+    if args.cmd == "list":
+        entries = load(args.registry)
+        print(f"{'ad':<28}{'imgsz':>6}{'mAP50':>8}{'mAP50-95':>10}{'p50 ms':>9}  weights")
+        for e in sorted(entries, key=lambda e: -(e.get("map50_95") or 0.0)):
+            lat = e.get("latency_ms")
+            print(f"{str(e.get('name', '-')):<28}{str(e.get('imgsz', '-')):>6}"
+                  f"{e.get('map50', 0):>8.3f}{e.get('map50_95', 0):>10.3f}"
+                  f"{(f'{lat:.1f}' if lat is not None else '-'):>9}  {e['weights']}")
+    elif args.cmd == "add":
+        entry = evaluate(args.weights, args.data, args.imgsz)
+        entry["name"] = args.name or Path(args.weights).parent.parent.name
+        register(entry, args.registry)
+        print(json.dumps(entry, indent=2, ensure_ascii=False))
+    else:
+        entry = best(args.by, args.max_latency_ms, args.registry)
+        print(entry["weights"] if entry else "kayıt yok")
+
+
+if __name__ == "__main__":
+    main()
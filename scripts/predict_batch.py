@@ -0,0 +1,190 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+from inference import BACKEND, InferenceEngine, MODEL_PATH
+from result_cache import CachedEngine, make_cache
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def collect_paths(inputs):
+    """Klasör, glob veya tek dosya listesinden sıralı resim yolları."""
+    paths = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(q for q in p.rglob("*") if q.suffix.lower() in IMAGE_EXTS)
+        elif p.is_file():
+            paths.append(p)
+        else:
+            paths.extend(Path(q) for q in glob.glob(item, recursive=True)
+                         if Path(q).suffix.lower() in IMAGE_EXTS)
+    return sorted(set(str(p) for p in paths))
+
+
+def chunks(seq, n):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def decode(path):
+    return path, cv2.imread(path)
+
+
+def predict_paths(engine, paths, batch=16, threads=4, k=1, conf=None):
+    """Resimleri thread'lerde çözer, modele batch halinde verir; satırları yield eder.
+
+    Bir sonraki batch'in çözümü, mevcut batch modeldeyken arka planda sürer.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        batches = list(chunks(paths, batch))
+        pending = [pool.submit(decode, p) for p in batches[0]] if batches else []
+
+        for bi in range(len(batches)):
+            decoded = [f.result() for f in pending]
+            if bi + 1 < len(batches):
+                pending = [pool.submit(decode, p) for p in batches[bi + 1]]
+
+            ok = [(p, img) for p, img in decoded if img is not None]
+            for p, img in decoded:
+                if img is None:
+                    yield {"path": p, "error": "okunamadı"}
+
+            preds = engine.predict_many([img for _, img in ok], conf=conf)
+            for (p, _), pred in zip(ok, preds):
+                top = pred.topk(k)
+                row = {"path": p, "label": None, "conf": None, "box": None}
+                if top:
+                    row.update(label=top[0].label, conf=round(top[0].conf, 4),
+                               box=list(top[0].box))
+                if k > 1:
+                    row["topk"] = [[d.label, round(d.conf, 4)] for d in top]
+                yield row
+
+
+_worker_engine = None
+
+
+def _init_worker(model_path, backend, conf, torch_threads, cache_tol=None):
+    global _worker_engine
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _worker_engine = InferenceEngine(model_path, conf=conf, backend=backend,
+                                     warmup=False)
+    cache = make_cache(cache_tol, max_size=4096)
+    if cache is not None:
+        _worker_engine = CachedEngine(_worker_engine, cache)
+
+
+def _run_chunk(args):
+    paths, batch, threads, k = args
+    return list(predict_paths(_worker_engine, paths, batch, threads, k))
+
+
+class RowWriter:
+    """Sonuçları geldikçe CSV / JSONL dosyasına (veya stdout'a) yazar."""
+
+    FIELDS = ["path", "label", "conf", "box", "topk", "error"]
+
+    def __init__(self, out_path, fmt=None):
+        self.f = sys.stdout if out_path in (None, "-") else open(
+            out_path, "w", newline="", encoding="utf-8")
+        if fmt is None:
+            fmt = "csv" if str(out_path).endswith(".csv") else "jsonl"
+        self.fmt = fmt
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.f, fieldnames=self.FIELDS,
+                                      extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv is not None:
+            row = dict(row)
+            for key in ("box", "topk"):
+                if row.get(key) is not None:
+                    row[key] = json.dumps(row[key])
+            self.csv.writerow(row)
+        else:
+            self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.f.flush()
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Klasör / glob içindeki resimleri ekransız toplu tahmin eder.")
+    ap.add_argument("inputs", nargs="+", help="klasör, glob ('frames/*.jpg') veya dosya")
+    ap.add_argument("-o", "--out", default="-", help="sonuç dosyası (.csv / .jsonl), '-' = stdout")
+    ap.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--conf", type=float, default=0.25)
+    ap.add_argument("--batch", type=int, default=16)
+    ap.add_argument("--threads", type=int, default=4, help="resim çözme thread sayısı")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="process sayısı (0 = tek process, -1 = tüm çekirdekler)")
+    ap.add_argument("--topk", type=int, default=1)
+    ap.add_argument("--cache-tol", type=int, default=None,
+                    help="tekrarlanan resimler için cache (0 = birebir aynı, içerik "
+                         "SHA-1'i; >0 = algısal hash'te Hamming toleransı)")
+    args = ap.parse_args()
+
+    paths = collect_paths(args.inputs)
+    if not paths:
+        print(" Resim bulunamadı.", file=sys.stderr)
+        return
+    print(f" {len(paths)} resim", file=sys.stderr)
+
+    writer = RowWriter(args.out, args.format)
+    engine = None
+    n = 0
+    try:
+        workers = os.cpu_count() if args.workers == -1 else args.workers
+        if workers and workers > 1:
+            # her process kendi modelini yükler; çekirdekler paylaştırılır
+            per_proc = max(1, (os.cpu_count() or 1) // workers)
+            jobs = [(c, args.batch, max(1, args.threads // workers), args.topk)
+                    for c in chunks(paths, args.batch * 4)]
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=(args.model, args.backend, args.conf, per_proc,
+                              args.cache_tol)) as pool:
+                futures = [pool.submit(_run_chunk, job) for job in jobs]
+                for fut in as_completed(futures):
+                    for row in fut.result():
+                        writer.write(row)
+                        n += 1
+        else:
+            engine = InferenceEngine(args.model, conf=args.conf,
+                                     backend=args.backend, warmup=False)
+            cache = make_cache(args.cache_tol, max_size=4096)
+            if cache is not None:
+                engine = CachedEngine(engine, cache)
+            for row in predict_paths(engine, paths, args.batch, args.threads,
+                                     args.topk):
+                writer.write(row)
+                n += 1
+    finally:
+        writer.close()
+
+    print(f" {n} sonuç yazıldı.", file=sys.stderr)
+    if isinstance(engine, CachedEngine):
+        print(f" cache: {engine.cache.stats()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
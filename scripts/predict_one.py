@@ -1,9 +1,6 @@
-from ultralytics import YOLO
 import cv2
 from pathlib import Path
-
-
-MODEL_PATH = "runs/asl_sign_model3/weights/best.pt"
+from inference import InferenceEngine, MODEL_PATH, draw_detection
 
 
 IMAGE_PATH = "dataset/test/images/A22_jpg.rf.f02ad8558ce1c88213b4f83c0bc66bc8.jpg"
@@ -18,27 +15,22 @@ def main():
         print(f" Resim yok: {IMAGE_PATH}")
         return
 
-    model = YOLO(MODEL_PATH)
+    engine = InferenceEngine(MODEL_PATH, conf=0.25, warmup=False)
 
-    results = model.predict(source=IMAGE_PATH, conf=0.25, save=True)
-
-    r = results[0]
+    img = cv2.imread(IMAGE_PATH)
+    best = engine.predict(img).best()
 
     # Hiç obje yoksa
-    if r.boxes is None or len(r.boxes) == 0:
+    if best is None:
         print(" Hiç harf tespit edemedim.")
     else:
-        # En yüksek confidence'ı seç
-        confs = r.boxes.conf.tolist()
-        best_i = confs.index(max(confs))
-
-        cls_id = int(r.boxes.cls[best_i].item())
-        label = r.names[cls_id]
-        confidence = float(r.boxes.conf[best_i].item())
+        print(f" Bu harf: {best.label}  (confidence: {best.conf:.2f})")
 
-        print(f" Bu harf: {label}  (confidence: {confidence:.2f})")
+    annotated = draw_detection(img, best)
 
-    annotated = r.plot()
+    out_dir = Path("runs/predict_one")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(out_dir / Path(IMAGE_PATH).name), annotated)
 
     cv2.imshow("ASL Prediction (press any key)", annotated)
     cv2.waitKey(0)
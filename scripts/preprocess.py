@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+
+
+def mirrored_box(box, width):
+    """Aynalanmış görüntüdeki kutunun ham (aynasız) karedeki karşılığı."""
+    x1, y1, x2, y2 = box
+    return width - x2, y1, width - x1, y2
+
+
+class Preprocessor:
+    """ROI büyütme + CLAHE; her adım önceden ayrılmış tampona (dst=) yazar.
+
+    Çıkış her çağrıda aynı tampondur: bir sonraki çağrıya kadar kullanılmalı
+    (model.predict bunu senkron yaptığı için sorun yok). reuse=False ile
+    yeni dizi döner (batch halinde birden fazla görüntü hazırlarken).
+    """
+
+    def __init__(self, size=None, enhance=False, clip_limit=2.0, tile=(8, 8)):
+        self.size = size
+        self.enhance = enhance
+        self._clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile) \
+            if enhance else None
+        self._bufs = {}
+
+    def _buf(self, name, shape):
+        buf = self._bufs.get(name)
+        if buf is None or buf.shape != shape:
+            buf = self._bufs[name] = np.empty(shape, dtype=np.uint8)
+        return buf
+
+    def __call__(self, roi, reuse=True):
+        """roi: kopyalanmamış görünüm (frame[y1:y2, x1:x2]) olabilir."""
+        if not self.size and not self.enhance:
+            return roi
+
+        buf = self._buf if reuse else (lambda _, shape: np.empty(shape, np.uint8))
+
+        out = roi
+        if self.size:
+            out = cv2.resize(roi, (self.size, self.size),
+                             dst=buf("resized", (self.size, self.size, 3)),
+                             interpolation=cv2.INTER_LINEAR)
+        if self.enhance:
+            h, w = out.shape[:2]
+            gray = cv2.cvtColor(out, cv2.COLOR_BGR2GRAY, dst=buf("gray", (h, w)))
+            eq = self._clahe.apply(gray, dst=buf("eq", (h, w)))
+            out = cv2.cvtColor(eq, cv2.COLOR_GRAY2BGR, dst=buf("out", (h, w, 3)))
+        return out
+
+
+class MirrorDisplay:
+    """Aynalama sadece ekranda: ham kare tek bir tampona çevrilerek yazılır."""
+
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+        self._buf = None
+
+    def __call__(self, frame):
+        if self._buf is None or self._buf.shape != frame.shape:
+            self._buf = np.empty_like(frame)
+        if self.mirror:
+            return cv2.flip(frame, 1, dst=self._buf)
+        np.copyto(self._buf, frame)
+        return self._buf
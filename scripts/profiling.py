@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+class StageStats:
+    """Bir aşamanın son N ölçümü (sabit boyutlu halka) + toplam sayaçlar."""
+
+    def __init__(self, window=300):
+        self._buf = np.zeros(window, dtype=np.float64)
+        self._n = 0
+        self.count = 0
+        self.total_s = 0.0
+
+    def add(self, seconds):
+        self._buf[self._n % len(self._buf)] = seconds
+        self._n += 1
+        self.count += 1
+        self.total_s += seconds
+
+    def values(self):
+        return self._buf[:min(self._n, len(self._buf))]
+
+    def last_ms(self):
+        if self._n == 0:
+            return 0.0
+        return self._buf[(self._n - 1) % len(self._buf)] * 1000
+
+    def summary(self):
+        v = self.values() * 1000
+        if len(v) == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(v, (50, 95, 99))
+        return {"count": self.count, "mean_ms": float(v.mean()),
+                "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+    def histogram(self, edges_ms):
+        """Kümülatif histogram (Prometheus 'le' kovaları gibi)."""
+        v = self.values() * 1000
+        return [int((v <= e).sum()) for e in edges_ms]
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class Profiler:
+    """Aşama zamanlayıcıları: cap.read, ön işleme, predict, çizim, gösterim...
+
+    with prof.stage("predict"):
+        ...
+
+    enabled=False iken stage() hiçbir şey ölçmeyen hazır bir nesne döndürür
+    (kapalıyken maliyeti bir if'ten ibaret).
+    """
+
+    def __init__(self, enabled=True, window=300, jsonl_path=None,
+                 log_every_s=5.0):
+        self.enabled = enabled
+        self.window = window
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._frames = StageStats(window)
+        self._last_frame_t = None
+
+        self.jsonl_path = jsonl_path
+        self.log_every_s = log_every_s
+        self._last_log = time.monotonic()
+        self._server = None
+
+    def _get(self, name):
+        st = self.stats.get(name)
+        if st is None:
+            with self._lock:
+                st = self.stats.setdefault(name, StageStats(self.window))
+        return st
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._get(name).add(time.perf_counter() - t0)
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self._get(name).add(seconds)
+
+    def frame(self):
+        """Her gösterilen karede bir kez çağrılır (FPS için)."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame_t is not None:
+            self._frames.add(now - self._last_frame_t)
+        self._last_frame_t = now
+
+        if self.jsonl_path and time.monotonic() - self._last_log >= self.log_every_s:
+            self.write_jsonl()
+
+    def fps(self):
+        v = self._frames.values()
+        return float(len(v) / v.sum()) if len(v) and v.sum() > 0 else 0.0
+
+    def snapshot(self):
+        return {
+            "time": time.time(),
+            "fps": self.fps(),
+            "stages": {k: st.summary() for k, st in list(self.stats.items())},
+        }
+
+    # ---------------- ÇIKTILAR ----------------
+    def draw_overlay(self, img, origin=(10, 60), color=(0, 255, 255)):
+        """FPS ve aşama sürelerini (ms) görüntünün üstüne yazar."""
+        if not self.enabled:
+            return img
+        x, y = origin
+        lines = [f"FPS {self.fps():5.1f}"]
+        for name, st in list(self.stats.items()):
+            v = st.values()
+            mean = v.mean() * 1000 if len(v) else 0.0
+            lines.append(f"{name:<10} {st.last_ms():6.1f} ms (ort {mean:5.1f})")
+        for i, line in enumerate(lines):
+            cv2.putText(img, line, (x, y + i * 18), cv2.FONT_HERSHEY_SIMPLEX,
+                        0.45, color, 1, cv2.LINE_AA)
+        return img
+
+    def write_jsonl(self, path=None):
+        path = path or self.jsonl_path
+        self._last_log = time.monotonic()
+        if not path:
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot()) + "\n")
+
+    def prometheus_text(self, edges_ms=(5, 10, 20, 50, 100, 200, 500, 1000)):
+        """Prometheus text formatında metrikler (pencere içindeki ölçümler)."""
+        out = ["# TYPE asl_fps gauge", f"asl_fps {self.fps():.3f}",
+               "# TYPE asl_stage_ms histogram"]
+        for name, st in list(self.stats.items()):
+            v = st.values() * 1000
+            for e, c in zip(edges_ms, st.histogram(edges_ms)):
+                out.append(f'asl_stage_ms_bucket{{stage="{name}",le="{e}"}} {c}')
+            out.append(f'asl_stage_ms_bucket{{stage="{name}",le="+Inf"}} {len(v)}')
+            out.append(f'asl_stage_ms_sum{{stage="{name}"}} {v.sum():.3f}')
+            out.append(f'asl_stage_ms_count{{stage="{name}"}} {len(v)}')
+        return "\n".join(out) + "\n"
+
+    def serve(self, port=9108, host="127.0.0.1"):
+        """/metrics adresinde Prometheus text endpoint'i (arka plan thread)."""
+        prof = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("/metrics", ""):
+                    self.send_error(404)
+                    return
+                body = prof.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def close(self):
+        if self.jsonl_path and self.enabled:
+            self.write_jsonl()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+# kapalı profiler: profiler verilmeyen yerlerde varsayılan
+NULL_PROFILER = Profiler(enabled=False)
+
+
+def from_settings(enabled, jsonl_path=None, port=None):
+    """Script ayarlarından profiler kurar (kapalıysa ölçüm yapmaz)."""
+    prof = Profiler(enabled=enabled, jsonl_path=jsonl_path)
+    if enabled and port:
+        prof.serve(port)
+    return prof
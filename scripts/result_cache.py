@@ -0,0 +1,185 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+HASH_KINDS = ("ahash", "dhash", "exact")
+
+
+def _popcount(x):
+    return x.bit_count() if hasattr(x, "bit_count") else bin(x).count("1")
+
+
+def content_digest(img):
+    """Piksellerin + boyutun SHA-1'i (int); sadece birebir aynı görüntü eşleşir."""
+    img = np.ascontiguousarray(img)
+    h = hashlib.sha1(repr((img.shape, img.dtype.str)).encode())
+    h.update(memoryview(img).cast("B"))
+    return int.from_bytes(h.digest(), "big")
+
+
+def perceptual_hash(img, kind="dhash", size=16):
+    """Küçük gri resimden algısal hash (size*size bitlik int).
+
+    ahash: her piksel ortalamadan parlak mı; dhash: her piksel sağındakinden
+    parlak mı. Işık/gürültüdeki küçük değişimler sadece birkaç biti değiştirir.
+    """
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    if kind == "dhash":
+        small = cv2.resize(gray, (size + 1, size), interpolation=cv2.INTER_AREA)
+        bits = small[:, 1:] > small[:, :-1]
+    elif kind == "ahash":
+        small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+        bits = small > small.mean()
+    else:
+        raise ValueError(f"kind {HASH_KINDS} içinden olmalı: {kind}")
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class HashCache:
+    """Algısal hash'e göre LRU sonuç cache'i.
+
+    tolerance: Hamming mesafesi bu kadar veya azsa aynı görüntü sayılır
+               (0 = sadece birebir aynı hash; farklı resimler de aynı
+               algısal hash'i verebilir, birebir için kind="exact").
+    kind:      "dhash" / "ahash" algısal, "exact" içerik SHA-1'i.
+    max_size:  en fazla kayıt (en eski kullanılan atılır).
+    ttl_s:     kayıt bu kadar saniyeden eskiyse kullanılmaz (None = süresiz).
+    meta:      hash'le birlikte birebir eşleşmesi gereken bilgi (boyut, conf).
+    """
+
+    def __init__(self, max_size=256, tolerance=6, ttl_s=2.0, kind="dhash",
+                 size=16):
+        self.max_size = max_size
+        self.tolerance = tolerance
+        self.ttl_s = ttl_s
+        self.kind = kind
+        self.size = size
+        self._items = OrderedDict()   # (meta, hash) -> (değer, zaman)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, img):
+        if self.kind == "exact":
+            return content_digest(img)
+        return perceptual_hash(img, self.kind, self.size)
+
+    def _expired(self, t, now):
+        return self.ttl_s is not None and now - t > self.ttl_s
+
+    def get(self, h, meta=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get((meta, h))
+            if item is not None and not self._expired(item[1], now):
+                self._items.move_to_end((meta, h))
+                self.hits += 1
+                return item[0]
+
+            if self.tolerance > 0:
+                # en yakın hash'i ara (yeniden eskiye)
+                best_key, best_d = None, self.tolerance + 1
+                for k in reversed(self._items):
+                    if k[0] != meta:
+                        continue
+                    d = _popcount(k[1] ^ h)
+                    if d < best_d:
+                        best_key, best_d = k, d
+                        if d == 0:
+                            break
+                if best_key is not None:
+                    value, t = self._items[best_key]
+                    if not self._expired(t, now):
+                        self._items.move_to_end(best_key)
+                        self.hits += 1
+                        return value
+
+            self.misses += 1
+            return None
+
+    def put(self, h, value, meta=None):
+        now = time.monotonic()
+        with self._lock:
+            self._items[(meta, h)] = (value, now)
+            self._items.move_to_end((meta, h))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            if self.ttl_s is not None:
+                # en eskiler baştadır; süresi dolanları at
+                while self._items:
+                    k, (_, t) = next(iter(self._items.items()))
+                    if not self._expired(t, now):
+                        break
+                    del self._items[k]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def hit_rate(self):
+        n = self.hits + self.misses
+        return self.hits / n if n else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4), "size": len(self._items)}
+
+
+class CachedEngine:
+    """Engine'in önüne konan cache: benzer görüntüde model çağrılmaz.
+
+    predict / predict_many aynı; diğer her şey asıl engine'e gider.
+    Kayıtlar görüntü boyutu ve conf ile ayrılır (kutular o boyuta göre).
+    """
+
+    def __init__(self, engine, cache=None):
+        self.engine = engine
+        self.cache = cache if cache is not None else HashCache()
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def predict(self, bgr, conf=None):
+        if isinstance(bgr, str):
+            bgr = cv2.imread(bgr)
+        if bgr is None:
+            return None
+        return self.predict_many([bgr], conf=conf)[0]
+
+    def predict_many(self, images, conf=None):
+        conf = self.engine.conf if conf is None else conf
+        out = [None] * len(images)
+        todo = []
+        for i, img in enumerate(images):
+            h = self.cache.key(img)
+            meta = (img.shape, conf)
+            pred = self.cache.get(h, meta)
+            if pred is None:
+                todo.append((i, h, meta))
+            else:
+                out[i] = pred
+
+        if todo:
+            preds = self.engine.predict_many([images[i] for i, _, _ in todo],
+                                             conf=conf)
+            for (i, h, meta), pred in zip(todo, preds):
+                self.cache.put(h, pred, meta)
+                out[i] = pred
+        return out
+
+
+def make_cache(tolerance, ttl_s=None, max_size=256):
+    """Script ayarlarından cache kurar; tolerance None ise cache yok.
+
+    tolerance 0: sadece birebir aynı görüntü (içerik SHA-1'i), >0: algısal
+    hash'te bu kadar bit farkına kadar benzer görüntüler.
+    """
+    if tolerance is None:
+        return None
+    kind = "exact" if tolerance == 0 else "dhash"
+    return HashCache(max_size=max_size, tolerance=tolerance, ttl_s=ttl_s, kind=kind)
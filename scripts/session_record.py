@@ -0,0 +1,440 @@
+import argparse
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from smoothing import LetterCommitter
+
+RECORD_DIR = "runs/sessions"
+CODECS = ("raw", "jpg", "png")
+CHUNK_FRAMES = 64       # bir chunk'ta en fazla bu kadar kare
+FLUSH_S = 1.0           # kare azsa da en geç bu kadar saniyede bir diske yaz
+QUEUE_SIZE = 256        # yazıcı geride kalırsa fazlası atılır (dropped)
+
+MAGIC = b"ASLREC1\n"
+_HEAD = struct.Struct("<II")   # JSON başlık uzunluğu, payload uzunluğu
+
+
+def default_path(app="session"):
+    return str(Path(RECORD_DIR) / time.strftime(f"{app}_%Y%m%d-%H%M%S.aslrec"))
+
+
+def _encode(img, codec, quality):
+    if codec == "raw":
+        return np.ascontiguousarray(img).tobytes()
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if codec == "jpg" else []
+    ok, buf = cv2.imencode("." + codec, img, params)
+    if not ok:
+        raise ValueError(f"{codec} kodlanamadı")
+    return buf.tobytes()
+
+
+def _decode(data, codec, shape):
+    if codec == "raw":
+        return np.frombuffer(data, dtype=np.uint8).reshape(shape)
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class SessionRecorder:
+    """Canlı döngünün modele verdiği ROI'leri, zamanları ve sonuçları kaydeder.
+
+    Dosya: MAGIC, sonra (uzunluklar, JSON başlık, payload) kayıtları.
+    İlk kayıt meta (uygulama ayarları), sonra chunk'lar (en fazla
+    CHUNK_FRAMES kare + aradaki tuş / harf olayları, sırası korunur),
+    en sonda özet. Kodlama ve yazma arka plandaki thread'de; frame()
+    sadece ROI'yi kopyalayıp kuyruğa atar, kuyruk doluysa kareyi atar.
+    Yarıda kesilen dosyanın son eksik chunk'ı okunurken yok sayılır.
+    """
+
+    def __init__(self, path=None, meta=None, codec="jpg", quality=90,
+                 chunk_frames=CHUNK_FRAMES, flush_s=FLUSH_S, queue_size=QUEUE_SIZE):
+        if codec not in CODECS:
+            raise ValueError(f"codec {CODECS} içinden olmalı: {codec}")
+        self.path = path or default_path((meta or {}).get("app", "session"))
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.quality = quality
+        self.chunk_frames = chunk_frames
+        self.flush_s = flush_s
+        self.frames = 0
+        self.dropped = 0
+        self.dropped_events = 0
+        self.bytes = 0
+        self.error = None
+        self._t0 = time.perf_counter()
+        self._q = queue.Queue(maxsize=queue_size)
+        self._f = open(self.path, "wb")
+        self._f.write(MAGIC)
+        self._write({"type": "meta", "codec": codec, "quality": quality,
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S"), **(meta or {})})
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def now(self):
+        return time.perf_counter() - self._t0
+
+    def frame(self, roi, label=None, conf=None, top=(), box=None, t=None):
+        """Modelin gördüğü ROI + sonucu; bloklamaz (kuyruk doluysa atar).
+
+        roi None olabilir (el kayıp): sonuç yine kaydedilir, resimsiz.
+        """
+        item = {"type": "frame", "t": round(self.now() if t is None else t, 4),
+                "label": label, "conf": None if conf is None else round(float(conf), 4),
+                "top": [[a, round(float(b), 4)] for a, b in top],
+                "box": None if box is None else [int(v) for v in box]}
+        try:
+            self._q.put_nowait((item, None if roi is None else np.array(roi, copy=True)))
+        except queue.Full:
+            self.dropped += 1
+
+    def event(self, kind, t=None, **data):
+        """Tuş / harf / kelime olayı (kareler arasındaki sırasıyla).
+
+        UI thread'inden çağrılır, bloklamaz: kuyruk doluysa olay atılır ve
+        dropped_events sayılır (end kaydında yazar, tekrar oynatma farkı
+        bundan olabilir).
+        """
+        item = {"type": kind, "t": round(self.now() if t is None else t, 4), **data}
+        try:
+            self._q.put_nowait((item, None))
+        except queue.Full:
+            self.dropped_events += 1
+
+    def _write(self, header, payload=b""):
+        head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        self._f.write(_HEAD.pack(len(head), len(payload)))
+        self._f.write(head)
+        self._f.write(payload)
+        self.bytes += _HEAD.size + len(head) + len(payload)
+
+    def _flush(self, items, parts):
+        if not items:
+            return
+        self._write({"type": "chunk", "items": items}, b"".join(parts))
+        self._f.flush()
+        items.clear()
+        parts.clear()
+
+    def _run(self):
+        items, parts, off, n = [], [], 0, 0
+        last = time.perf_counter()
+        while True:
+            try:
+                item, img = self._q.get(timeout=0.1)
+            except queue.Empty:
+                item = img = None
+            if item is not None and item["type"] == "_close":
+                break
+            if item is not None:
+                if img is not None:
+                    try:
+                        data = _encode(img, self.codec, self.quality)
+                    except Exception as e:
+                        self.error = e
+                        self.dropped += 1
+                        continue
+                    item.update(codec=self.codec, shape=list(img.shape),
+                                off=off, n=len(data))
+                    parts.append(data)
+                    off += len(data)
+                    n += 1
+                    self.frames += 1
+                items.append(item)
+            if n >= self.chunk_frames or (items and time.perf_counter() - last >= self.flush_s):
+                self._flush(items, parts)
+                off = n = 0
+                last = time.perf_counter()
+        self._flush(items, parts)
+
+    def close(self, **summary):
+        """Kuyruğu boşaltır, özeti yazar ve dosyayı kapatır."""
+        if self._f.closed:
+            return self.path
+        self._q.put(({"type": "_close"}, None))
+        self._thread.join()
+        self._write({"type": "end", "t": round(self.now(), 4), "frames": self.frames,
+                     "dropped": self.dropped, "dropped_events": self.dropped_events,
+                     **summary})
+        self._f.close()
+        return self.path
+
+
+class SessionReader:
+    """Kayıt dosyasını okur: meta, end ve sıralı kayıtlar.
+
+    for item in reader: ... -> {"type": "frame", "t", "label", "conf",
+    "top", "box", "image"} ya da olay sözlükleri. Chunk'lar arka plan
+    thread'inde okunup çözülür (read_ahead chunk kadar önde).
+    """
+
+    def __init__(self, path, decode=True, read_ahead=2):
+        self.path = str(path)
+        self.decode = decode
+        self.read_ahead = read_ahead
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"kayıt dosyası değil: {self.path}")
+            self.meta, _ = self._read(f)
+        self.end = None
+
+    @staticmethod
+    def _read(f):
+        raw = f.read(_HEAD.size)
+        if len(raw) < _HEAD.size:
+            return None, None
+        hlen, plen = _HEAD.unpack(raw)
+        head = f.read(hlen)
+        payload = f.read(plen)
+        if len(head) < hlen or len(payload) < plen:
+            return None, None  # yarıda kesilmiş kayıt
+        return json.loads(head), payload
+
+    def _chunks(self):
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC))
+            self._read(f)  # meta
+            while True:
+                header, payload = self._read(f)
+                if header is None:
+                    return
+                if header["type"] == "end":
+                    self.end = header
+                    return
+                items = header["items"]
+                for it in items:
+                    if it["type"] == "frame" and self.decode and "off" in it:
+                        data = payload[it["off"]:it["off"] + it["n"]]
+                        it["image"] = _decode(data, it["codec"], it["shape"])
+                yield items
+
+    def __iter__(self):
+        if not self.read_ahead:
+            for items in self._chunks():
+                yield from items
+            return
+
+        q = queue.Queue(maxsize=self.read_ahead)
+        done = object()
+        stop = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                for items in self._chunks():
+                    while not stop.is_set():
+                        try:
+                            q.put(items, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+            except Exception as e:
+                errors.append(e)
+            finally:
+                q.put(done)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                items = q.get()
+                if items is done:
+                    break
+                yield from items
+        finally:
+            stop.set()
+            thread.join(timeout=1.0)
+        if errors:
+            raise errors[0]
+
+
+def replay(path, engine=None, committer=None, decoder=None, speed=0.0):
+    """Kaydı uygulamanın harf/kelime mantığından tekrar geçirir (kamerasız).
+
+    engine verilirse kayıtlı ROI'ler modele yeniden verilir (gecikme ve
+    sonuç farkı ölçülür), yoksa kayıtlı sonuçlar kullanılır. Zaman her
+    zaman kaydın zamanıdır, sonuç çalıştırmadan çalıştırmaya aynıdır.
+    speed: 0 = olabildiğince hızlı, 1 = kaydın hızında, 2 = iki kat hızlı...
+
+    stream_recognizer.recognize gibi olay üretir: "frame" (+ "model_ms",
+    "recorded_label"), "letter", "word", "key".
+    """
+    reader = SessionReader(path, decode=engine is not None)
+    meta = reader.meta
+    if committer is None and decoder is None:
+        committer = LetterCommitter(meta.get("names") or [], conf_th=meta.get("conf_th", 0.75),
+                                    req_consec=meta.get("req_consec", 8),
+                                    window=meta.get("window", 10),
+                                    mode=meta.get("vote", "count"))
+    # kayıt başladığında kutuda yazı olabilir (uygulama meta'ya yazar)
+    text = meta.get("text") or ""
+    start = first = None
+    for it in reader:
+        t = it["t"]
+        if speed:
+            if start is None:
+                start, first = time.perf_counter(), t
+            time.sleep(max(0.0, start + (t - first) / speed - time.perf_counter()))
+
+        kind = it["type"]
+        if kind == "frame":
+            label, conf, top = it["label"], it["conf"], [tuple(x) for x in it["top"]]
+            ev = {"event": "frame", "t": t, "label": label, "conf": conf,
+                  "top": top, "box": it["box"]}
+            if engine is not None and it.get("image") is not None:
+                t0 = time.perf_counter()
+                dets = engine.predict(it["image"]).topk(3)
+                ev["model_ms"] = (time.perf_counter() - t0) * 1000
+                top = [(d.label, d.conf) for d in dets]
+                label, conf = (top[0] if top else (None, None))
+                ev.update(label=label, conf=conf, top=top, recorded_label=it["label"])
+            yield ev
+
+            if decoder is not None:
+                word = decoder.step(top)
+                if word:
+                    text += word + " "
+                    yield {"event": "word", "t": t, "word": word, "text": text}
+            else:
+                letter = committer.update(label, conf, t=t)
+                if letter is not None:
+                    text += letter
+                    yield {"event": "letter", "t": t, "letter": letter, "text": text}
+
+        elif kind in ("space", "backspace", "clear"):
+            # gui_auto_word'deki tuşların aynısı
+            if kind == "space":
+                if decoder is not None:
+                    text += decoder.end_word() or ""
+                text += " "
+            elif kind == "backspace":
+                text = text[:-1]
+            else:
+                if decoder is not None:
+                    decoder.reset()
+                text = ""
+            if committer is not None:
+                committer.reset_last()
+            yield {"event": "key", "t": t, "key": kind, "text": text}
+
+
+def _pct(values):
+    if not values:
+        return None
+    a = np.asarray(values)
+    return {"p50_ms": round(float(np.percentile(a, 50)), 2),
+            "p95_ms": round(float(np.percentile(a, 95)), 2)}
+
+
+def recorded_commits(path):
+    """Canlı uygulamanın yazdığı harf / kelimeler ve son yazı."""
+    reader = SessionReader(path, decode=False, read_ahead=0)
+    commits = [it.get("letter") or it.get("word") for it in reader
+               if it["type"] in ("letter", "word")]
+    return commits, (reader.end or {}).get("text")
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Canlı oturum kaydı (.aslrec): bilgi ve kamerasız tekrar oynatma.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("info", help="meta ve özet")
+    p.add_argument("session")
+
+    p = sub.add_parser("replay", help="kaydı harf/kelime mantığından tekrar geçir")
+    p.add_argument("session")
+    p.add_argument("--rerun", action="store_true",
+                   help="kayıtlı sonuçlar yerine ROI'leri modele yeniden ver")
+    p.add_argument("--model", default=None, help="--rerun için model (varsayılan MODEL_PATH)")
+    p.add_argument("--backend", default=None)
+    p.add_argument("--speed", type=float, default=0.0,
+                   help="0 = olabildiğince hızlı, 1 = kaydın hızında")
+    p.add_argument("--conf", type=float, default=None)
+    p.add_argument("--consec", type=int, default=None)
+    p.add_argument("--jsonl", default=None, help="olayları yaz ('-' = stdout)")
+    p.add_argument("--check", action="store_true",
+                   help="yazılanlar kayıttakinden farklıysa çıkış kodu 1 (CI için)")
+    args = ap.parse_args()
+
+    if args.cmd == "info":
+        reader = SessionReader(args.session, decode=False, read_ahead=0)
+        counts = {}
+        for it in reader:
+            counts[it["type"]] = counts.get(it["type"], 0) + 1
+        print(json.dumps({"meta": reader.meta, "records": counts, "end": reader.end},
+                         indent=2, ensure_ascii=False))
+        return
+
+    meta = SessionReader(args.session, decode=False).meta
+    engine = None
+    if args.rerun:
+        from inference import BACKEND, MODEL_PATH, load_engine
+        engine = load_engine(args.model or MODEL_PATH, conf=meta.get("conf", 0.25),
+                             upscale=meta.get("upscale"), enhance=meta.get("enhance", False),
+                             backend=args.backend or BACKEND)
+    names = meta.get("names") or (engine.names if engine is not None else [])
+    committer = decoder = None
+    if meta.get("word_mode"):
+        from word_decoder import load_decoder
+        decoder = load_decoder(end_after_blank=meta.get("word_end_blank", 12))
+    else:
+        committer = LetterCommitter(
+            names, conf_th=args.conf if args.conf is not None else meta.get("conf_th", 0.75),
+            req_consec=args.consec or meta.get("req_consec", 8),
+            window=meta.get("window", 10), mode=meta.get("vote", "count"))
+
+    out = None
+    if args.jsonl:
+        out = sys.stdout if args.jsonl == "-" else open(args.jsonl, "w", encoding="utf-8")
+    frames = agree = 0
+    model_ms, commits, text = [], [], meta.get("text") or ""
+    t0 = time.perf_counter()
+    try:
+        for ev in replay(args.session, engine, committer, decoder, args.speed):
+            if out is not None:
+                out.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            kind = ev["event"]
+            if kind == "frame":
+                frames += 1
+                if "model_ms" in ev:
+                    model_ms.append(ev["model_ms"])
+                    agree += ev["label"] == ev["recorded_label"]
+                last_t = ev["t"]
+            elif kind in ("letter", "word"):
+                commits.append(ev.get("letter") or ev.get("word"))
+            if "text" in ev:
+                text = ev["text"]
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    wall = time.perf_counter() - t0
+
+    rec_commits, rec_text = recorded_commits(args.session)
+    same = commits == rec_commits and (rec_text is None or text == rec_text)
+    summary = {
+        "frames": frames,
+        "recorded_s": round(last_t, 2) if frames else 0.0,
+        "replay_s": round(wall, 3),
+        "speedup": round(last_t / wall, 1) if frames and wall > 0 else None,
+        "model": _pct(model_ms),
+        "label_agreement": round(agree / len(model_ms), 4) if model_ms else None,
+        "text": text,
+        "recorded_text": rec_text,
+        "same_commits": same,
+    }
+    print(json.dumps(summary, indent=2, ensure_ascii=False),
+          file=sys.stderr if out is sys.stdout else sys.stdout)
+    if args.check and not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
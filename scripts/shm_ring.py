@@ -0,0 +1,279 @@
+import multiprocessing as mp
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+from sources import capture_fps, is_live, open_capture
+
+# başlık: [son seq, son slot, kapandı] + slot seq'leri + slot pin sayıları
+_LATEST_SEQ, _LATEST_SLOT, _CLOSED = 0, 1, 2
+_FIXED = 3
+
+
+def _attach(name):
+    """Var olan bloğa bağlan; silme işi oluşturan process'te kalsın."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        # kayıt hiç yapılmasın: spawn'da resource tracker ana process'le
+        # ortak, sonradan unregister etmek onun kaydını da siler
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class FrameRing:
+    """multiprocessing.shared_memory üzerinde sabit boyutlu kare halkası.
+
+    Tek yazar (yakalama process'i) boş bir slota doğrudan cap.read() ile
+    yazar; okuyucular en son kareyi kopyasız NumPy görünümü olarak alır.
+    Okunmakta olan (pin'li) slota ve en son kareye yazılmaz; yazar
+    yetişemezse kare atılır, okuyucu hiçbir zaman eski kare kuyruğu görmez.
+
+    Slot sahipliği (yazarın slotu alması, commit, okuyucunun pin'i) iki
+    tarafın paylaştığı lock ile yapılır: düz NumPy yazmaları process'ler
+    arasında sıralı görünmez (x86'da bile yazma sonraki okumanın önüne
+    geçebilir), kilit gerçek bellek bariyeridir. Piksellerin kendisi kilit
+    dışında, sahibi olunan slotta kopyasız yazılır / okunur. Process'ler
+    arası kullanımda iki taraf aynı lock'u almalı.
+    """
+
+    def __init__(self, shape, slots=4, name=None, create=True, lock=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        hdr_bytes = 8 * (_FIXED + 2 * slots)
+        frame_bytes = int(np.prod(self.shape))
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=hdr_bytes + slots * frame_bytes)
+        else:
+            self.shm = _attach(name)
+        self.owner = create
+        self.lock = mp.Lock() if lock is None else lock
+
+        self._hdr = np.ndarray((_FIXED + 2 * slots,), np.int64, self.shm.buf)
+        self.slot_seq = self._hdr[_FIXED:_FIXED + slots]
+        self.pins = self._hdr[_FIXED + slots:]
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, self.shm.buf,
+                                 offset=hdr_bytes)
+        if create:
+            self._hdr[:] = 0
+            self._hdr[_LATEST_SLOT] = -1
+        self._next = 0
+        self._seq = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def closed(self):
+        return bool(self._hdr[_CLOSED])
+
+    def mark_closed(self):
+        self._hdr[_CLOSED] = 1
+
+    # ---------------- YAZAR ----------------
+    def begin_write(self):
+        """Yazılabilecek slot (no, görünüm) ya da hepsi meşgulse (None, None)."""
+        latest = self._hdr[_LATEST_SLOT]  # sadece yazar değiştirir
+        for i in range(self.slots):
+            s = (self._next + i) % self.slots
+            if s == latest:
+                continue
+            with self.lock:
+                if self.pins[s] > 0:
+                    continue
+                self.slot_seq[s] = -1      # yazılıyor: artık pin'lenemez
+            self._next = s + 1
+            return s, self.frames[s]
+        return None, None
+
+    def commit(self, slot):
+        self._seq += 1
+        with self.lock:
+            self.slot_seq[slot] = self._seq
+            self._hdr[_LATEST_SLOT] = slot
+            self._hdr[_LATEST_SEQ] = self._seq
+
+    # ---------------- OKUYUCU ----------------
+    def latest_seq(self):
+        """Yeni kare var mı diye yoklamak için (kilitsiz, sadece ipucu)."""
+        return int(self._hdr[_LATEST_SEQ])
+
+    def acquire_latest(self):
+        """En son kareyi pin'ler: (seq, slot) ya da kare yoksa (0, -1).
+
+        Kare release(slot) çağrılana kadar yazar tarafından ezilmez.
+        """
+        with self.lock:
+            seq = int(self._hdr[_LATEST_SEQ])
+            if seq == 0:
+                return 0, -1
+            slot = int(self._hdr[_LATEST_SLOT])
+            self.pins[slot] += 1
+            return seq, slot
+
+    def release(self, slot):
+        if slot < 0:
+            return
+        with self.lock:
+            if self.pins[slot] > 0:
+                self.pins[slot] -= 1
+
+    def close(self):
+        self._hdr = self.slot_seq = self.pins = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # dışarıda hâlâ bir kare görünümü var; bellek process bitince bırakılır
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _capture_main(source, conn, slots, stop, lock, min_size=None):
+    """Yakalama process'i: kareleri doğrudan halkadaki boş slota okur."""
+    cap = open_capture(source, min_size=min_size)
+    ok, first = cap.read() if cap.isOpened() else (False, None)
+    if not ok:
+        conn.send(None)
+        return
+    conn.send(first.shape)
+    name = conn.recv()
+    if name is None:
+        return
+
+    ring = FrameRing(first.shape, slots, name=name, create=False, lock=lock)
+    slot, buf = ring.begin_write()
+    buf[...] = first
+    ring.commit(slot)
+
+    scratch = np.empty_like(first)  # bütün slotlar meşgulse kare buraya okunup atılır
+    frame_dt = 0.0 if is_live(source) else 1.0 / capture_fps(cap)
+    next_t = time.perf_counter()
+    try:
+        while not stop.is_set():
+            slot, buf = ring.begin_write()
+            target = scratch if buf is None else buf
+            ok, img = cap.read(target)
+            if not ok:
+                break
+            if img is not target:
+                if img.shape != target.shape:
+                    break  # çözünürlük değişti, halka yeniden kurulmalı
+                target[...] = img
+            if slot is not None:
+                ring.commit(slot)
+            if frame_dt:
+                next_t += frame_dt
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+    finally:
+        ring.mark_closed()
+        cap.release()
+        ring.close()
+
+
+class ShmFrameGrabber:
+    """LatestFrameGrabber'ın ayrı process'te çalışan karşılığı.
+
+    Kamera ayrı bir process'te okunur (GIL'den bağımsız), kareler paylaşımlı
+    bellekteki halkaya yazılır. latest() / wait_newer() kopya yapmaz: dönen
+    kare, aynı thread bir sonraki kareyi alana kadar geçerlidir.
+
+    Linux'ta "fork" kullanılır (hızlı açılış). Diğer sistemlerde "spawn":
+    macOS'ta thread'li (kamera, torch, Tk) bir process'i fork'lamak güvenli
+    değil. spawn'da çağıran script tekrar import edilir; model yükleme ve
+    ana döngü __main__ korumalı olmalı (live_type.main gibi).
+    """
+
+    def __init__(self, source=0, slots=4, open_timeout=10.0, min_size=None):
+        self.source = source
+        self.slots = slots
+        self.running = False
+        self.failed = False
+        self.ring = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._held = []
+
+        ctx = mp.get_context("fork" if sys.platform.startswith("linux") else "spawn")
+        self._stop = ctx.Event()
+        self._ring_lock = ctx.Lock()
+        conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_capture_main,
+                                 args=(source, child, slots, self._stop,
+                                       self._ring_lock, min_size),
+                                 daemon=True)
+        self._proc.start()
+        shape = conn.recv() if conn.poll(open_timeout) else None
+        if shape is None:
+            self._stop.set()
+            if self._proc.is_alive():
+                conn.send(None)
+            return
+        self.ring = FrameRing(shape, slots, create=True, lock=self._ring_lock)
+        conn.send(self.ring.name)
+
+    def isOpened(self):
+        return self.ring is not None
+
+    def start(self):
+        if self.ring is not None:
+            self.running = True
+        return self
+
+    def _check_alive(self):
+        if self.running and (self.ring.closed or not self._proc.is_alive()):
+            self.running = False
+            self.failed = not self._stop.is_set()
+
+    def latest(self):
+        """(sıra no, kare) döndürür; henüz kare yoksa (0, None)."""
+        if self.ring is None:
+            return 0, None
+        self._check_alive()
+        with self._lock:
+            prev = getattr(self._local, "slot", -1)
+            seq, slot = self.ring.acquire_latest()
+            self.ring.release(prev)
+            self._local.slot = slot
+            if prev in self._held:
+                self._held.remove(prev)
+            if slot >= 0:
+                self._held.append(slot)
+        if slot < 0:
+            return 0, None
+        return seq, self.ring.frames[slot]
+
+    def wait_newer(self, seq, timeout=0.5):
+        """seq'ten yeni bir kare gelene kadar bekle (1 ms aralıkla yoklar)."""
+        deadline = time.perf_counter() + timeout
+        while self.running and self.ring.latest_seq() == seq \
+                and time.perf_counter() < deadline:
+            time.sleep(0.001)
+            self._check_alive()
+        return self.latest()
+
+    def stop(self):
+        self.running = False
+        self._stop.set()
+        self._proc.join(timeout=2.0)
+        if self._proc.is_alive():
+            self._proc.terminate()
+        if self.ring is not None:
+            # yazar bitti: pin bırakmaya gerek yok (terminate edilen process
+            # ring kilidini tutuyor olabilir, beklemeyelim)
+            with self._lock:
+                self._held.clear()
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,222 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+VOTE_MODES = ("count", "conf", "decay")
+
+
+class TemporalSmoother:
+    """Son tahminlerden kararlı harfi seçer; kare başına sabit maliyet.
+
+    Sınıf başına oy toplamları tutulur, her yeni tahminde sadece giren ve
+    halkadan çıkan oy güncellenir (her karede Counter kurulmaz).
+
+    mode: "count" -> son window tespitte çoğunluk (eski Counter davranışı)
+          "conf"  -> oylar confidence ile ağırlıklı
+          "decay" -> üstel azalan oylar (her güncellemede toplamlar * decay)
+    conf_th altındaki (veya boş) tahminler oy vermez.
+    Eşitlikte Counter.most_common gibi pencerede ilk görülen kazanır
+    ("decay"de mevcut lider korunur, yoksa ilk oy alan).
+    """
+
+    def __init__(self, names, window=10, mode="count", decay=0.8, conf_th=0.0):
+        if mode not in VOTE_MODES:
+            raise ValueError(f"mode {VOTE_MODES} içinden olmalı: {mode}")
+        if isinstance(names, dict):
+            labels = [names[i] for i in sorted(names)]
+        else:
+            labels = list(names)
+        self.labels = labels
+        self._index = {name: i for i, name in enumerate(labels)}
+        self.window = window
+        self.mode = mode
+        self.decay = decay
+        self.conf_th = conf_th
+
+        self.totals = np.zeros(len(labels), dtype=np.float64)
+        self._cls = np.full(window, -1, dtype=np.int32)
+        self._w = np.zeros(window, dtype=np.float64)
+        self._pos = 0
+        self._seen = np.full(len(labels), np.iinfo(np.int64).max, dtype=np.int64)
+        self._step = 0
+        self.stable = None
+        self.share = 0.0
+
+    def reset(self):
+        self.totals[:] = 0
+        self._cls[:] = -1
+        self._w[:] = 0
+        self._pos = 0
+        self._seen[:] = np.iinfo(np.int64).max
+        self._step = 0
+        self.stable = None
+        self.share = 0.0
+
+    def _leader(self):
+        """En yüksek toplamlı sınıf; eşitlikte ilk görülen."""
+        best = int(self.totals.argmax())
+        top = self.totals[best]
+        ties = np.flatnonzero(self.totals >= top - 1e-9 * max(1.0, top))
+        if len(ties) == 1:
+            return best
+        if self.mode == "decay":
+            cur = self._index.get(self.stable, -1)
+            if cur in ties:
+                return cur
+            return int(ties[self._seen[ties].argmin()])
+        # halka en eskiden yeniye: pencerede ilk geçen eşit sınıf
+        order = np.roll(self._cls, -self._pos)
+        return int(order[np.isin(order, ties).argmax()])
+
+    def _push(self, c, w):
+        i = self._pos
+        old = self._cls[i]
+        if old >= 0:
+            self.totals[old] -= self._w[i]
+        self._cls[i] = c
+        self._w[i] = w
+        self.totals[c] += w
+        self._pos = (i + 1) % self.window
+        if self._pos == 0:
+            # halka her döndüğünde toplamları baştan kur (float birikimi olmasın)
+            valid = self._cls >= 0
+            self.totals = np.bincount(self._cls[valid], weights=self._w[valid],
+                                      minlength=len(self.labels)).astype(np.float64)
+
+    def update(self, label, conf=None):
+        """Yeni tahmini ekler; (kararlı etiket ya da None, oy payı) döndürür."""
+        c = self._index.get(label, -1) if label is not None else -1
+        vote = c >= 0 and (conf is None or conf >= self.conf_th)
+        w = (conf if conf is not None else 1.0) if self.mode != "count" else 1.0
+
+        if self.mode == "decay":
+            self.totals *= self.decay
+            if vote:
+                self.totals[c] += w
+                if self._seen[c] == np.iinfo(np.int64).max:
+                    self._seen[c] = self._step
+                self._step += 1
+        elif vote:
+            self._push(c, w)
+
+        best = self._leader()
+        total = self.totals.sum()
+        if self.totals[best] <= 1e-9:
+            self.stable, self.share = None, 0.0
+        else:
+            self.stable = self.labels[best]
+            self.share = float(self.totals[best] / total)
+        return self.stable, self.share
+
+
+class LetterCommitter:
+    """Harf teyidi durum makinesi (gui_auto_word'deki kural).
+
+    Kararlı harf req_consec kez üst üste (conf >= conf_th) teyit edilirse
+    yazılır; aynı harf, araya boşluk/silme (reset_last) girmeden tekrar
+    yazılmaz. cooldown_s: iki yazma arasında en az bu kadar saniye.
+    """
+
+    def __init__(self, names, conf_th=0.75, req_consec=8, window=10,
+                 mode="count", decay=0.8, cooldown_s=0.0):
+        self.smoother = TemporalSmoother(names, window=window, mode=mode,
+                                         decay=decay, conf_th=conf_th)
+        self.conf_th = conf_th
+        self.req_consec = req_consec
+        self.cooldown_s = cooldown_s
+        self.reset()
+
+    def reset(self):
+        self.smoother.reset()
+        self.candidate = None
+        self.consec = 0
+        self.last_committed = None
+        self.last_commit_t = None
+        self.text = ""
+
+    def reset_last(self):
+        """Boşluk / silme sonrası aynı harf tekrar yazılabilsin."""
+        self.last_committed = None
+
+    @property
+    def stable(self):
+        return self.smoother.stable
+
+    def update(self, label, conf, t=None):
+        """Yeni tahmini işler; yazılan harfi (yoksa None) döndürür.
+
+        t: zaman damgası (sn); verilmezse time.monotonic(). Kayıttan
+        oynatırken kaydın zamanı verilir.
+        """
+        t = time.monotonic() if t is None else t
+        ok = label is not None and conf is not None and conf >= self.conf_th
+        stable, _ = self.smoother.update(label if ok else None, conf)
+
+        if stable != self.candidate:
+            self.candidate = stable
+            self.consec = 0
+
+        if stable is not None and ok:
+            self.consec += 1
+        else:
+            self.consec = max(0, self.consec - 1)
+
+        if stable is None or self.consec < self.req_consec \
+                or stable == self.last_committed:
+            return None
+        if self.last_commit_t is not None and t - self.last_commit_t < self.cooldown_s:
+            return None
+
+        self.text += stable
+        self.last_committed = stable
+        self.last_commit_t = t
+        self.consec = 0
+        return stable
+
+
+def replay(events, committer):
+    """Kayıtlı tahmin dizisini kamerasız oynatır.
+
+    events: (t, label, conf) demetleri ya da stream_recognizer'ın "frame"
+    olayları (dict). (t, harf, yazı) demetleri üretir.
+    """
+    for ev in events:
+        if isinstance(ev, dict):
+            if ev.get("event", "frame") != "frame":
+                continue
+            t, label, conf = ev.get("t"), ev.get("label"), ev.get("conf")
+        else:
+            t, label, conf = ev
+        letter = committer.update(label, conf, t=t)
+        if letter is not None:
+            yield t, letter, committer.text
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="stream_recognizer JSONL kaydını farklı ayarlarla tekrar oynatır.")
+    ap.add_argument("jsonl")
+    ap.add_argument("--conf", type=float, default=0.75)
+    ap.add_argument("--consec", type=int, default=8)
+    ap.add_argument("--window", type=int, default=10)
+    ap.add_argument("--mode", choices=VOTE_MODES, default="count")
+    ap.add_argument("--decay", type=float, default=0.8)
+    ap.add_argument("--cooldown", type=float, default=0.0)
+    args = ap.parse_args()
+
+    with open(args.jsonl, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    names = sorted({e["label"] for e in events if e.get("label")})
+
+    committer = LetterCommitter(names, conf_th=args.conf, req_consec=args.consec,
+                                window=args.window, mode=args.mode,
+                                decay=args.decay, cooldown_s=args.cooldown)
+    for t, letter, text in replay(events, committer):
+        print(f"[{t:8.2f}s] {letter}  -> {text}")
+    print(f"yazı: {committer.text!r}")
+
+
+if __name__ == "__main__":
+    main()
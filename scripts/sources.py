@@ -0,0 +1,183 @@
+import glob
+import os
+import queue
+import threading
+import time
+
+import camera_config
+import cv2
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+STREAM_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def source_kind(spec):
+    """"camera" / "fake" / "stream" / "images" / "video" (spec: int, yol, glob veya URL)."""
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return "camera"
+    if spec == "fake":
+        return "fake"
+    if spec.lower().startswith(STREAM_PREFIXES):
+        return "stream"
+    if os.path.isdir(spec) or any(c in spec for c in "*?["):
+        return "images"
+    return "video"
+
+
+def is_live(spec):
+    """Canlı kaynaklar (kamera, yayın) kendi hızında akar; dosyalar değil."""
+    return source_kind(spec) in ("camera", "fake", "stream")
+
+
+class ImageSequenceCapture:
+    """Klasördeki (veya glob'daki) resimleri sırayla okuyan VideoCapture benzeri.
+
+    Sadece kullandığımız kısım: isOpened / read / get / release.
+    """
+
+    def __init__(self, spec, fps=30.0):
+        if os.path.isdir(spec):
+            paths = [os.path.join(spec, p) for p in os.listdir(spec)]
+        else:
+            paths = glob.glob(spec, recursive=True)
+        self.paths = sorted(p for p in paths if p.lower().endswith(IMAGE_EXTS))
+        self.fps = fps
+        self.pos = 0
+
+    def isOpened(self):
+        return self.pos < len(self.paths)
+
+    def read(self, image=None):
+        while self.pos < len(self.paths):
+            img = cv2.imread(self.paths[self.pos])
+            self.pos += 1
+            if img is not None:
+                # VideoCapture.read(image) gibi: boyut tutuyorsa verilen diziye yaz
+                if image is not None and image.shape == img.shape:
+                    image[...] = img
+                    return True, image
+                return True, img
+        return False, None
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.paths)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.pos
+        return 0.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.pos = int(value)
+            return True
+        return False
+
+    def release(self):
+        self.pos = len(self.paths)
+
+
+def open_capture(spec=0, fps=30.0, min_size=None):
+    """Kamera indeksi, video dosyası, resim klasörü veya yayın adresi açar.
+
+    Kameralarda (ve "fake" sahte kamerada) camera_config.AUTO açıksa
+    min_size'ı (w, h; genelde ROI'nin kapsadığı alan) karşılayan en küçük
+    mod seçilir, sürücü tamponu küçültülür.
+    """
+    kind = source_kind(spec)
+    if kind in ("camera", "fake"):
+        cap = cv2.VideoCapture(int(spec)) if kind == "camera" else camera_config.FakeCamera()
+        if camera_config.AUTO and cap.isOpened():
+            camera_config.configure(cap, 0 if kind == "fake" else int(spec), min_size)
+        return cap
+    if kind == "images":
+        return ImageSequenceCapture(spec, fps=fps)
+    cap = cv2.VideoCapture(spec)
+    if kind == "stream":
+        # yayında birikmiş eski kareleri tutmasın
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def capture_fps(cap, default=30.0):
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return fps if fps and 0 < fps < 1000 else default
+
+
+class ReadAheadReader:
+    """Kareleri arka plan thread'inde çözer, sınırlı kuyrukta bekletir.
+
+    Canlı kaynaktaki LatestFrameGrabber'dan farkı: hiçbir kare atılmaz,
+    tüketici yavaşsa okuma bekler. for (index, t, frame) in reader: ...
+    t: dosyalar için videodaki zaman (sn), canlı kaynakta geçen süre.
+    """
+
+    _END = object()
+
+    def __init__(self, spec=0, queue_size=16, fps=30.0, max_frames=None):
+        self.spec = spec
+        self.cap = open_capture(spec, fps=fps)
+        self.fps = capture_fps(self.cap, fps)
+        self.live = is_live(spec)
+        self.max_frames = max_frames
+        self._q = queue.Queue(maxsize=queue_size)
+        self._running = False
+        self._thread = None
+        self.error = None
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _put(self, item):
+        # durdurulursa kuyruk dolu diye sonsuza kadar beklemesin
+        while self._running:
+            try:
+                self._q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        t0 = time.perf_counter()
+        index = 0
+        try:
+            while self._running and (self.max_frames is None or index < self.max_frames):
+                ok, frame = self.cap.read()
+                if not ok:
+                    break
+                t = time.perf_counter() - t0 if self.live else index / self.fps
+                if not self._put((index, t, frame)):
+                    break
+                index += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(self._END)
+
+    def __iter__(self):
+        self.start()
+        while True:
+            try:
+                item = self._q.get(timeout=0.1)
+            except queue.Empty:
+                if not self._running:
+                    break
+                continue
+            if item is self._END:
+                break
+            yield item
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.cap.release()
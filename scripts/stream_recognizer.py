@@ -0,0 +1,175 @@
+import argparse
+import json
+import sys
+
+from hand_tracker import HandTracker
+from inference import BACKEND, MODEL_PATH, SERVER, load_engine
+from session_record import CODECS, SessionRecorder
+from smoothing import VOTE_MODES, LetterCommitter
+from sources import ReadAheadReader, source_kind
+from word_decoder import load_decoder
+
+# --- Ayarlar (gui_auto_word.py ile aynı) ---
+CONF_TH = 0.75
+REQ_CONSEC = 8
+HISTORY = 10
+WORD_END_BLANK = 12
+
+
+def recognize(source, engine, roi=None, track=False, every=1,
+              committer=None, decoder=None, max_frames=None, queue_size=16,
+              recorder=None):
+    """Ekransız tanıma: kaynaktaki her kare için olay üreten generator.
+
+    {"event": "frame", "frame", "t", "label", "conf", "box"}
+    {"event": "letter", "frame", "t", "letter", "text"}
+    {"event": "word", "frame", "t", "word"}          (decoder verilirse)
+
+    roi: (x1, y1, x2, y2) ham kare koordinatı; None ise karenin tamamı.
+    every: her N karede bir tahmin (aradakiler için olay üretilmez).
+    recorder: session_record.SessionRecorder; modele giden ROI'ler ve
+    yazılan harfler kaydedilir (kaynağın zamanıyla).
+    """
+    committer = committer or LetterCommitter(engine.names, conf_th=CONF_TH,
+                                             req_consec=REQ_CONSEC, window=HISTORY)
+    tracker = HandTracker() if track else None
+    reader = ReadAheadReader(source, queue_size=queue_size, max_frames=max_frames)
+    if not reader.isOpened():
+        reader.close()
+        raise IOError(f"kaynak açılamadı: {source}")
+
+    try:
+        for index, t, frame in reader:
+            if index % every:
+                continue
+
+            top = []
+            seen = [None]
+
+            def predict_best(r):
+                seen[0] = r
+                pred = engine.predict(r)
+                top[:] = [(d.label, d.conf) for d in pred.topk(3)]
+                return pred.best()
+
+            if tracker is not None:
+                det, box = tracker.predict(frame, predict_best)
+            else:
+                h, w = frame.shape[:2]
+                box = roi or (0, 0, w, h)
+                x1, y1, x2, y2 = box
+                det = predict_best(frame[y1:y2, x1:x2])
+
+            label = det.label if det is not None else None
+            conf = det.conf if det is not None else None
+            yield {"event": "frame", "frame": index, "t": round(t, 3),
+                   "label": label, "conf": conf, "top": top,
+                   "box": list(box) if box is not None else None}
+            if recorder is not None:
+                recorder.frame(seen[0], label, conf, top, box, t=t)
+
+            if decoder is not None:
+                word = decoder.step(top)
+                if word:
+                    if recorder is not None:
+                        recorder.event("word", t=t, word=word)
+                    yield {"event": "word", "frame": index, "t": round(t, 3),
+                           "word": word}
+                continue
+
+            letter = committer.update(label, conf, t=t)
+            if letter is not None:
+                if recorder is not None:
+                    recorder.event("letter", t=t, letter=letter)
+                yield {"event": "letter", "frame": index, "t": round(t, 3),
+                       "letter": letter, "text": committer.text}
+
+        # kaynak bitti: yarım kalan kelimeyi de bildir
+        if decoder is not None and decoder.best:
+            yield {"event": "word", "frame": index, "t": round(t, 3),
+                   "word": decoder.end_word()}
+    finally:
+        reader.close()
+        if reader.error is not None:
+            raise reader.error
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Ekransız tanıma: kamera / video / resim klasörü / rtsp adresi.")
+    ap.add_argument("source", help="kamera indeksi (0), video, klasör veya rtsp://...")
+    ap.add_argument("--model", default=MODEL_PATH)
+    ap.add_argument("--backend", default=BACKEND)
+    ap.add_argument("--server", default=SERVER,
+                    help="infer_server.py adresi (modeli yerelde yükleme)")
+    ap.add_argument("--conf", type=float, default=CONF_TH)
+    ap.add_argument("--consec", type=int, default=REQ_CONSEC)
+    ap.add_argument("--vote", choices=VOTE_MODES, default="count")
+    ap.add_argument("--words", action="store_true",
+                    help="harf yerine sözlüklü kelime çözümü (word_decoder.py)")
+    ap.add_argument("--roi", type=int, nargs=4, default=None,
+                    metavar=("X1", "Y1", "X2", "Y2"), help="ham karede ROI")
+    ap.add_argument("--track", action="store_true", help="ROI eli izlesin")
+    ap.add_argument("--enhance", action="store_true", help="640'a büyüt + CLAHE")
+    ap.add_argument("--every", type=int, default=1, help="her N karede bir tahmin")
+    ap.add_argument("--limit", type=int, default=None, help="en fazla kare")
+    ap.add_argument("--record", nargs="?", const="", default=None, metavar="DOSYA",
+                    help="ROI'leri + sonuçları .aslrec'e kaydet (session_record.py replay)")
+    ap.add_argument("--record-codec", choices=CODECS, default="jpg")
+    ap.add_argument("--jsonl", default=None,
+                    help="tüm olayları yaz ('-' = stdout); yoksa sadece harfler")
+    args = ap.parse_args()
+
+    engine = load_engine(args.model, conf=args.conf,
+                         upscale=640 if args.enhance else None,
+                         enhance=args.enhance, server=args.server,
+                         backend=args.backend)
+    committer = LetterCommitter(engine.names, conf_th=args.conf,
+                                req_consec=args.consec, window=HISTORY,
+                                mode=args.vote)
+    decoder = load_decoder(end_after_blank=WORD_END_BLANK) if args.words else None
+
+    recorder = None
+    if args.record is not None:
+        names = engine.names
+        recorder = SessionRecorder(args.record or None, codec=args.record_codec, meta={
+            "app": "stream_recognizer", "source": str(args.source),
+            "names": [names[i] for i in sorted(names)],
+            "conf": args.conf, "upscale": 640 if args.enhance else None,
+            "enhance": args.enhance, "conf_th": args.conf, "req_consec": args.consec,
+            "window": HISTORY, "vote": args.vote, "word_mode": args.words,
+            "word_end_blank": WORD_END_BLANK})
+
+    out = None
+    if args.jsonl:
+        out = sys.stdout if args.jsonl == "-" else open(args.jsonl, "w", encoding="utf-8")
+
+    n = 0
+    try:
+        for ev in recognize(args.source, engine, roi=args.roi, track=args.track,
+                            every=args.every, committer=committer,
+                            decoder=decoder, max_frames=args.limit,
+                            recorder=recorder):
+            if out is not None:
+                out.write(json.dumps(ev, ensure_ascii=False) + "\n")
+            if ev["event"] == "frame":
+                n += 1
+            elif ev["event"] == "word" and out is not sys.stdout:
+                print(f"[{ev['t']:8.2f}s] {ev['word']}")
+            elif out is not sys.stdout:
+                print(f"[{ev['t']:8.2f}s] {ev['letter']}  -> {ev['text']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            text = committer.text if decoder is None else None
+            print(f" kayıt: {recorder.close(text=text)}", file=sys.stderr)
+
+    if out is not sys.stdout:
+        print(f"{n} kare ({source_kind(args.source)}), yazı: {committer.text!r}")
+
+
+if __name__ == "__main__":
+    main()
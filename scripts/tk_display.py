@@ -0,0 +1,101 @@
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+from profiling import NULL_PROFILER
+
+
+class TkVideoDisplay:
+    """Bir Tk Label'ına BGR kareler basar, ana thread'i yormadan.
+
+    - submit(): herhangi bir thread'den çağrılır, kareyi sabit bir tampona
+      kopyalar ve arka plandaki thread'i uyandırır.
+    - Arka plan thread'i OpenCV ile yeniden boyutlandırır ve RGBA'ya çevirir
+      (iki tampon sırayla kullanılır).
+    - Tk tarafında tek bir PhotoImage vardır, her yeni karede sadece paste()
+      ile güncellenir; yeni kare yoksa hiçbir şey çizilmez.
+    """
+
+    def __init__(self, label, size=(720, 405), interval_ms=10, profiler=None):
+        self.prof = profiler or NULL_PROFILER
+        self.label = label
+        self.size = size
+        self.interval_ms = interval_ms
+
+        w, h = size
+        self._in = None
+        self._work = None
+        self._small = np.empty((h, w, 3), dtype=np.uint8)
+        self._in_seq = 0
+        self._bufs = [np.zeros((h, w, 4), dtype=np.uint8) for _ in range(2)]
+        # PIL görüntüleri tamponları paylaşır (kopya yok)
+        self._imgs = [Image.frombuffer("RGBA", size, b, "raw", "RGBA", 0, 1)
+                      for b in self._bufs]
+        self._front = 0
+        self._ready_seq = 0
+        self._shown_seq = 0
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+        self.photo = ImageTk.PhotoImage("RGBA", size)
+        self.label.configure(image=self.photo)
+        self.label.imgtk = self.photo
+        self._tick()
+
+    def submit(self, bgr):
+        with self._lock:
+            if self._in is None or self._in.shape != bgr.shape:
+                self._in = np.empty_like(bgr)
+            np.copyto(self._in, bgr)
+            self._in_seq += 1
+        self._wake.set()
+
+    def _run(self):
+        done_seq = 0
+        while self._running:
+            self._wake.wait(0.5)
+            self._wake.clear()
+
+            with self._lock:
+                if self._in is None or self._in_seq == done_seq:
+                    continue
+                seq = self._in_seq
+                back = 1 - self._front
+                # kilit sadece kısa bir memcpy boyunca tutulur
+                if self._work is None or self._work.shape != self._in.shape:
+                    self._work = np.empty_like(self._in)
+                np.copyto(self._work, self._in)
+
+            with self.prof.stage("tk.convert"):
+                cv2.resize(self._work, self.size, dst=self._small,
+                           interpolation=cv2.INTER_AREA)
+                cv2.cvtColor(self._small, cv2.COLOR_BGR2RGBA,
+                             dst=self._bufs[back])
+
+            with self._lock:
+                self._front = back
+                self._ready_seq = seq
+            done_seq = seq
+
+    def _tick(self):
+        if not self._running:
+            return
+        self.refresh()
+        self.label.after(self.interval_ms, self._tick)
+
+    def refresh(self):
+        """Ana thread: yeni kare hazırsa PhotoImage'a yapıştır."""
+        if self._ready_seq == self._shown_seq:
+            return
+        with self._lock, self.prof.stage("tk.paste"):
+            self.photo.paste(self._imgs[self._front])
+            self._shown_seq = self._ready_seq
+
+    def close(self):
+        self._running = False
+        self._wake.set()
@@ -1,19 +1,302 @@
-from ultralytics import YOLO
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import yaml
+import model_registry
+
+CONFIG_PATH = "configs/train.yaml"
+
+# Config dosyasında olmayan ayarlar bunlarla doldurulur
+DEFAULTS = {
+    "model": "yolov8n.pt",
+    "data": "dataset/data.yaml",
+    "epochs": 30,
+    "imgsz": 640,          # veri seti 416x416; 416 daha hızlı eğitir ve çalışır
+    "batch": 8,
+    "workers": 2,          # DataLoader worker sayısı
+    # "memmap" -> dataset_cache.py'nin .npy'si, "ram" / "disk" -> ultralytics
+    # cache'i, null -> her seferinde JPEG'den
+    "cache": "memmap",
+    "device": None,        # None = ultralytics seçer, "cpu", "0", ...
+    "threads": None,       # torch CPU thread sayısı (None = hepsi)
+    "project": "runs",
+    "name": None,          # None -> <model>_<imgsz>_e<epochs>_b<batch>
+    "patience": 50,
+    "seed": 0,
+    "plots": True,
+    "args": {},            # ultralytics'e aynen geçen diğer ayarlar (lr0, mosaic, ...)
+    "register": True,      # bitince runs/registry.json'a ekle
+    "latency_images": 50,  # registry için gecikme ölçümünde kullanılan resim sayısı
+}
+
+
+def read_yaml(path):
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def parse_overrides(items):
+    """["epochs=50", "imgsz=416"] -> {"epochs": 50, "imgsz": 416}."""
+    out = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--set anahtar=değer olmalı: {item}")
+        out[key.strip()] = yaml.safe_load(value)
+    return out
+
+
+def make_config(base=None, overrides=None):
+    cfg = dict(DEFAULTS)
+    cfg["args"] = dict(DEFAULTS["args"])
+    for src in (base or {}, overrides or {}):
+        for key, value in src.items():
+            if key not in DEFAULTS:
+                raise SystemExit(f"Bilinmeyen ayar: {key} ({', '.join(DEFAULTS)})")
+            if key == "args":
+                cfg["args"].update(value or {})
+            else:
+                cfg[key] = value
+    if not cfg["name"]:
+        cfg["name"] = auto_name(cfg)
+    return cfg
+
+
+# otomatik adda zaten olan ayarlar
+NAME_KEYS = ("model", "imgsz", "epochs", "batch")
+
+
+def auto_name(cfg, keys=()):
+    """<model>_<imgsz>_e<epochs>_b<batch>, ardından keys'teki ayarlar.
+
+    keys: sweep'te config'ler arasında değişen diğer ayarlar, örn.
+    ("seed", "args") -> ..._seed1_mosaic0.5
+    """
+    parts = [f"{Path(cfg['model']).stem}_{cfg['imgsz']}_e{cfg['epochs']}_b{cfg['batch']}"]
+    for key in keys:
+        value = cfg[key]
+        if isinstance(value, dict):
+            parts += [f"{k}{v}" for k, v in sorted(value.items())]
+        else:
+            parts.append(f"{key}{value}")
+    return re.sub(r"[^\w.-]+", "-", "_".join(parts))
+
+
+def set_threads(n):
+    """Bu process'in CPU thread sayısı (sweep'te process başına pay)."""
+    if not n:
+        return
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(n)
+    try:
+        import torch
+        torch.set_num_threads(n)
+    except ImportError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(n)
+    except ImportError:
+        pass
+
+
+def run_dir(cfg):
+    return Path(cfg["project"]) / cfg["name"]
+
+
+def train(cfg, resume=False):
+    """Tek config ile eğitir; registry kaydını döndürür.
+
+    resume=True ve run klasöründe last.pt varsa kaldığı yerden devam eder.
+    Run adı sabittir (otomatik numaralanmaz), aynı config aynı klasöre yazar.
+    """
+    from ultralytics import YOLO
+
+    set_threads(cfg["threads"])
+    weights = run_dir(cfg) / "weights"
+    last = weights / "last.pt"
+
+    extra = {}
+    if cfg["cache"] == "memmap":
+        from dataset_cache import memmap_trainer
+        extra["trainer"] = memmap_trainer(size=cfg["imgsz"])
+    elif cfg["cache"]:
+        extra["cache"] = cfg["cache"]
+
+    if resume and last.exists():
+        print(f" devam: {last}")
+        YOLO(str(last)).train(resume=True, **extra)
+    else:
+        train_args = dict(cfg["args"])
+        if cfg["device"] is not None:
+            train_args["device"] = cfg["device"]
+        YOLO(cfg["model"]).train(
+            data=cfg["data"],
+            epochs=cfg["epochs"],
+            imgsz=cfg["imgsz"],
+            batch=cfg["batch"],
+            workers=cfg["workers"],
+            project=cfg["project"],
+            name=cfg["name"],
+            exist_ok=True,
+            patience=cfg["patience"],
+            seed=cfg["seed"],
+            plots=cfg["plots"],
+            **train_args,
+            **extra
+        )
+
+    best = weights / "best.pt"
+    if not best.exists():
+        raise FileNotFoundError(f"best.pt yok: {best}")
+    entry = model_registry.evaluate(str(best), cfg["data"], cfg["imgsz"],
+                                    latency_n=cfg["latency_images"])
+    entry["name"] = cfg["name"]
+    entry["config"] = cfg
+    return entry
+
+
+def sweep_configs(sweep, base_overrides=None):
+    """Sweep dosyası -> config listesi.
+
+    base: ortak ayarlar, grid: {ayar: [değerler]} (kartezyen çarpım),
+    runs: ayrıca eklenecek config'ler (base'in üzerine).
+
+    Adı verilmeyen config'lerin adına, aralarında değişen her ayar eklenir
+    (base'in name'i tek config'li sweep dışında kullanılmaz). Aynı klasöre
+    yazıp birbirinin ağırlıklarını ezmesinler diye aynı ad iki kez olamaz.
+    """
+    base = dict(sweep.get("base") or {})
+    base.update(base_overrides or {})
+    grid = sweep.get("grid") or {}
+    overs = []
+    if grid:
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            overs.append(dict(zip(keys, values)))
+    overs += [dict(run) for run in sweep.get("runs") or []]
+    if not overs:
+        return [make_config(base)]
+
+    configs = []
+    auto = []
+    for over in overs:
+        if not over.get("name"):
+            over["name"] = None
+            auto.append(len(configs))
+        configs.append(make_config(base, over))
+    varying = [k for k in DEFAULTS if k not in NAME_KEYS + ("name", "threads")
+               and len({json.dumps(configs[i][k], sort_keys=True) for i in auto}) > 1]
+    for i in auto:
+        configs[i]["name"] = auto_name(configs[i], varying)
+
+    dirs = [str(run_dir(cfg)) for cfg in configs]
+    dups = sorted({d for d in dirs if dirs.count(d) > 1})
+    if dups:
+        raise SystemExit(f"Sweep'te aynı run klasörü birden fazla: {', '.join(dups)} "
+                         "(birbirinin ağırlıklarını ezerlerdi; name ver)")
+    return configs
+
+
+def _run_job(cfg, resume):
+    try:
+        return train(cfg, resume=resume)
+    except Exception as e:
+        return {"name": cfg["name"], "error": f"{type(e).__name__}: {e}"}
+
+
+def run_sweep(configs, jobs=1, threads=None, resume=True):
+    """Config'leri process havuzunda çalıştırır; bitenleri registry'ye yazar.
+
+    Her process'e cpu_count // jobs thread düşer (threads ile değiştirilir).
+    ProcessPoolExecutor process'leri daemon değildir, DataLoader worker'ları
+    açılabilir.
+    """
+    per_job = threads or max(1, (os.cpu_count() or 1) // max(1, jobs))
+    for cfg in configs:
+        if cfg["threads"] is None:
+            cfg["threads"] = per_job
+
+    # memmap cache'leri önceden hazırla (aynı boyutu iki process birden yazmasın)
+    sizes = sorted({cfg["imgsz"] for cfg in configs if cfg["cache"] == "memmap"})
+    if sizes:
+        import dataset_cache
+        for size in sizes:
+            for split in ("train", "valid"):
+                dataset_cache.prepare(split, size=size)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_run_job, cfg, resume): cfg for cfg in configs}
+        for fut in as_completed(futures):
+            entry = fut.result()
+            results.append(entry)
+            if "error" in entry:
+                print(f" {entry['name']}: HATA {entry['error']}", file=sys.stderr)
+                continue
+            if futures[fut]["register"]:
+                model_registry.register(entry)
+            print(f" {entry['name']}: mAP50-95 {entry['map50_95']:.3f}  "
+                  f"p50 {entry.get('latency_ms', float('nan')):.1f} ms")
+    return results
 
 
 def main():
+    ap = argparse.ArgumentParser(
+        description="Config dosyasıyla eğitim (devam ettirilebilir), sweep ve model kaydı.")
+    ap.add_argument("--config", default=CONFIG_PATH,
+                    help="YAML config (yoksa varsayılanlar)")
+    ap.add_argument("--set", nargs="*", metavar="AYAR=DEĞER", default=[],
+                    help="config üzerine yaz, örn. --set imgsz=416 epochs=50")
+    ap.add_argument("--resume", action="store_true",
+                    help="run klasöründe last.pt varsa kaldığı yerden devam et")
+    ap.add_argument("--sweep", default=None,
+                    help="sweep YAML'ı (base + grid / runs)")
+    ap.add_argument("--jobs", type=int, default=1, help="sweep'te paralel eğitim sayısı")
+    ap.add_argument("--threads", type=int, default=None,
+                    help="eğitim başına CPU thread (varsayılan: çekirdek / jobs)")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="sadece çözülen config'leri yazdır")
+    args = ap.parse_args()
+
+    base = read_yaml(args.config) if Path(args.config).exists() else {}
+    overrides = parse_overrides(args.set)
+
+    if args.sweep:
+        sweep = read_yaml(args.sweep)
+        if "base" not in sweep:
+            sweep["base"] = base
+        else:
+            sweep["base"] = {**base, **sweep["base"]}
+        configs = sweep_configs(sweep, overrides)
+    else:
+        configs = [make_config(base, overrides)]
+
+    if args.dry_run:
+        print(json.dumps(configs, indent=2, ensure_ascii=False))
+        return
+
+    if args.sweep:
+        results = run_sweep(configs, args.jobs, args.threads, resume=True)
+        ok = [r for r in results if "error" not in r]
+        print(f" {len(ok)}/{len(results)} eğitim bitti; en iyi: "
+              f"{model_registry.best_model_path('accuracy', '-')}")
+        return
 
-    model = YOLO("yolov8n.pt")
-
-    model.train(
-        data="dataset/data.yaml",
-        epochs=30,
-        imgsz=640,
-        batch=8,
-        project="runs",
-        name="asl_sign_model",
-        plots=True
-    )
+    cfg = configs[0]
+    if args.threads:
+        cfg["threads"] = args.threads
+    entry = train(cfg, resume=args.resume)
+    if cfg["register"]:
+        model_registry.register(entry)
+    print(json.dumps({k: v for k, v in entry.items() if k != "config"},
+                     indent=2, ensure_ascii=False))
 
 
 if __name__ == "__main__":
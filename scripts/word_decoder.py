@@ -0,0 +1,262 @@
+import heapq
+import math
+import os
+from collections import defaultdict
+
+# Kelime listesi: satır başına bir kelime, isteğe bağlı sıklık ("hello 120").
+# Sıklık yoksa üstteki kelimeler daha sık sayılır.
+LEXICON_PATH = os.path.join(os.path.dirname(__file__), "lexicon_en.txt")
+
+
+class TrieNode:
+    __slots__ = ("children", "word", "count", "_top")
+
+    def __init__(self):
+        self.children = {}
+        self.word = None     # bu düğümde biten kelime
+        self.count = 0
+        self._top = None     # en sık tamamlamalar (ilk istenince hesaplanır)
+
+
+class LexiconTrie:
+    """Büyük harfli kelimelerden trie; önek kontrolü ve tamamlama önerileri."""
+
+    def __init__(self, words=()):
+        self.root = TrieNode()
+        self.size = 0
+        for word, count in words:
+            self.add(word, count)
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH):
+        with open(path, encoding="utf-8") as f:
+            lines = [line.split() for line in f
+                     if line.strip() and not line.startswith("#")]
+        n = len(lines)
+        words = []
+        for i, parts in enumerate(lines):
+            count = float(parts[1]) if len(parts) > 1 else float(n - i)
+            words.append((parts[0], count))
+        return cls(words)
+
+    def add(self, word, count=1.0):
+        word = word.upper()
+        node = self.root
+        for ch in word:
+            node._top = None
+            node = node.children.setdefault(ch, TrieNode())
+        node._top = None
+        if node.word is None:
+            self.size += 1
+        node.word = word
+        node.count += count
+
+    def node(self, prefix):
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def completions(self, prefix, k=3):
+        """prefix ile başlayan en sık k kelime."""
+        node = self.node(prefix)
+        if node is None:
+            return []
+        if node._top is None or len(node._top) < k:
+            found = []
+            stack = [node]
+            while stack:
+                n = stack.pop()
+                if n.word is not None:
+                    found.append((n.count, n.word))
+                stack.extend(n.children.values())
+            node._top = [w for _, w in heapq.nlargest(max(k, 5), found)]
+        return node._top[:k]
+
+    def words(self):
+        stack = [self.root]
+        while stack:
+            n = stack.pop()
+            if n.word is not None:
+                yield n.word, n.count
+            stack.extend(n.children.values())
+
+
+class CharNgram:
+    """Harf n-gram dil modeli (add-k düzeltmeli), kelime listesinden eğitilir."""
+
+    BOS, EOS = "^", "$"
+
+    def __init__(self, n=3, k=0.1, alphabet=None):
+        self.n = n
+        self.k = k
+        self.alphabet = set(alphabet or "ABCDEFGHIJKLMNOPQRSTUVWXYZ") | {self.EOS}
+        self.counts = defaultdict(lambda: defaultdict(float))
+        self.totals = defaultdict(float)
+        self._cache = {}
+
+    def fit(self, words):
+        """words: (kelime, sıklık) demetleri."""
+        for word, count in words:
+            s = self.BOS * (self.n - 1) + word.upper() + self.EOS
+            for i in range(self.n - 1, len(s)):
+                ctx = s[i - self.n + 1:i]
+                self.counts[ctx][s[i]] += count
+                self.totals[ctx] += count
+        self._cache.clear()
+        return self
+
+    def logp(self, prefix, ch):
+        ctx = (self.BOS * (self.n - 1) + prefix)[-(self.n - 1):]
+        key = (ctx, ch)
+        lp = self._cache.get(key)
+        if lp is None:
+            c = self.counts.get(ctx, {}).get(ch, 0.0)
+            t = self.totals.get(ctx, 0.0)
+            lp = math.log((c + self.k) / (t + self.k * len(self.alphabet)))
+            self._cache[key] = lp
+        return lp
+
+
+class BeamDecoder:
+    """Kare başına top-k harf olasılıklarından kelime çözer (CTC önek beam search).
+
+    Her karede: harfler conf'larıyla, "boş" (el yok / belirsiz) 1 - en iyi conf
+    ile olasılık alır. Aynı harfin ardışık kareleri tek harfe katlanır; çift
+    harf için arada boş kare gerekir. Lexicon verilirse sadece trie'deki
+    önekler yaşar (M/N, U/V gibi karışıklıkları kelime çözer); dil modeli
+    lm_weight ile skora eklenir.
+
+    step(top) -> boşluk uzun sürdüyse biten kelime, yoksa None.
+    """
+
+    def __init__(self, lexicon=None, lm=None, beam=8, lm_weight=0.5,
+                 len_bonus=1.0, blank_floor=0.05, end_after_blank=None):
+        self.lexicon = lexicon
+        self.lm = lm
+        self.beam = beam
+        self.lm_weight = lm_weight
+        self.len_bonus = len_bonus
+        self.blank_floor = blank_floor
+        self.end_after_blank = end_after_blank
+        self.reset()
+
+    def reset(self):
+        root = self.lexicon.root if self.lexicon is not None else None
+        # önek -> [p_boş, p_harf, lm log skoru, trie düğümü]
+        self.beams = {"": [1.0, 0.0, 0.0, root]}
+        self._blank_run = 0
+
+    def _frame_probs(self, top):
+        top = [(lbl, c) for lbl, c in top if lbl is not None and c is not None]
+        if not top:
+            return {}, 1.0
+        best = max(c for _, c in top)
+        p_blank = min(1.0, max(self.blank_floor, 1.0 - best))
+        s = sum(c for _, c in top)
+        probs = {}
+        for lbl, c in top:
+            probs[lbl] = probs.get(lbl, 0.0) + (1.0 - p_blank) * c / s
+        return probs, p_blank
+
+    def _score(self, prefix, entry):
+        pb, pnb, lm_lp, _ = entry
+        p = pb + pnb
+        if p <= 0.0:
+            return -math.inf
+        return math.log(p) + self.lm_weight * lm_lp + self.len_bonus * len(prefix)
+
+    def step(self, top):
+        """top: [(harf, conf), ...] (Prediction.topk çıktısı gibi)."""
+        probs, p_blank = self._frame_probs(top)
+        nxt = {}
+
+        def entry(prefix, lm_lp, node):
+            e = nxt.get(prefix)
+            if e is None:
+                e = nxt[prefix] = [0.0, 0.0, lm_lp, node]
+            return e
+
+        for prefix, (pb, pnb, lm_lp, node) in self.beams.items():
+            total = pb + pnb
+            entry(prefix, lm_lp, node)[0] += total * p_blank
+            last = prefix[-1] if prefix else None
+
+            for ch, p in probs.items():
+                if ch == last:
+                    # aynı harf sürüyor (katlanır)
+                    entry(prefix, lm_lp, node)[1] += pnb * p
+                    src = pb        # tekrar harf: arada boş kare şart
+                else:
+                    src = total
+                if src <= 0.0:
+                    continue
+
+                child = None
+                if node is not None:
+                    child = node.children.get(ch)
+                    if child is None:
+                        continue    # sözlükte böyle bir önek yok
+                new_lm = lm_lp + (self.lm.logp(prefix, ch) if self.lm else 0.0)
+                entry(prefix + ch, new_lm, child)[1] += src * p
+
+        best = heapq.nlargest(self.beam, nxt.items(),
+                              key=lambda kv: self._score(kv[0], kv[1]))
+        norm = max(e[0] + e[1] for _, e in best) or 1.0
+        for _, e in best:
+            e[0] /= norm
+            e[1] /= norm
+        self.beams = dict(best)
+
+        self._blank_run = self._blank_run + 1 if p_blank >= 0.8 else 0
+        if self.end_after_blank and self._blank_run >= self.end_after_blank \
+                and self.best:
+            return self.end_word()
+        return None
+
+    def hypotheses(self, n=3):
+        """En iyi n (önek, skor)."""
+        ranked = sorted(self.beams.items(),
+                        key=lambda kv: self._score(kv[0], kv[1]), reverse=True)
+        return [(p, self._score(p, e)) for p, e in ranked[:n]]
+
+    @property
+    def best(self):
+        hyp = self.hypotheses(1)
+        return hyp[0][0] if hyp else ""
+
+    def suggestions(self, k=3):
+        """En iyi önek için sözlükten tamamlama önerileri."""
+        if self.lexicon is None:
+            return []
+        for prefix, _ in self.hypotheses(self.beam):
+            words = self.lexicon.completions(prefix, k)
+            if words:
+                return words
+        return []
+
+    def best_word(self):
+        """Tam kelime olan en iyi hipotez; yoksa en iyi önek."""
+        for prefix, _ in self.hypotheses(self.beam):
+            node = self.beams[prefix][3]
+            if prefix and (node is None or node.word is not None):
+                return prefix
+        return self.best
+
+    def end_word(self):
+        """Kelimeyi bitirir (boşluk): kelimeyi döndürür ve sıfırlar."""
+        word = self.best_word()
+        self.reset()
+        return word or None
+
+
+def load_decoder(path=LEXICON_PATH, use_lm=True, **kwargs):
+    """Kelime listesi varsa trie + dil modeliyle, yoksa sözlüksüz decoder."""
+    lexicon = lm = None
+    if path and os.path.exists(path):
+        lexicon = LexiconTrie.load(path)
+        if use_lm:
+            lm = CharNgram().fit(lexicon.words())
+    return BeamDecoder(lexicon=lexicon, lm=lm, **kwargs)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# scripts/ düz modüller (paket değil): uygulamalar gibi isimle import edilsin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
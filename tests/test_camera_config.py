@@ -0,0 +1,95 @@
+import json
+
+import camera_config
+from camera_config import CameraMode, FakeCamera, configure, negotiate
+
+
+def fake(**kwargs):
+    kwargs.setdefault("cpu_ms", {"MJPG": 0.0, "YUYV": 0.0})
+    return FakeCamera(realtime=False, **kwargs)
+
+
+def test_negotiate_snaps_to_smallest_covering_mode():
+    # 640x480 yok: sürücü 320x240'a yuvarlar (küçük, atlanır), sonra 1280x720
+    cap = fake(modes=[("MJPG", 320, 240, 30), ("MJPG", 1280, 720, 30)],
+               start=("MJPG", 320, 240))
+    mode = negotiate(cap, (640, 480), fourccs=("MJPG",), measure_frames=3)
+    assert (mode.fourcc, mode.width, mode.height) == ("MJPG", 1280, 720)
+    assert cap.mode()[1:3] == (1280, 720)
+
+
+def test_negotiate_rejects_too_small_modes():
+    cap = fake(modes=[("MJPG", 320, 240, 30), ("YUYV", 640, 360, 30)],
+               start=("YUYV", 640, 360))
+    assert negotiate(cap, (640, 480), measure_frames=3) is None
+
+
+def test_negotiate_skips_unsupported_fourcc():
+    cap = fake(modes=[("YUYV", 640, 480, 30)], start=("YUYV", 640, 480))
+    mode = negotiate(cap, (640, 480), measure_frames=3)
+    assert mode.fourcc == "YUYV"
+
+
+def test_negotiate_prefers_fps_then_cpu(monkeypatch):
+    # ölçüm sahte kameranın tablosundan: YUYV 720p'de 10 FPS, CPU'su daha az
+    cpu = {"MJPG": 0.8, "YUYV": 0.4}
+    monkeypatch.setattr(camera_config, "measure",
+                        lambda cap, n: (cap.mode()[3], cpu[cap.fourcc]))
+    mode = negotiate(fake(), (1280, 720))
+    assert (mode.fourcc, mode.width, mode.height, mode.fps) == ("MJPG", 1280, 720, 30)
+    mode = negotiate(fake(), (640, 480))
+    assert (mode.fourcc, mode.width, mode.height) == ("YUYV", 640, 480)
+
+
+def test_buffersize_fallback():
+    mode = negotiate(fake(buffer_ok=False), (640, 480), measure_frames=3)
+    assert mode.buffer == 0
+    cap = fake()
+    assert negotiate(cap, (640, 480), measure_frames=3).buffer == 1
+    assert cap.buffer == 1
+
+
+def test_configure_profile_round_trip(tmp_path):
+    path = tmp_path / "profiles.json"
+    first = configure(fake(), index=2, min_size=(640, 480), path=path)
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert list(saved) == ["FAKE:2@640x480"]
+    assert CameraMode(**{k: saved["FAKE:2@640x480"][k]
+                         for k in CameraMode.__dataclass_fields__}) == first
+
+    # kayıtlı mod tutuyor: ölçüm yok, sadece doğrulama için tek kare
+    cap = fake()
+    assert configure(cap, index=2, min_size=(640, 480), path=path) == first
+    assert cap.frames == 1
+    assert cap.mode()[:3] == (first.fourcc, first.width, first.height)
+
+    # kamera artık o modu vermiyor: yeniden pazarlık, profil güncellenir
+    cap = fake(modes=[("MJPG", 800, 600, 30)], start=("MJPG", 800, 600))
+    mode = configure(cap, index=2, min_size=(640, 480), path=path)
+    assert (mode.fourcc, mode.width, mode.height) == ("MJPG", 800, 600)
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["FAKE:2@640x480"]["width"] == 800
+
+
+def test_configure_without_modes_sets_buffer_only(tmp_path):
+    path = tmp_path / "profiles.json"
+    cap = fake(modes=[("MJPG", 320, 240, 30)], start=("MJPG", 320, 240))
+    assert configure(cap, min_size=(640, 480), path=path) is None
+    assert cap.buffer == camera_config.BUFFER_SIZE
+    assert not path.exists()
+
+
+def test_configure_renegotiates_when_fourcc_falls_back(tmp_path):
+    path = tmp_path / "profiles.json"
+    mjpg = [m for m in camera_config.FAKE_MODES if m[0] == "MJPG"]
+    saved = configure(fake(modes=mjpg, start=("MJPG", 1280, 720)),
+                      min_size=(1280, 720), path=path)
+    assert (saved.fourcc, saved.width, saved.height) == ("MJPG", 1280, 720)
+
+    # aynı kamera artık MJPG vermiyor: boyut tutsa da YUYV 720p 10 FPS
+    yuyv = [m for m in camera_config.FAKE_MODES if m[0] == "YUYV"]
+    cap = fake(modes=yuyv)
+    mode = configure(cap, min_size=(1280, 720), path=path)
+    assert (mode.fourcc, mode.width, mode.height) == ("YUYV", 1280, 720)
+    assert cap.frames > 1  # kayıtlı profil kabul edilmedi, ölçüldü
+    assert json.loads(path.read_text(encoding="utf-8"))["FAKE:0@1280x720"]["fourcc"] == "YUYV"
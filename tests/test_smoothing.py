@@ -0,0 +1,64 @@
+from smoothing import LetterCommitter, TemporalSmoother, replay
+
+
+def frames(*items, dt=0.1):
+    """("A", 0.9), ... -> replay'in beklediği (t, label, conf) demetleri."""
+    return [(round(i * dt, 3), label, conf) for i, (label, conf) in enumerate(items)]
+
+
+def test_count_tie_goes_to_first_seen_in_window():
+    # Counter.most_common gibi: sınıf sırası (B önce) değil, pencere sırası
+    s = TemporalSmoother(["B", "A", "C"], window=4)
+    assert [s.update(x)[0] for x in "ABBA"] == ["A", "A", "B", "A"]
+    # en eski A halkadan çıktı: pencere B B A C
+    assert s.update("C") == ("B", 0.5)
+
+
+def test_count_vote_commits_majority():
+    c = LetterCommitter(["A", "B"], conf_th=0.5, req_consec=3, window=5)
+    events = frames(("A", 0.9), ("A", 0.9), ("B", 0.9), ("B", 0.9))
+    # üçüncü karede çoğunluk hâlâ A: üç teyit tamam
+    assert list(replay(events, c)) == [(0.2, "A", "A")]
+    assert c.stable == "A"
+
+
+def test_decay_vote_follows_recent_letters():
+    events = frames(("A", 0.9), ("A", 0.9), ("B", 0.9), ("B", 0.9))
+    count = LetterCommitter(["A", "B"], conf_th=0.5, req_consec=2, window=10)
+    decay = LetterCommitter(["A", "B"], conf_th=0.5, req_consec=2, window=10,
+                            mode="decay", decay=0.5)
+    assert [x[1] for x in replay(events, count)] == ["A"]
+    assert [x[1] for x in replay(events, decay)] == ["A", "B"]
+    assert decay.text == "AB"
+
+
+def test_low_confidence_frames_do_not_confirm():
+    c = LetterCommitter(["A"], conf_th=0.75, req_consec=2, window=5)
+    events = frames(("A", 0.9), ("A", 0.5), ("A", 0.9), ("A", 0.9))
+    assert list(replay(events, c)) == [(0.3, "A", "A")]
+
+
+def test_same_letter_needs_reset_last():
+    c = LetterCommitter(["A"], conf_th=0.5, req_consec=1, window=3)
+    events = frames(*[("A", 0.9)] * 3)
+    assert [x[1] for x in replay(events, c)] == ["A"]
+    c.reset_last()  # boşluk / silme
+    assert [x[1] for x in replay(events, c)] == ["A"]
+    assert c.text == "AA"
+
+
+def test_cooldown_delays_next_commit():
+    c = LetterCommitter(["A", "B"], conf_th=0.5, req_consec=1, window=1,
+                        cooldown_s=1.0)
+    events = [(0.0, "A", 0.9), (0.5, "B", 0.9), (0.6, "B", 0.9), (1.2, "B", 0.9)]
+    assert list(replay(events, c)) == [(0.0, "A", "A"), (1.2, "B", "AB")]
+
+
+def test_replay_reads_stream_recognizer_events():
+    c = LetterCommitter(["A"], conf_th=0.5, req_consec=2, window=3)
+    events = [{"event": "frame", "t": 0.0, "label": "A", "conf": 0.9},
+              {"event": "letter", "t": 0.0, "letter": "A", "text": "A"},
+              {"event": "frame", "t": 0.1, "label": None, "conf": None},
+              {"event": "frame", "t": 0.2, "label": "A", "conf": 0.9},
+              {"event": "frame", "t": 0.3, "label": "A", "conf": 0.9}]
+    assert list(replay(events, c)) == [(0.3, "A", "A")]